@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Micro-benchmark van de M3U-parser: regels per seconde en geheugen per zender
+
+Voorbeeld:
+    python benchmarks/bench_parser.py --entries 1000000
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from m3u_scanner import M3UScanner  # noqa: E402
+
+GROUPS = ["Nieuws", "Sport", "Film", "Kinderen", "Muziek", "Documentaire", "Regionaal", "Radio"]
+
+
+def write_playlist(path, entries, hosts=20):
+    """Schrijf een synthetische afspeellijst met realistische EXTINF-attributen"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("#EXTM3U\n")
+        for i in range(entries):
+            group = GROUPS[i % len(GROUPS)]
+            f.write(
+                f'#EXTINF:-1 tvg-id="zender{i}.nl" tvg-name="Zender {i}" '
+                f'tvg-logo="http://logos.example/{group.lower()}.png" group-title="{group}",Zender {i} HD\n'
+                f"http://provider{i % hosts}.example:8080/live/user/pass/{i}.ts\n"
+            )
+
+
+def legacy_parse(lines):
+    """De oorspronkelijke dict-parser, ter vergelijking"""
+    channel = None
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('#EXTINF:'):
+            name_match = re.search('tvg-name="([^"]*)"', line)
+            if name_match:
+                channel_name = name_match.group(1)
+            else:
+                parts = line.split(',', 1)
+                channel_name = parts[1] if len(parts) > 1 else "Onbekend"
+            channel = {"name": channel_name.strip('"\''), "extinf": line}
+        elif not line.startswith('#') and channel:
+            channel["url"] = line
+            yield channel
+            channel = None
+
+
+def parse_all(scanner, lines):
+    """Channel-parser waarbij van elke zender ook de attributen gelezen worden (zoals bij --group)"""
+    for channel in scanner.iter_m3u(lines):
+        channel.group
+        yield channel
+
+
+def measure(name, parse, path, sample):
+    with open(path, encoding="utf-8") as f:
+        lines = sum(1 for _ in f)
+
+    # Doorvoer: alles parsen zonder de zenders te bewaren
+    start = time.perf_counter()
+    with open(path, encoding="utf-8") as f:
+        count = sum(1 for _ in parse(f))
+    elapsed = time.perf_counter() - start
+
+    # Geheugen: de eerste sample zenders vasthouden en meten
+    tracemalloc.start()
+    with open(path, encoding="utf-8") as f:
+        kept = []
+        for channel in parse(f):
+            kept.append(channel)
+            if len(kept) >= sample:
+                break
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # De lijst zelf telt niet mee
+    per_channel = (size - sys.getsizeof(kept)) / len(kept)
+
+    print(f"{name:<9} {count:>9} {lines / elapsed:>12,.0f} {count / elapsed:>12,.0f} {per_channel:>10,.0f}", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1000000)
+    parser.add_argument("--sample", type=int, default=100000, help="aantal zenders voor de geheugenmeting")
+    parser.add_argument("--playlist", help="bestaande afspeellijst gebruiken in plaats van een synthetische")
+    args = parser.parse_args(argv)
+
+    scanner = M3UScanner()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.playlist
+        if path is None:
+            path = os.path.join(tmp, "synthetisch.m3u")
+            write_playlist(path, args.entries)
+
+        print(f"{'parser':<9} {'zenders':>9} {'regels/s':>12} {'zenders/s':>12} {'bytes/zender':>10}")
+        measure("dict", legacy_parse, path, args.sample)
+        measure("channel", scanner.iter_m3u, path, args.sample)
+        measure("geparsed", lambda lines: parse_all(scanner, lines), path, args.sample)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Benchmark van de probe-backends tegen een lokale mock-server
+
+Voorbeeld:
+    python benchmarks/bench_probe.py --sizes 1000 10000 100000 --backends threads async
+
+Met --hosts worden de zenders over 127.0.0.1, 127.0.0.2, ... verdeeld (op Linux
+komt alles bij dezelfde server uit), zodat --processes 1 4 het effect van
+sharding op host laat zien.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from m3u_scanner import Channel, M3UScanner  # noqa: E402
+from mock_server import MockServer  # noqa: E402
+
+
+def make_channels(base_urls, count, dead_ratio):
+    """Genereer een synthetische zenderlijst; elke n-de zender wijst naar een dood pad"""
+    dead_every = int(1 / dead_ratio) if dead_ratio else 0
+    channels = []
+    for i in range(count):
+        kind = "dead" if dead_every and i % dead_every == 0 else "ok"
+        url = f"{base_urls[i % len(base_urls)]}/{kind}/{i}.ts"
+        channels.append(Channel(url, f"Zender {i}"))
+    return channels
+
+
+def run(backend, processes, channels, args):
+    scanner = M3UScanner(timeout=args.timeout, max_workers=args.workers, backend=backend, concurrency=args.concurrency,
+                         per_host_limit=args.per_host, processes=processes)
+    active = 0
+    start = time.perf_counter()
+    for _, is_active, _ in scanner.scan(channels):
+        active += is_active
+    elapsed = time.perf_counter() - start
+    return elapsed, active
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--backends", nargs="+", default=["threads", "async"])
+    parser.add_argument("--workers", type=int, default=50, help="threads voor de threads-backend")
+    parser.add_argument("--concurrency", type=int, default=500, help="gelijktijdige probes voor de async backend")
+    parser.add_argument("--per-host", type=int, default=0, help="limiet per host (de mock-server is één host)")
+    parser.add_argument("--hosts", type=int, default=1, help="verdeel de zenders over zoveel loopback-adressen")
+    parser.add_argument("--processes", type=int, nargs="+", default=[0], help="aantallen shardprocessen om te vergelijken")
+    parser.add_argument("--timeout", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="kunstmatige vertraging per request (s)")
+    parser.add_argument("--dead-ratio", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    server = MockServer(host="0.0.0.0" if args.hosts > 1 else "127.0.0.1", latency=args.latency).start()
+    base_urls = [f"http://127.0.0.{i + 1}:{server.port}" for i in range(args.hosts)]
+    try:
+        print(f"{'backend':<8} {'proc':>4} {'zenders':>8} {'actief':>8} {'tijd (s)':>9} {'zenders/s':>10}")
+        for size in args.sizes:
+            channels = make_channels(base_urls, size, args.dead_ratio)
+            for backend in args.backends:
+                for processes in args.processes:
+                    elapsed, active = run(backend, processes, channels, args)
+                    print(f"{backend:<8} {processes:>4} {size:>8} {active:>8} {elapsed:>9.2f} {size / elapsed:>10.0f}",
+                          flush=True)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
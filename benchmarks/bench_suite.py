@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Reproduceerbare benchmark van parser en scan tegen een lokale mock IPTV-server
+
+Per grootte wordt een synthetische afspeellijst gemaakt (met dubbele zenders,
+dode hosts, dode paden, fouten, trage slow-loris-servers en servers zonder
+HEAD) die de mock-server zelf uitserveert. Elke backend draait in een eigen
+proces, zodat het piekgeheugen per run klopt. Gemeten worden de parser
+(bestand en download), probes per seconde, p50/p99 van de probelatentie en
+het piekgeheugen (RSS). Met dezelfde --seed is de afspeellijst elke keer gelijk.
+
+Voorbeeld:
+    python benchmarks/bench_suite.py --sizes 1000 10000 100000 --json resultaten.json
+"""
+import os
+import sys
+import json
+import time
+import socket
+import random
+import argparse
+import resource
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from m3u_scanner import M3UScanner  # noqa: E402
+from mock_server import MockServer  # noqa: E402
+
+GROUPS = ["Nieuws", "Sport", "Film", "Kinderen", "Muziek", "Documentaire", "Regionaal", "Radio"]
+
+
+def free_port():
+    """Een poort waar (even) niemand luistert, voor dode hosts"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def write_playlist(path, entries, hosts, args):
+    """Schrijf een synthetische afspeellijst; geeft het aantal unieke URL's terug
+
+    hosts is een lijst van host:poort-combinaties. Een deel duplicate_ratio van de
+    zenders herhaalt een eerdere URL, de rest krijgt een pad waarvan het
+    begin het gedrag van de mock-server kiest (zie mock_server).
+    """
+    rng = random.Random(args.seed)
+    kinds = (("slow", args.slow_ratio), ("nohead", args.nohead_ratio), ("dead", args.dead_ratio))
+    urls = []
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("#EXTM3U\n")
+        for i in range(entries):
+            if urls and rng.random() < args.duplicate_ratio:
+                url = rng.choice(urls)
+            else:
+                netloc = hosts[rng.randrange(len(hosts))]
+                kind = "ok"
+                draw = rng.random()
+                for name, ratio in kinds:
+                    if draw < ratio:
+                        kind = name
+                        break
+                    draw -= ratio
+                url = f"http://{netloc}/{kind}/{i}.ts"
+                urls.append(url)
+            group = GROUPS[i % len(GROUPS)]
+            f.write(f'#EXTINF:-1 tvg-id="zender{i}.nl" tvg-name="Zender {i}" group-title="{group}",Zender {i}\n'
+                    f"{url}\n")
+    return len(urls)
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def measure(options, path, url):
+    """Eén run in een eigen proces: parser, download en scan; geeft de meetwaarden terug"""
+    scanner = M3UScanner(log=lambda message: None, **options)
+
+    start = time.perf_counter()
+    parsed = sum(1 for _ in scanner.iter_playlist(path))
+    parse_file = time.perf_counter() - start
+
+    start = time.perf_counter()
+    downloaded = sum(1 for _ in scanner.iter_playlist(url))
+    parse_url = time.perf_counter() - start
+
+    latencies = []
+    scanner.metrics_callbacks.append(lambda event: latencies.append(event.latency))
+    active = 0
+    start = time.perf_counter()
+    for _, is_active, _ in scanner.scan(scanner.iter_playlist(url)):
+        active += is_active
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    return {
+        "channels": parsed,
+        "downloaded": downloaded,
+        "parse_file_per_s": parsed / parse_file,
+        "parse_url_per_s": downloaded / parse_url,
+        "probes": scanner.stats.get("probes"),
+        "active": active,
+        "scan_s": elapsed,
+        "probes_per_s": scanner.stats.get("probes") / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "errors": dict(scanner.metrics.errors),
+        # ru_maxrss is in KiB op Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--backends", nargs="+", default=["threads", "async"])
+    parser.add_argument("--processes", type=int, default=0, help="shardprocessen per scan")
+    parser.add_argument("--workers", type=int, default=50, help="threads voor de threads-backend")
+    parser.add_argument("--concurrency", type=int, default=500, help="gelijktijdige probes voor de async backend")
+    parser.add_argument("--per-host", type=int, default=0, help="limiet per host (0 = geen)")
+    parser.add_argument("--timeout", type=int, default=5)
+    parser.add_argument("--hosts", type=int, default=8, help="aantal hosts (loopback-adressen 127.0.0.N)")
+    parser.add_argument("--dead-host-ratio", type=float, default=0.1, help="deel van de hosts waar niemand luistert")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.2, help="deel van de zenders met een eerdere URL")
+    parser.add_argument("--dead-ratio", type=float, default=0.05, help="deel van de URL's met een 404")
+    parser.add_argument("--nohead-ratio", type=float, default=0.01, help="deel van de URL's zonder HEAD (405)")
+    parser.add_argument("--slow-ratio", type=float, default=0.001, help="deel van de URL's met slow-loris")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="deel van de werkende URL's met een 503")
+    parser.add_argument("--latency", type=float, default=0.005, help="vaste vertraging per verzoek (s)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="extra vertraging per verzoek, tot zoveel (s)")
+    parser.add_argument("--slow-duration", type=float, default=10.0, help="duur van een slow-loris-antwoord (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="schrijf de resultaten ook als JSON naar dit bestand")
+    args = parser.parse_args(argv)
+
+    options = {"timeout": args.timeout, "max_workers": args.workers, "concurrency": args.concurrency,
+               "per_host_limit": args.per_host, "processes": args.processes}
+    context = multiprocessing.get_context("spawn")
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = MockServer(host="0.0.0.0" if args.hosts > 1 else "127.0.0.1", latency=args.latency,
+                            jitter=args.jitter, error_rate=args.error_rate, slow_duration=args.slow_duration,
+                            playlist_dir=tmp).start()
+        dead_port = free_port()
+        dead_hosts = round(args.hosts * args.dead_host_ratio)
+        hosts = [f"127.0.0.{i + 1}:{dead_port if i < dead_hosts else server.port}" for i in range(args.hosts)]
+        try:
+            print(f"{'backend':<8} {'zenders':>8} {'uniek':>8} {'parse/s':>10} {'download/s':>10} {'probes/s':>9} "
+                  f"{'p50 ms':>7} {'p99 ms':>8} {'actief':>8} {'RSS MB':>7}")
+            for size in args.sizes:
+                name = f"bench_{size}.m3u"
+                unique = write_playlist(os.path.join(tmp, name), size, hosts, args)
+                url = f"http://127.0.0.1:{server.port}/playlists/{name}"
+                for backend in args.backends:
+                    with context.Pool(1) as pool:
+                        result = pool.apply(measure, ({**options, "backend": backend}, os.path.join(tmp, name), url))
+                    result.update(backend=backend, size=size, unique=unique)
+                    results.append(result)
+                    print(f"{backend:<8} {size:>8} {unique:>8} {result['parse_file_per_s']:>10,.0f} "
+                          f"{result['parse_url_per_s']:>10,.0f} {result['probes_per_s']:>9,.0f} "
+                          f"{result['p50_ms']:>7.1f} {result['p99_ms']:>8.1f} {result['active']:>8} "
+                          f"{result['peak_rss_mb']:>7.0f}", flush=True)
+        finally:
+            server.stop()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"options": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
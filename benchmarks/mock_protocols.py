@@ -0,0 +1,171 @@
+"""Lokale stand-ins voor RTMP, RTSP en UDP om de protocolprobes te testen
+
+MockRTMPServer beantwoordt C0+C1 met S0+S1+S2, MockRTSPServer beantwoordt
+OPTIONS met 200 (of 404 voor paden die met /dead beginnen) en UDPSender
+stuurt elke 100 ms een MPEG-TS-pakket naar een lokale poort.
+
+Direct uitvoeren scant een kleine afspeellijst met werkende en dode
+zenders van elk soort met beide backends:
+
+    python benchmarks/mock_protocols.py
+"""
+import os
+import sys
+import socket
+import asyncio
+import argparse
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from m3u_scanner import Channel, M3UScanner  # noqa: E402
+from m3u_scanner.scanner import BACKENDS  # noqa: E402
+
+RTMP_HANDSHAKE_SIZE = 1536
+
+
+class MockTCPServer:
+    """Basis: asyncio-server in een eigen thread, zoals mock_server.MockServer"""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.host = host
+        self.port = port
+        self.connections = 0
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    async def handle(self, reader, writer):
+        raise NotImplementedError
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            await self.handle(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+        self._loop.run_until_complete(self._shutdown())
+        self._loop.close()
+
+    async def _shutdown(self):
+        tasks = asyncio.all_tasks() - {asyncio.current_task()}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._server.wait_closed()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._server.close)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+class MockRTMPServer(MockTCPServer):
+    async def handle(self, reader, writer):
+        c0c1 = await reader.readexactly(1 + RTMP_HANDSHAKE_SIZE)
+        # S0 (versie 3) + S1 (eigen willekeurige bytes) + S2 (echo van C1)
+        writer.write(b"\x03" + bytes(8) + os.urandom(RTMP_HANDSHAKE_SIZE - 8) + c0c1[1:])
+        await writer.drain()
+        await reader.readexactly(RTMP_HANDSHAKE_SIZE)  # C2
+
+
+class MockRTSPServer(MockTCPServer):
+    async def handle(self, reader, writer):
+        request_line = (await reader.readline()).decode("latin-1")
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        _, url, _ = request_line.split(" ", 2)
+        status = "404 Not Found" if url.split("/", 3)[-1].startswith("dead") else "200 OK"
+        writer.write(f"RTSP/1.0 {status}\r\nCSeq: 1\r\nPublic: OPTIONS, DESCRIBE, SETUP, PLAY\r\n\r\n".encode())
+        await writer.drain()
+
+
+class UDPSender:
+    """Stuurt periodiek een MPEG-TS-pakket naar host:port"""
+
+    def __init__(self, host="127.0.0.1", port=0, interval=0.1):
+        self.host = host
+        self.port = port or self.free_port()
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def free_port():
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+    def _run(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            while not self._stop.wait(self.interval):
+                sock.sendto(b"\x47" + bytes(187), (self.host, self.port))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de RTMP/RTSP/UDP-probes tegen lokale stand-ins")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--timeout", type=int, default=2)
+    args = parser.parse_args()
+
+    rtmp = MockRTMPServer().start()
+    rtsp = MockRTSPServer().start()
+    udp = UDPSender().start()
+    closed_port = UDPSender.free_port()  # niemand luistert of zendt hier
+
+    expected = [
+        (f"rtmp://127.0.0.1:{rtmp.port}/live/stream", True),
+        (f"rtmp://127.0.0.1:{closed_port}/live/stream", False),
+        (f"rtsp://127.0.0.1:{rtsp.port}/live", True),
+        (f"rtsp://127.0.0.1:{rtsp.port}/dead", False),
+        (f"udp://@127.0.0.1:{udp.port}", True),
+        (f"udp://@127.0.0.1:{closed_port}", False),
+    ]
+
+    failures = 0
+    try:
+        for backend in args.backends:
+            scanner = M3UScanner(timeout=args.timeout, backend=backend, log=lambda message: None,
+                                 protocol_timeouts={"udp": 1.0})
+            channels = [Channel(url, url.partition(":")[0]) for url, _ in expected]
+            results = {channel.url: (is_active, error) for channel, is_active, error in scanner.scan(channels)}
+            for url, should_be_active in expected:
+                is_active, error = results[url]
+                ok = is_active == should_be_active
+                failures += not ok
+                print(f"{backend:8} {'OK  ' if ok else 'FOUT'} {url:45} actief={is_active} {error}")
+    finally:
+        rtmp.stop()
+        rtsp.stop()
+        udp.stop()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
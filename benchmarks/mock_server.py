@@ -0,0 +1,150 @@
+"""Lokale mock IPTV-server voor benchmarks (asyncio, HTTP/1.1 keep-alive)
+
+Het begin van het pad bepaalt het gedrag:
+
+    /ok/...        200, of 503 voor een vast deel (error_rate) van de paden
+    /dead/...      404
+    /error/...     500
+    /nohead/...    405 op HEAD, 200 op GET (servers die geen HEAD kennen)
+    /slow/...      slow-loris: de headers komen byte voor byte binnen in
+                   slow_duration seconden
+    /playlists/... bestanden uit playlist_dir (voor het downloaden van afspeellijsten)
+
+latency wordt bij elk verzoek gewacht, plus tot jitter seconden extra. Welke
+paden een fout of extra vertraging krijgen hangt alleen van het pad af
+(crc32), dus elke run geeft dezelfde uitkomst. De server draait in een eigen
+thread zodat hij naast de scanner in hetzelfde proces kan lopen.
+"""
+import os
+import zlib
+import asyncio
+import threading
+
+CHUNK_SIZE = 65536
+
+
+def fraction(path, salt=""):
+    """Vast getal in [0, 1) per pad, gelijk in elke run"""
+    return zlib.crc32((salt + path).encode("utf-8")) / 2 ** 32
+
+
+class MockServer:
+    """Minimale HTTP-server die genoeg begrijpt van HEAD/GET om de scanner te bedienen"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0, slow_duration=10.0,
+                 playlist_dir=None):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.slow_duration = slow_duration
+        self.playlist_dir = playlist_dir
+        self.requests = 0
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def status(self, method, path):
+        if path.startswith("/ok/"):
+            return "503 Service Unavailable" if fraction(path, "error") < self.error_rate else "200 OK"
+        if path.startswith("/nohead/"):
+            return "405 Method Not Allowed" if method == "HEAD" else "200 OK"
+        if path.startswith("/slow/"):
+            return "200 OK"
+        if path.startswith("/error/"):
+            return "500 Internal Server Error"
+        return "404 Not Found"
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                # Headers overslaan tot de lege regel
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                self.requests += 1
+                delay = self.latency + self.jitter * fraction(path, "jitter")
+                if delay:
+                    await asyncio.sleep(delay)
+
+                if path.startswith("/playlists/") and self.playlist_dir:
+                    await self.send_file(writer, method, path)
+                    continue
+
+                head = (f"HTTP/1.1 {self.status(method, path)}\r\n"
+                        f"Content-Type: video/mp2t\r\nContent-Length: 188\r\n\r\n").encode()
+                body = b"\x47" + b"\x00" * 187 if method == "GET" else b""
+                if path.startswith("/slow/"):
+                    # Elke byte apart, zodat een leestimeout per recv() nooit afgaat
+                    pause = self.slow_duration / len(head)
+                    for i in range(len(head)):
+                        writer.write(head[i:i + 1])
+                        await writer.drain()
+                        await asyncio.sleep(pause)
+                    head = b""
+                writer.write(head + body)
+                await writer.drain()
+        except (ConnectionError, ValueError, asyncio.CancelledError):
+            # Bij een afgebroken verbinding (ook door stop()) gewoon stoppen; een CancelledError
+            # doorlaten geeft in de connection_made-callback van asyncio een traceback
+            pass
+        finally:
+            writer.close()
+
+    async def send_file(self, writer, method, path):
+        name = os.path.basename(path)
+        file_path = os.path.join(self.playlist_dir, name)
+        if not os.path.isfile(file_path):
+            writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+            return
+        writer.write((f"HTTP/1.1 200 OK\r\nContent-Type: audio/x-mpegurl; charset=utf-8\r\n"
+                      f"Content-Length: {os.path.getsize(file_path)}\r\n\r\n").encode())
+        if method == "GET":
+            with open(file_path, "rb") as f:
+                while chunk := f.read(CHUNK_SIZE):
+                    writer.write(chunk)
+                    await writer.drain()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self.handle, self.host, self.port, backlog=4096)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+        # Openstaande verbindingen netjes afbreken, anders klaagt asyncio bij het afsluiten
+        self._loop.run_until_complete(self._shutdown())
+        self._loop.close()
+
+    async def _shutdown(self):
+        tasks = asyncio.all_tasks() - {asyncio.current_task()}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._server.wait_closed()
+
+    def start(self):
+        """Start de server in een achtergrondthread en wacht tot hij luistert"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        """Stop de server"""
+        self._loop.call_soon_threadsafe(self._server.close)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
@@ -0,0 +1,7 @@
+#!/usr/bin/env python3
+import sys
+
+from m3u_scanner.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
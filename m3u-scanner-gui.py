@@ -1,13 +1,178 @@
 #!/usr/bin/env python3
 import tkinter as tk
 from tkinter import filedialog, ttk, scrolledtext, messagebox
-import requests
-import re
-import os
-import time
+import queue
 import threading
-import concurrent.futures
-from urllib.parse import urlparse
+
+from m3u_scanner import M3UScanner, TRANSLATIONS
+from m3u_scanner.batch import PlaylistBatch, is_batch, split_sources
+
+# De GUI verwerkt berichten van de scan-thread in batches op een vaste timer
+UI_INTERVAL_MS = 100
+UI_BATCH_SIZE = 5000  # max. aantal berichten per tik, zodat het venster blijft reageren
+
+
+class ResultsTable(ttk.Frame):
+    """Gevirtualiseerde resultatentabel: alleen de zichtbare rijen bestaan als Treeview-items
+
+    Alle resultaten staan in een gewone lijst (het model). Filteren en sorteren
+    werken op die lijst en de Treeview toont steeds alleen het venster rond de
+    scrollpositie, hoe groot de scan ook is.
+    """
+
+    COLUMNS = ("name", "host", "status", "latency")
+    ROW_HEIGHT = 20
+    HEADING_HEIGHT = 25
+
+    def __init__(self, parent, messages):
+        super().__init__(parent)
+        self.rows = []  # (naam, host, status, latentie, channel)
+        self.view = []  # gefilterde en gesorteerde rijen
+        self.offset = 0
+        self.visible_rows = 1
+        self.sort_column = None
+        self.sort_reverse = False
+        self.filter_text = tk.StringVar()
+        self.min_latency = tk.StringVar()
+
+        # Filterbalk
+        filter_frame = ttk.Frame(self)
+        filter_frame.pack(fill=tk.X, pady=2)
+
+        self.filter_label = ttk.Label(filter_frame)
+        self.filter_label.pack(side=tk.LEFT, padx=5)
+        ttk.Entry(filter_frame, textvariable=self.filter_text, width=30).pack(side=tk.LEFT, padx=5)
+
+        self.latency_label = ttk.Label(filter_frame)
+        self.latency_label.pack(side=tk.LEFT, padx=5)
+        ttk.Entry(filter_frame, textvariable=self.min_latency, width=6).pack(side=tk.LEFT, padx=5)
+
+        self.count_label = ttk.Label(filter_frame)
+        self.count_label.pack(side=tk.RIGHT, padx=5)
+
+        # Tabel met eigen scrollbalk over het model in plaats van over de Treeview-items
+        table_frame = ttk.Frame(self)
+        table_frame.pack(fill=tk.BOTH, expand=True)
+
+        self.tree = ttk.Treeview(table_frame, columns=self.COLUMNS, show="headings", selectmode="browse")
+        self.tree.column("name", width=250)
+        self.tree.column("host", width=180)
+        self.tree.column("status", width=200)
+        self.tree.column("latency", width=90, anchor=tk.E)
+
+        self.scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll_by(-3 if event.delta > 0 else 3))
+        self.tree.bind("<Button-4>", lambda event: self.scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll_by(3))
+        self.filter_text.trace_add("write", lambda *args: self.refresh())
+        self.min_latency.trace_add("write", lambda *args: self.refresh())
+
+        self.set_language(messages)
+
+    def set_language(self, messages):
+        """Zet de teksten van kolommen en filters in de gekozen taal"""
+        for column in self.COLUMNS:
+            self.tree.heading(column, text=messages["column_" + column], command=lambda c=column: self.sort_by(c))
+        self.filter_label.config(text=messages["filter"])
+        self.latency_label.config(text=messages["min_latency"])
+
+    def clear(self):
+        """Wis alle resultaten"""
+        self.rows = []
+        self.view = []
+        self.offset = 0
+        self.render()
+
+    def add(self, rows):
+        """Voeg een batch rijen toe; volgt het einde van de lijst als daar gescrold was"""
+        follow = self.offset >= len(self.view) - self.visible_rows
+        self.rows.extend(rows)
+        matches = self.make_filter()
+        matching = [row for row in rows if matches(row)]
+        if not matching:
+            self.render()
+            return
+        self.view.extend(matching)
+        if self.sort_column is not None:
+            # Timsort herkent de al gesorteerde lijst, dus dit is bijna lineair
+            self.view.sort(key=self.sort_key(), reverse=self.sort_reverse)
+        elif follow:
+            self.offset = max(0, len(self.view) - self.visible_rows)
+        self.render()
+
+    def make_filter(self):
+        """Functie die test of een rij door het tekstfilter (naam, host, status) en het latentiefilter komt"""
+        text = self.filter_text.get().strip().lower()
+        try:
+            min_latency = float(self.min_latency.get().replace(",", "."))
+        except ValueError:
+            min_latency = None
+
+        def matches(row):
+            if text and not any(text in field.lower() for field in row[:3]):
+                return False
+            return min_latency is None or (row[3] is not None and row[3] >= min_latency)
+        return matches
+
+    def sort_key(self):
+        index = self.COLUMNS.index(self.sort_column)
+        if self.sort_column == "latency":
+            return lambda row: -1 if row[3] is None else row[3]
+        return lambda row: row[index].lower()
+
+    def sort_by(self, column):
+        """Sorteer op een kolom; nogmaals klikken draait de volgorde om"""
+        self.sort_reverse = not self.sort_reverse if column == self.sort_column else False
+        self.sort_column = column
+        self.refresh()
+
+    def refresh(self):
+        """Filter en sorteer het hele model opnieuw"""
+        matches = self.make_filter()
+        self.view = [row for row in self.rows if matches(row)]
+        if self.sort_column is not None:
+            self.view.sort(key=self.sort_key(), reverse=self.sort_reverse)
+        self.offset = 0
+        self.render()
+
+    def render(self):
+        """Toon alleen de rijen die in het venster passen"""
+        self.tree.delete(*self.tree.get_children())
+        for name, host, status, latency, _ in self.view[self.offset:self.offset + self.visible_rows]:
+            self.tree.insert("", tk.END, values=(name, host, status, "-" if latency is None else f"{latency:.3f}"))
+
+        total = len(self.view)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0, 1)
+        self.count_label.config(text=f"{total}/{len(self.rows)}")
+
+    def scroll_to(self, offset):
+        self.offset = max(0, min(offset, len(self.view) - self.visible_rows))
+        self.render()
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.offset + rows)
+
+    def on_scroll(self, action, amount, unit=None):
+        """Scrollbalk-commando: moveto <fractie> of scroll <n> units|pages"""
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.view)))
+        else:
+            step = self.visible_rows if unit == "pages" else 1
+            self.scroll_by(int(amount) * step)
+
+    def on_resize(self, event):
+        visible_rows = max(1, (event.height - self.HEADING_HEIGHT) // self.ROW_HEIGHT)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.scroll_to(self.offset)
+
 
 class M3UScannerGUI:
     def __init__(self, root):
@@ -20,106 +185,18 @@ class M3UScannerGUI:
         self.m3u_path = tk.StringVar()
         self.timeout = tk.IntVar(value=5)
         self.max_workers = tk.IntVar(value=10)
+        self.per_host_limit = tk.IntVar(value=4)
+        self.resume = tk.BooleanVar(value=False)
+        self.deep = tk.BooleanVar(value=False)
         self.is_scanning = False
+        self.scanner = None
         self.active_channels = []
         self.inactive_channels = []
+        self.ui_queue = queue.Queue()  # (soort, gegevens) van elke thread naar de GUI
         self.language = tk.StringVar(value="nl")  # Default language is Dutch
 
         # Translations
-        self.translations = {
-            "nl": {
-                "title": "M3U Scanner",
-                "file_frame": "M3U Bestand",
-                "browse_file": "Selecteer Bestand",
-                "options_frame": "Scanopties",
-                "timeout": "Timeout (seconden):",
-                "connections": "Gelijktijdige verbindingen:",
-                "start_scan": "Start Scan",
-                "stop_scan": "Stop Scan",
-                "progress_label": "Gereed: 0/0 zenders",
-                "log_tab": "Log",
-                "active_tab": "Actieve Zenders (0)",
-                "inactive_tab": "Inactieve Zenders (0)",
-                "status_bar": "Gereed",
-                "file_menu": "Bestand",
-                "open_file": "Open M3U Bestand",
-                "exit": "Afsluiten",
-                "action_menu": "Acties",
-                "save_results": "Resultaten Opslaan",
-                "help_menu": "Help",
-                "about": "Over",
-                "language_menu": "Taal",
-                "english": "Engels",
-                "dutch": "Nederlands",
-                "error_no_file": "Selecteer eerst een M3U-bestand",
-                "log_selected_file": "Bestand geselecteerd: ",
-                "log_start_scan": "Start scan van: ",
-                "log_timeout": "Timeout: ",
-                "log_max_connections": "Max verbindingen: ",
-                "log_no_channels": "Geen zenders gevonden in de afspeellijst",
-                "log_found_channels": "Gevonden: ",
-                "log_scanning": "Scannen...",
-                "log_scan_stopped": "Scan gestopt door gebruiker",
-                "log_scan_completed": "SCAN VOLTOOID: ",
-                "log_active_channels": "ACTIEVE ZENDERS: ",
-                "log_inactive_channels": "INACTIEVE ZENDERS: ",
-                "log_download_playlist": "Afspeellijst downloaden van URL: ",
-                "log_load_playlist": "Afspeellijst laden van bestand: ",
-                "log_invalid_format": "Waarschuwing: Bestand is mogelijk niet in geldig M3U-formaat",
-                "log_error_downloading": "Fout bij downloaden afspeellijst: ",
-                "log_error_reading": "Fout bij lezen afspeellijst: ",
-                "log_error_scanning": "Fout tijdens scan: ",
-                "log_results_saved": "Resultaten opgeslagen in:",
-                "log_error_saving": "Fout bij opslaan resultaten: ",
-                "about_text": "M3U Scanner v1.0\n\nEen tool om M3U-afspeellijsten te scannen en te controleren of de zenders actief zijn.\n\nGebruik:\n1. Selecteer een M3U-bestand\n2. Pas eventueel de scanopties aan\n3. Klik op 'Start Scan'\n4. Resultaten worden automatisch opgeslagen"
-            },
-            "en": {
-                "title": "M3U Scanner",
-                "file_frame": "M3U File",
-                "browse_file": "Select File",
-                "options_frame": "Scan Options",
-                "timeout": "Timeout (seconds):",
-                "connections": "Concurrent connections:",
-                "start_scan": "Start Scan",
-                "stop_scan": "Stop Scan",
-                "progress_label": "Ready: 0/0 channels",
-                "log_tab": "Log",
-                "active_tab": "Active Channels (0)",
-                "inactive_tab": "Inactive Channels (0)",
-                "status_bar": "Ready",
-                "file_menu": "File",
-                "open_file": "Open M3U File",
-                "exit": "Exit",
-                "action_menu": "Actions",
-                "save_results": "Save Results",
-                "help_menu": "Help",
-                "about": "About",
-                "language_menu": "Language",
-                "english": "English",
-                "dutch": "Dutch",
-                "error_no_file": "Please select an M3U file first",
-                "log_selected_file": "File selected: ",
-                "log_start_scan": "Starting scan of: ",
-                "log_timeout": "Timeout: ",
-                "log_max_connections": "Max connections: ",
-                "log_no_channels": "No channels found in the playlist",
-                "log_found_channels": "Found: ",
-                "log_scanning": "Scanning...",
-                "log_scan_stopped": "Scan stopped by user",
-                "log_scan_completed": "SCAN COMPLETED: ",
-                "log_active_channels": "ACTIVE CHANNELS: ",
-                "log_inactive_channels": "INACTIVE CHANNELS: ",
-                "log_download_playlist": "Downloading playlist from URL: ",
-                "log_load_playlist": "Loading playlist from file: ",
-                "log_invalid_format": "Warning: File may not be in valid M3U format",
-                "log_error_downloading": "Error downloading playlist: ",
-                "log_error_reading": "Error reading playlist: ",
-                "log_error_scanning": "Error during scan: ",
-                "log_results_saved": "Results saved in:",
-                "log_error_saving": "Error saving results: ",
-                "about_text": "M3U Scanner v1.0\n\nA tool to scan M3U playlists and check if the channels are active.\n\nUsage:\n1. Select an M3U file\n2. Adjust scan options if needed\n3. Click 'Start Scan'\n4. Results are saved automatically"
-            }
-        }
+        self.translations = TRANSLATIONS
 
         # Main container
         main_frame = ttk.Frame(root, padding="10")
@@ -151,6 +228,18 @@ class M3UScannerGUI:
         self.connections_spinbox = ttk.Spinbox(self.options_frame, from_=1, to=50, textvariable=self.max_workers, width=5)
         self.connections_spinbox.grid(row=0, column=3, padx=5, sticky=tk.W)
 
+        self.per_host_label = ttk.Label(self.options_frame, text=self.translations[self.language.get()]["per_host"])
+        self.per_host_label.grid(row=0, column=4, padx=5, sticky=tk.W)
+
+        self.per_host_spinbox = ttk.Spinbox(self.options_frame, from_=0, to=50, textvariable=self.per_host_limit, width=5)
+        self.per_host_spinbox.grid(row=0, column=5, padx=5, sticky=tk.W)
+
+        self.resume_check = ttk.Checkbutton(self.options_frame, text=self.translations[self.language.get()]["resume"], variable=self.resume)
+        self.resume_check.grid(row=1, column=0, columnspan=2, padx=5, pady=(5, 0), sticky=tk.W)
+
+        self.deep_check = ttk.Checkbutton(self.options_frame, text=self.translations[self.language.get()]["deep"], variable=self.deep)
+        self.deep_check.grid(row=1, column=2, columnspan=2, padx=5, pady=(5, 0), sticky=tk.W)
+
         # Actieknoppen
         action_frame = ttk.Frame(main_frame)
         action_frame.pack(fill=tk.X, pady=5)
@@ -186,15 +275,15 @@ class M3UScannerGUI:
         self.active_frame = ttk.Frame(self.result_notebook)
         self.result_notebook.add(self.active_frame, text=self.translations[self.language.get()]["active_tab"])
 
-        self.active_text = scrolledtext.ScrolledText(self.active_frame, wrap=tk.WORD)
-        self.active_text.pack(fill=tk.BOTH, expand=True)
+        self.active_table = ResultsTable(self.active_frame, self.translations[self.language.get()])
+        self.active_table.pack(fill=tk.BOTH, expand=True)
 
         # Inactieve zenders tabblad
         self.inactive_frame = ttk.Frame(self.result_notebook)
         self.result_notebook.add(self.inactive_frame, text=self.translations[self.language.get()]["inactive_tab"])
 
-        self.inactive_text = scrolledtext.ScrolledText(self.inactive_frame, wrap=tk.WORD)
-        self.inactive_text.pack(fill=tk.BOTH, expand=True)
+        self.inactive_table = ResultsTable(self.inactive_frame, self.translations[self.language.get()])
+        self.inactive_table.pack(fill=tk.BOTH, expand=True)
 
         # Statusbalk
         self.status_bar = ttk.Label(root, text=self.translations[self.language.get()]["status_bar"], relief=tk.SUNKEN, anchor=tk.W)
@@ -203,6 +292,8 @@ class M3UScannerGUI:
         # Voeg menu toe
         self.create_menu()
 
+        self.root.after(UI_INTERVAL_MS, self.process_ui_queue)
+
     def create_menu(self):
         """Maak menu aan"""
         menu_bar = tk.Menu(self.root)
@@ -243,6 +334,9 @@ class M3UScannerGUI:
         self.options_frame.config(text=self.translations[self.language.get()]["options_frame"])
         self.timeout_label.config(text=self.translations[self.language.get()]["timeout"])
         self.connections_label.config(text=self.translations[self.language.get()]["connections"])
+        self.per_host_label.config(text=self.translations[self.language.get()]["per_host"])
+        self.resume_check.config(text=self.translations[self.language.get()]["resume"])
+        self.deep_check.config(text=self.translations[self.language.get()]["deep"])
         self.scan_button.config(text=self.translations[self.language.get()]["start_scan"])
         self.stop_button.config(text=self.translations[self.language.get()]["stop_scan"])
         self.progress_label.config(text=self.translations[self.language.get()]["progress_label"])
@@ -250,15 +344,19 @@ class M3UScannerGUI:
         self.result_notebook.tab(1, text=self.translations[self.language.get()]["active_tab"])
         self.result_notebook.tab(2, text=self.translations[self.language.get()]["inactive_tab"])
         self.status_bar.config(text=self.translations[self.language.get()]["status_bar"])
+        self.active_table.set_language(self.translations[self.language.get()])
+        self.inactive_table.set_language(self.translations[self.language.get()])
         self.create_menu()
 
     def browse_file(self):
         """Open bestandskiezer om M3U-bestand te selecteren"""
-        filepath = filedialog.askopenfilename(
+        # Meerdere bestanden worden als batch gescand (gescheiden door ';')
+        filepaths = filedialog.askopenfilenames(
             title=self.translations[self.language.get()]["open_file"],
-            filetypes=[("M3U bestanden", "*.m3u"), ("Alle bestanden", "*.*")]
+            filetypes=[("M3U bestanden", "*.m3u *.m3u8"), ("Alle bestanden", "*.*")]
         )
-        if filepath:
+        if filepaths:
+            filepath = "; ".join(filepaths)
             self.m3u_path.set(filepath)
             self.log(self.translations[self.language.get()]["log_selected_file"] + filepath)
 
@@ -291,275 +389,197 @@ class M3UScannerGUI:
         """Stop de scan"""
         if self.is_scanning:
             self.is_scanning = False
+            if self.scanner is not None:
+                self.scanner.stop()
             self.log(self.translations[self.language.get()]["log_scan_stopped"])
             self.status_bar.config(text=self.translations[self.language.get()]["status_bar"])
 
     def perform_scan(self):
         """Voer de M3U-scan uit"""
+        writer = None
         try:
             m3u_path = self.m3u_path.get()
             timeout = self.timeout.get()
             max_workers = self.max_workers.get()
+            self.scanner = M3UScanner(timeout=timeout, max_workers=max_workers, log=self.log, language=self.language.get(),
+                                      per_host_limit=self.per_host_limit.get(), deep=self.deep.get())
 
-            self.status_bar.config(text=self.translations[self.language.get()]["log_load_playlist"])
+            self.ui_queue.put(("status", self.translations[self.language.get()]["log_load_playlist"]))
             self.log(self.translations[self.language.get()]["log_start_scan"] + m3u_path)
             self.log(self.translations[self.language.get()]["log_timeout"] + str(timeout) + " seconden, " + self.translations[self.language.get()]["log_max_connections"] + str(max_workers))
 
-            # Laad afspeellijst
-            channels = self.load_playlist(m3u_path)
-            total_channels = len(channels)
-
-            if total_channels == 0:
-                self.log(self.translations[self.language.get()]["log_no_channels"])
-                self.scan_completed()
-                return
-
-            self.log(self.translations[self.language.get()]["log_found_channels"] + str(total_channels) + " zenders. " + self.translations[self.language.get()]["log_scanning"])
-
-            # Update voortgangsbalk instellen
-            self.root.after(0, lambda: self.progress_label.config(text=f"Gereed: 0/{total_channels} zenders"))
+            # Resultaten worden tijdens de scan al weggeschreven (.part-bestanden), met een logboek om te hervatten
+            sources = split_sources(m3u_path)
+            if is_batch(sources):
+                # Meerdere afspeellijsten, een map of een glob: elke URL één keer, uitvoer per afspeellijst
+                writer = PlaylistBatch(self.scanner, sources).open(resume=self.resume.get())
+                self.log(self.translations[self.language.get()]["log_batch"].format(count=len(writer.playlists), output_dir=writer.output_dir))
+                channels = writer.channels()
+            else:
+                self.scanner.open_journal(m3u_path, resume=self.resume.get())
+                writer = self.scanner.open_writer(m3u_path)
+                # Laad afspeellijst; de scan begint terwijl de lijst nog gelezen wordt
+                channels = self.scanner.iter_playlist(m3u_path)
+            self.log(self.translations[self.language.get()]["log_scanning"])
 
-            # Scan de zenders
+            # Scan de zenders en verzamel de resultaten
             completed = 0
-            executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
-            future_to_channel = {executor.submit(self.check_channel, channel, timeout): channel for channel in channels}
-
-            # Verzamel de resultaten
-            for future in concurrent.futures.as_completed(future_to_channel):
-                if not self.is_scanning:
-                    executor.shutdown(wait=False)
-                    self.log(self.translations[self.language.get()]["log_scan_stopped"])
-                    self.scan_completed()
-                    return
-
-                channel, is_active, error_message = future.result()
+            for channel, is_active, error_message in self.scanner.scan(channels):
                 completed += 1
+                writer.write(channel, is_active, error_message)
 
                 if is_active:
                     self.active_channels.append(channel)
-                    self.root.after(0, lambda ch=channel: self.add_to_active(ch))
+                    self.ui_queue.put(("active", (channel,)))
                 else:
                     self.inactive_channels.append(channel)
-                    self.root.after(0, lambda ch=channel, err=error_message: self.add_to_inactive(ch, err))
+                    self.ui_queue.put(("inactive", (channel, error_message)))
+
+                # Voortgang; alleen de laatste stand per tik wordt getoond. Het totaal is pas
+                # bekend als de afspeellijst helemaal gelezen is
+                self.ui_queue.put(("progress", (completed, self.scanner.pipeline.total)))
 
-                # Update voortgang
-                progress = int((completed / total_channels) * 100)
-                self.root.after(0, lambda p=progress, c=completed, t=total_channels: self.update_progress(p, c, t))
+            if completed == 0:
+                writer.discard()
+                writer = None
+                if not self.scanner.stopped:
+                    self.log(self.translations[self.language.get()]["log_no_channels"])
+                return
 
-            # Scan voltooid
-            self.log("\n" + "="*60)
-            self.log(self.translations[self.language.get()]["log_scan_completed"] + str(len(self.active_channels) + len(self.inactive_channels)) + " zenders gecontroleerd")
-            self.log(self.translations[self.language.get()]["log_active_channels"] + str(len(self.active_channels)))
-            self.log(self.translations[self.language.get()]["log_inactive_channels"] + str(len(self.inactive_channels)))
-            self.log("="*60)
+            # Na Stop heeft stop_scan de melding al gelogd; de resultaten tot nu toe worden wel opgeslagen
+            if not self.scanner.stopped:
+                # Scan voltooid
+                self.log("\n" + "="*60)
+                self.log(self.translations[self.language.get()]["log_scan_completed"] + str(len(self.active_channels) + len(self.inactive_channels)) + " zenders gecontroleerd")
+                self.log(self.translations[self.language.get()]["log_active_channels"] + str(len(self.active_channels)))
+                self.log(self.translations[self.language.get()]["log_inactive_channels"] + str(len(self.inactive_channels)))
+                self.log("="*60)
 
             # Update tabbladen
-            self.root.after(0, lambda a=len(self.active_channels), i=len(self.inactive_channels):
-                self.update_tab_titles(a, i))
+            self.ui_queue.put(("call", lambda a=len(self.active_channels), i=len(self.inactive_channels):
+                self.update_tab_titles(a, i)))
 
-            # Automatisch opslaan van resultaten
-            if self.active_channels or self.inactive_channels:
-                self.save_results()
+            # Rond de uitvoerbestanden af
+            paths = writer.close(self.scanner.report_summary(completed))
+            writer = None
+            self.log_saved(paths)
 
         except Exception as e:
             self.log(self.translations[self.language.get()]["log_error_scanning"] + str(e))
+            if writer is not None:
+                writer.abort()
         finally:
             self.scan_completed()
 
     def scan_completed(self):
         """Herstel de UI naar de initiële status na scan"""
         self.is_scanning = False
-        self.root.after(0, lambda: self.scan_button.config(state=tk.NORMAL))
-        self.root.after(0, lambda: self.stop_button.config(state=tk.DISABLED))
-        self.root.after(0, lambda: self.status_bar.config(text=self.translations[self.language.get()]["status_bar"]))
-
-    def update_progress(self, progress, completed, total):
-        """Update voortgangsbalk en label"""
+        # Via de wachtrij, zodat dit pas gebeurt na de laatste resultaten en voortgang
+        self.ui_queue.put(("call", lambda: self.scan_button.config(state=tk.NORMAL)))
+        self.ui_queue.put(("call", lambda: self.stop_button.config(state=tk.DISABLED)))
+        self.ui_queue.put(("call", lambda: self.set_progress_mode("determinate")))
+        self.ui_queue.put(("status", self.translations[self.language.get()]["status_bar"]))
+
+    def process_ui_queue(self):
+        """Verwerk de berichten van de scan-thread in één keer en plan de volgende tik"""
+        log_lines = []
+        rows = {"active": [], "inactive": []}
+        progress = None
+        status = None
+        calls = []
+        try:
+            for _ in range(UI_BATCH_SIZE):
+                kind, data = self.ui_queue.get_nowait()
+                if kind == "log":
+                    log_lines.append(f"{data}\n")
+                elif kind in rows:
+                    rows[kind].append(self.make_row(*data))
+                elif kind == "progress":
+                    progress = data
+                    status = None  # update_progress zet de status zelf
+                elif kind == "status":
+                    status = data
+                elif kind == "call":
+                    calls.append(data)
+        except queue.Empty:
+            pass
+
+        if log_lines:
+            self.log_text.insert(tk.END, "".join(log_lines))
+            self.log_text.see(tk.END)
+        if rows["active"]:
+            self.active_table.add(rows["active"])
+        if rows["inactive"]:
+            self.inactive_table.add(rows["inactive"])
+        if progress is not None:
+            self.update_progress(*progress)
+        if status is not None:
+            self.status_bar.config(text=status)
+        for call in calls:
+            call()
+
+        self.root.after(UI_INTERVAL_MS, self.process_ui_queue)
+
+    def update_progress(self, completed, total):
+        """Update voortgangsbalk en label; zolang het totaal onbekend is (total None) is de balk onbepaald"""
+        if total is None:
+            self.set_progress_mode("indeterminate")
+            self.progress_label.config(text=f"Gereed: {completed} zenders (afspeellijst wordt nog gelezen)")
+            self.status_bar.config(text=f"Scannen: {completed} zenders gecontroleerd")
+            return
+        self.set_progress_mode("determinate")
+        progress = int(completed / total * 100) if total else 0
         self.progress_bar["value"] = progress
         self.progress_label.config(text=f"Gereed: {completed}/{total} zenders")
         self.status_bar.config(text=f"Scannen: {progress}% voltooid")
 
+    def set_progress_mode(self, mode):
+        """Schakel de voortgangsbalk tussen onbepaald (bewegend blokje) en bepaald (percentage)"""
+        if str(self.progress_bar["mode"]) == mode:
+            return
+        if mode == "indeterminate":
+            self.progress_bar.config(mode=mode)
+            self.progress_bar.start(UI_INTERVAL_MS)
+        else:
+            self.progress_bar.stop()
+            self.progress_bar.config(mode=mode)
+
     def update_tab_titles(self, active_count, inactive_count):
         """Update titels van de tabbladen met aantallen"""
         self.result_notebook.tab(1, text=f"Actieve Zenders ({active_count})")
         self.result_notebook.tab(2, text=f"Inactieve Zenders ({inactive_count})")
 
-    def load_playlist(self, m3u_path):
-        """Laad en parse de M3U-afspeellijst van bestand of URL"""
-        try:
-            # Check if it's a URL or local file
-            if m3u_path.startswith(('http://', 'https://')):
-                self.log(self.translations[self.language.get()]["log_download_playlist"] + m3u_path)
-                response = requests.get(m3u_path, timeout=self.timeout.get())
-                response.raise_for_status()
-                content = response.text
-            else:
-                self.log(self.translations[self.language.get()]["log_load_playlist"] + m3u_path)
-                with open(m3u_path, 'r', encoding='utf-8', errors='ignore') as file:
-                    content = file.read()
-
-            return self.parse_m3u(content)
-
-        except requests.exceptions.RequestException as e:
-            self.log(self.translations[self.language.get()]["log_error_downloading"] + str(e))
-            return []
-        except IOError as e:
-            self.log(self.translations[self.language.get()]["log_error_reading"] + str(e))
-            return []
-
-    def parse_m3u(self, content):
-        """Parse M3U-inhoud en extraheer zenderinformatie"""
-        channels = []
-        lines = content.splitlines()
-
-        if not lines or not lines[0].startswith('#EXTM3U'):
-            self.log(self.translations[self.language.get()]["log_invalid_format"])
-
-        channel = None
-
-        for line in lines:
-            line = line.strip()
-
-            if not line:
-                continue
-
-            if line.startswith('#EXTINF:'):
-                # Extract channel name
-                name_match = re.search('tvg-name="([^"]*)"', line)
-
-                if name_match:
-                    channel_name = name_match.group(1)
-                else:
-                    # Try to extract from the end of the line
-                    parts = line.split(',', 1)
-                    channel_name = parts[1] if len(parts) > 1 else "Onbekend"
-
-                # Clean up the name by removing quotes if present
-                channel_name = channel_name.strip('"\'')
-
-                channel = {"name": channel_name, "extinf": line}
-
-            elif not line.startswith('#') and channel:
-                # This is a URL
-                channel["url"] = line
-                channels.append(channel)
-                channel = None
-
-        return channels
-
-    def check_channel(self, channel, timeout):
-        """Controleer of een zender actief is door te proberen verbinding te maken"""
-        url = channel["url"]
-        name = channel["name"]
-
-        try:
-            # Voor HTTP/HTTPS URL's
-            if url.startswith(('http://', 'https://')):
-                # Probeer HEAD-request, als dat niet werkt, probeer een snelle GET-request
-                try:
-                    response = requests.head(url, timeout=timeout, allow_redirects=True)
-                    is_active = 200 <= response.status_code < 400
-                except requests.exceptions.RequestException:
-                    # Probeer met een GET-request maar beperk de gedownloade bytes
-                    response = requests.get(url, timeout=timeout, stream=True, allow_redirects=True)
-                    is_active = 200 <= response.status_code < 400
-                    response.close()  # Sluit de verbinding
-
-            # Voor andere protocollen zoals RTMP, kunnen we alleen controleren of de URL-indeling geldig lijkt
-            else:
-                parsed = urlparse(url)
-                is_active = bool(parsed.scheme and parsed.netloc)
-
-            if is_active:
-                return (channel, True, "")
-            else:
-                return (channel, False, f"Status code: {getattr(response, 'status_code', 'N/A')}")
-
-        except requests.exceptions.RequestException as e:
-            error_message = str(e)
-            # Verkort de foutmelding voor leesbaarheid
-            if len(error_message) > 100:
-                error_message = error_message[:100] + "..."
-            return (channel, False, error_message)
-
-    def add_to_active(self, channel):
-        """Voeg zender toe aan lijst met actieve zenders"""
-        self.active_text.insert(tk.END, f"{channel['name']}\n")
-        self.active_text.insert(tk.END, f"URL: {channel['url']}\n\n")
-        self.active_text.see(tk.END)
-
-    def add_to_inactive(self, channel, error):
-        """Voeg zender toe aan lijst met inactieve zenders"""
-        self.inactive_text.insert(tk.END, f"{channel['name']}\n")
-        self.inactive_text.insert(tk.END, f"URL: {channel['url']}\n")
-        self.inactive_text.insert(tk.END, f"Fout: {error}\n\n")
-        self.inactive_text.see(tk.END)
+    def make_row(self, channel, error=None):
+        """Rij voor de resultatentabel: (naam, host, status, latentie, channel)"""
+        return channel.name, channel.host, "OK" if error is None else error, channel.latency, channel
 
     def log(self, message):
-        """Voeg bericht toe aan log"""
-        self.log_text.insert(tk.END, f"{message}\n")
-        self.log_text.see(tk.END)
+        """Voeg bericht toe aan log; veilig vanuit elke thread"""
+        self.ui_queue.put(("log", message))
 
     def clear_results(self):
         """Wis resultaten"""
         self.log_text.delete(1.0, tk.END)
-        self.active_text.delete(1.0, tk.END)
-        self.inactive_text.delete(1.0, tk.END)
+        self.active_table.clear()
+        self.inactive_table.clear()
 
     def save_results(self):
         """Sla de scanresultaten op naar bestanden"""
         try:
-            # Maak uitvoermap op basis van de invoerbestandsnaam
-            m3u_path = self.m3u_path.get()
-            input_name = os.path.basename(m3u_path).replace('.m3u', '')
-            if input_name == m3u_path:  # In geval van een URL
-                input_name = "playlist"
-
-            output_dir = f"{input_name}_scan_results"
-            os.makedirs(output_dir, exist_ok=True)
-
-            # Sla actieve zenders op
-            active_path = os.path.join(output_dir, "active_channels.m3u")
-            with open(active_path, "w", encoding="utf-8") as f:
-                f.write("#EXTM3U\n")
-                for channel in self.active_channels:
-                    f.write(f"{channel['extinf']}\n")
-                    f.write(f"{channel['url']}\n")
-
-            # Sla inactieve zenders op
-            inactive_path = os.path.join(output_dir, "inactive_channels.m3u")
-            with open(inactive_path, "w", encoding="utf-8") as f:
-                f.write("#EXTM3U\n")
-                for channel in self.inactive_channels:
-                    f.write(f"{channel['extinf']}\n")
-                    f.write(f"{channel['url']}\n")
-
-            # Sla gedetailleerd rapport op
-            report_path = os.path.join(output_dir, "scan_report.txt")
-            with open(report_path, "w", encoding="utf-8") as f:
-                f.write(f"M3U Scan Rapport voor: {m3u_path}\n")
-                f.write(f"Datum: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Totaal zenders: {len(self.active_channels) + len(self.inactive_channels)}\n")
-                f.write(f"Actieve zenders: {len(self.active_channels)}\n")
-                f.write(f"Inactieve zenders: {len(self.inactive_channels)}\n\n")
-
-                f.write("="*60 + "\n")
-                f.write("INACTIEVE ZENDERS MET FOUTEN:\n")
-                f.write("="*60 + "\n")
-                for i, channel in enumerate(self.inactive_channels, 1):
-                    f.write(f"{i}. {channel['name']}\n")
-                    f.write(f"   URL: {channel['url']}\n")
-                    f.write(f"   Fout: {channel.get('error', 'Onbekende fout')}\n\n")
-
-            self.log("\n" + self.translations[self.language.get()]["log_results_saved"])
-            self.log(f"- {active_path}")
-            self.log(f"- {inactive_path}")
-            self.log(f"- {report_path}")
+            scanner = self.scanner or M3UScanner(language=self.language.get())
+            paths = scanner.save_results(self.m3u_path.get(), self.active_channels, self.inactive_channels)
+            self.log_saved(paths)
 
         except IOError as e:
             self.log(self.translations[self.language.get()]["log_error_saving"] + str(e))
             messagebox.showerror("Fout", self.translations[self.language.get()]["log_error_saving"] + str(e))
 
+    def log_saved(self, paths):
+        """Log waar de resultaten opgeslagen zijn"""
+        self.log("\n" + self.translations[self.language.get()]["log_results_saved"])
+        for path in paths:
+            self.log(f"- {path}")
+
     def show_about(self):
         """Toon informatie over de toepassing"""
         messagebox.showinfo(
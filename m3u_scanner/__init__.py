@@ -0,0 +1,7 @@
+"""Headless M3U-scanner: engine, vertalingen en command-line interface"""
+
+from .channel import Channel
+from .i18n import TRANSLATIONS
+from .scanner import M3UScanner
+
+__all__ = ["Channel", "M3UScanner", "TRANSLATIONS"]
@@ -0,0 +1,297 @@
+import time
+import socket
+import asyncio
+import threading
+from urllib.parse import urlparse
+
+try:
+    import aiohttp
+    from aiohttp.abc import AbstractResolver
+    # Fouten waarbij er nooit een verbinding was (ConnectionTimeoutError bestaat pas sinds aiohttp 3.10)
+    CONNECT_ERRORS = (aiohttp.ClientConnectorError,) + tuple(
+        error for error in (getattr(aiohttp, "ConnectionTimeoutError", None),) if error is not None)
+except ImportError:  # aiohttp is alleen nodig voor de async backend
+    aiohttp = None
+    AbstractResolver = object
+    CONNECT_ERRORS = ()
+
+from . import protocols
+from .dns import hostname_of
+from .metrics import ProbeTiming, describe_error
+from .scanner import shorten_error
+from .scheduler import HostScheduler
+
+
+class CachedResolver(AbstractResolver):
+    """aiohttp-resolver die eerst de gedeelde DNSCache van de scanner raadpleegt"""
+
+    def __init__(self, dns_cache):
+        self.dns_cache = dns_cache
+        self.fallback = aiohttp.ThreadedResolver()
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        entry = self.dns_cache.get(host)
+        if entry is None or not entry.addresses:
+            return await self.fallback.resolve(host, port, family)
+        return [
+            {"hostname": host, "host": address, "port": port, "family": address_family,
+             "proto": 0, "flags": socket.AI_NUMERICHOST}
+            for address_family, address in entry.addresses
+            if family in (socket.AF_UNSPEC, address_family)
+        ] or await self.fallback.resolve(host, port, family)
+
+    async def close(self):
+        await self.fallback.close()
+
+
+class AsyncBackend:
+    """Controleer zenders met aiohttp: duizenden probes tegelijk op één event loop
+
+    Draait een eigen event loop in een achtergrondthread met scanner.concurrency
+    worker-coroutines. Alle probes delen één ClientSession, zodat verbindingen
+    naar dezelfde host hergebruikt worden (keep-alive). Zelfde interface als
+    backends.ThreadBackend: submit(), close(), stop() en shutdown().
+    concurrency overschrijft scanner.concurrency.
+    """
+
+    def __init__(self, scanner, on_result, on_done, concurrency=None):
+        if aiohttp is None:
+            raise RuntimeError("De async backend vereist aiohttp: pip install aiohttp")
+        self.scanner = scanner
+        self.on_result = on_result
+        self.on_done = on_done
+        self.timeout = scanner.timeout
+        self.concurrency = concurrency or scanner.concurrency
+        self.dns_cache = scanner.dns_cache
+        self.stats = scanner.stats
+        self.scheduler = HostScheduler(per_host_limit=scanner.per_host_limit)
+        self.closed = False
+        self.loop = None
+        self._workers = []
+        self._waiters = []
+        self._thread = None
+        self._started = threading.Event()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    def submit(self, channel):
+        """Plan een zender in (aanroepbaar vanuit elke thread)"""
+        self._call(self._add, channel)
+
+    def close(self):
+        """Er komen geen nieuwe zenders meer bij"""
+        self._call(self._close)
+
+    def stop(self):
+        """Breek de scan af; lopende probes worden geannuleerd en hun verbindingen gesloten"""
+        self._call(self._cancel)
+
+    def _call(self, callback, *args):
+        try:
+            self.loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            pass  # de event loop is al klaar, bijvoorbeeld na Stop
+
+    def shutdown(self):
+        self._thread.join()
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        self._started.set()
+        try:
+            self.loop.run_until_complete(self._scan())
+        except Exception as e:
+            self.on_result(e)
+        finally:
+            self.loop.close()
+            self.on_done()
+
+    def _add(self, channel):
+        self.scheduler.add(channel)
+        self._wake()
+
+    def _close(self):
+        self.closed = True
+        self._wake()
+
+    def _cancel(self):
+        self._close()
+        for worker in self._workers:
+            worker.cancel()
+
+    def _wake(self):
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def _next_channel(self):
+        """Wacht tot er een zender gestart mag worden; None als alles klaar is"""
+        while not self.scanner.stopped:
+            channel = self.scheduler.next()
+            if channel is not None:
+                return channel
+            if self.closed and not len(self.scheduler):
+                return None
+            waiter = self.loop.create_future()
+            self._waiters.append(waiter)
+            await waiter
+        return None
+
+    def trace_config(self):
+        """TraceConfig die verbindingen telt en DNS- en verbindingstijden in de ProbeTiming van het verzoek zet
+
+        aiohttp meldt TLS niet apart; dat zit bij het verbinden.
+        """
+        async def on_request_start(session, context, params):
+            self.stats.incr("http_requests")
+
+        async def on_dns_resolvehost_start(session, context, params):
+            context.dns_start = time.perf_counter()
+
+        async def on_dns_resolvehost_end(session, context, params):
+            if isinstance(context.trace_request_ctx, ProbeTiming):
+                context.trace_request_ctx.add("dns", time.perf_counter() - context.dns_start)
+
+        async def on_connection_create_start(session, context, params):
+            timing = context.trace_request_ctx
+            context.connect_start = (time.perf_counter(), (timing.dns or 0.0) if isinstance(timing, ProbeTiming) else 0.0)
+
+        async def on_connection_create_end(session, context, params):
+            self.stats.incr("http_connections")
+            timing = context.trace_request_ctx
+            if isinstance(timing, ProbeTiming):
+                # De DNS-lookup valt binnen het verbinden, maar wordt apart geteld
+                start, dns = context.connect_start
+                timing.add("connect", time.perf_counter() - start - ((timing.dns or 0.0) - dns))
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+        trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+        trace_config.on_connection_create_start.append(on_connection_create_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        return trace_config
+
+    def request_timeout(self, channel):
+        """ClientTimeout met de adaptieve connect- en leestimeout van de host"""
+        connect, read = self.scanner.host_health.timeouts(channel.host)
+        return aiohttp.ClientTimeout(total=connect + read, sock_connect=connect, sock_read=read)
+
+    async def check_channel(self, session, channel, timing=None):
+        """Async variant van M3UScanner.check_channel met dezelfde (channel, is_active, error) uitvoer
+
+        timing (ProbeTiming) krijgt de tijden per fase van de gelukte HEAD of GET.
+        """
+        url = channel.url
+        health = self.scanner.host_health
+
+        try:
+            if url.startswith(('http://', 'https://')):
+                timeout = self.request_timeout(channel)
+                dns_before = (timing.dns or 0.0) if timing is not None else 0.0
+                start = time.perf_counter()
+                try:
+                    async with session.head(url, allow_redirects=True, timeout=timeout,
+                                            trace_request_ctx=timing) as response:
+                        status = response.status
+                except CONNECT_ERRORS:
+                    raise  # Geen verbinding: een GET zou ook mislukken
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    # GET zonder de body te lezen; de verbinding wordt bij het verlaten gesloten
+                    start = time.perf_counter()
+                    async with session.get(url, allow_redirects=True, timeout=timeout,
+                                           trace_request_ctx=timing) as response:
+                        status = response.status
+                health.success(channel.host, time.perf_counter() - start)
+                if timing is not None:
+                    # DNS tijdens het verzoek telt niet mee als wachten op de eerste bytes
+                    timing.finish(time.perf_counter() - start - ((timing.dns or 0.0) - dns_before))
+                is_active = 200 <= status < 400
+            elif url.lower().startswith(protocols.PREFIXES):
+                return await self.check_protocol(channel)
+            else:
+                try:
+                    parsed = urlparse(url)
+                except ValueError:
+                    return (channel, False, shorten_error(f"Ongeldige URL: {url}"))
+                is_active = bool(parsed.scheme and parsed.netloc)
+                status = "N/A"
+
+            if is_active:
+                return (channel, True, "")
+            else:
+                return (channel, False, f"Status code: {status}")
+
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            if isinstance(e, CONNECT_ERRORS):
+                health.failure(channel.host)
+            return (channel, False, shorten_error(describe_error(e)))
+
+    async def check_protocol(self, channel):
+        """Async variant van M3UScanner.check_protocol"""
+        kind, connect, read = self.scanner.protocol_timeout(channel)
+        health = self.scanner.host_health
+        start = time.perf_counter()
+        try:
+            error_message = await protocols.probe_async(channel.url, connect, read)
+        except protocols.ProbeError as e:
+            error_message = str(e)
+        except OSError as e:
+            if kind != "udp":
+                health.failure(channel.host)
+            return (channel, False, shorten_error(describe_error(e)))
+        if kind != "udp":
+            health.success(channel.host, time.perf_counter() - start)
+        return (channel, not error_message, shorten_error(error_message))
+
+    async def check_dns(self, channel):
+        """DNS-controle vooraf zonder de event loop te blokkeren"""
+        if not self.scanner.pre_resolve:
+            return ""
+        entry = self.dns_cache.get(hostname_of(channel.url))
+        if entry is not None and not entry.failed:
+            return ""
+        return await self.loop.run_in_executor(None, self.scanner.check_dns, channel)
+
+    async def _scan(self):
+        """Laat een vaste set workers de zenders afwerken en geef elk resultaat door aan on_result"""
+        connector = aiohttp.TCPConnector(limit=self.concurrency, resolver=CachedResolver(self.dns_cache),
+                                         ttl_dns_cache=self.dns_cache.ttl)
+        timeout = aiohttp.ClientTimeout(total=self.scanner.connect_timeout + self.timeout)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         trace_configs=[self.trace_config()]) as session:
+            async def worker():
+                # De planner wordt alleen vanuit deze event loop gebruikt, dus delen is veilig
+                while True:
+                    channel = await self._next_channel()
+                    if channel is None:
+                        return
+
+                    start = time.perf_counter()
+                    timing = ProbeTiming()
+                    error_message = self.scanner.check_breaker(channel)
+                    if not error_message and self.scanner.pre_resolve:
+                        error_message = await self.check_dns(channel)
+                        timing.dns = time.perf_counter() - start
+                    if error_message:
+                        result = (channel, False, error_message)
+                    else:
+                        result = await self.check_channel(session, channel, timing)
+                    channel.latency = round(time.perf_counter() - start, 3)
+                    self.scheduler.done(channel)
+                    self._wake()
+                    self.scanner.metrics.probe(channel, result[1], result[2], timing)
+                    self.on_result(result)
+
+            self._workers = [self.loop.create_task(worker()) for _ in range(self.concurrency)]
+            if self.scanner.stopped:
+                self._cancel()  # stop() kwam voordat de workers bestonden
+            # Geannuleerde workers (Stop) zijn geen fout; andere fouten wel
+            for result in await asyncio.gather(*self._workers, return_exceptions=True):
+                if isinstance(result, Exception):
+                    raise result
@@ -0,0 +1,85 @@
+import threading
+import concurrent.futures
+
+from .scheduler import HostScheduler
+
+
+class ThreadBackend:
+    """Probe-backend met een ThreadPoolExecutor en requests
+
+    Zenders komen binnen via submit() (vanuit elke thread) en worden via de
+    HostScheduler aan vrije workers gegeven. Elk resultaat gaat naar on_result;
+    na close() en de laatste probe volgt on_done(). workers overschrijft
+    scanner.max_workers.
+    """
+
+    def __init__(self, scanner, on_result, on_done, workers=None):
+        self.scanner = scanner
+        self.on_result = on_result
+        self.on_done = on_done
+        self.workers = workers or scanner.max_workers
+        self.scheduler = HostScheduler(per_host_limit=scanner.per_host_limit)
+        self.executor = None
+        self.in_flight = 0
+        self.closed = False
+        self._done_sent = False
+        # RLock: een future die al klaar is roept zijn callback direct aan in submit()
+        self._lock = threading.RLock()
+
+    def start(self):
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers)
+
+    def submit(self, channel):
+        """Plan een zender in"""
+        with self._lock:
+            self.scheduler.add(channel)
+            self._dispatch()
+
+    def close(self):
+        """Er komen geen nieuwe zenders meer bij"""
+        with self._lock:
+            self.closed = True
+            self._check_done()
+
+    def stop(self):
+        """Breek de scan af: wachtende probes worden geannuleerd
+
+        Lopende probes zijn dan al afgebroken doordat scanner.stop() hun sockets sluit.
+        """
+        with self._lock:
+            self.closed = True
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        """Ruim de workers en hun sessies op na een voltooide scan"""
+        self.executor.shutdown(wait=True)
+        self.scanner.close_sessions()
+
+    def _dispatch(self):
+        # Vul de vrije workers aan, round-robin over de hosts
+        while self.in_flight < self.workers and not self.scanner.stopped:
+            channel = self.scheduler.next()
+            if channel is None:
+                break
+            self.in_flight += 1
+            future = self.executor.submit(self.scanner.timed_check, channel)
+            future.add_done_callback(lambda f, ch=channel: self._completed(ch, f))
+
+    def _completed(self, channel, future):
+        if future.cancelled():
+            return
+        try:
+            self.on_result(future.result())
+        except Exception as e:
+            self.on_result(e)
+
+        with self._lock:
+            self.in_flight -= 1
+            self.scheduler.done(channel)
+            self._dispatch()
+            self._check_done()
+
+    def _check_done(self):
+        if self.closed and not self.in_flight and not len(self.scheduler) and not self._done_sent:
+            self._done_sent = True
+            self.on_done()
@@ -0,0 +1,210 @@
+import os
+import glob
+import time
+import queue
+import threading
+from collections import Counter
+from urllib.parse import urlsplit
+
+from .metrics import error_kind
+from .writer import PART_SUFFIX, fsync_dir
+
+BATCH_OUTPUT_DIR = "batch_scan_results"
+BATCH_REPORT_FILE = "batch_report.txt"
+PLAYLIST_PATTERNS = ("*.m3u", "*.m3u8")
+
+
+def is_url(source):
+    return source.startswith(('http://', 'https://'))
+
+
+def split_sources(text):
+    """Meerdere afspeellijsten in één invoerveld, gescheiden door ';'"""
+    return [source.strip() for source in text.split(";") if source.strip()]
+
+
+def is_batch(sources):
+    """Zijn dit meerdere afspeellijsten (of een map of glob) in plaats van één bestand of URL?"""
+    return len(sources) > 1 or any(not is_url(source) and (os.path.isdir(source) or glob.has_magic(source))
+                                   for source in sources)
+
+
+def expand_sources(sources):
+    """Mappen, globs, bestanden en URL's -> lijst afspeellijsten, zonder dubbelen en in opgegeven volgorde"""
+    playlists = []
+    for source in sources:
+        if is_url(source):
+            playlists.append(source)
+        elif os.path.isdir(source):
+            playlists.extend(sorted(path for pattern in PLAYLIST_PATTERNS
+                                    for path in glob.glob(os.path.join(source, pattern))))
+        elif glob.has_magic(source):
+            playlists.extend(sorted(glob.glob(source)))
+        else:
+            playlists.append(source)
+    return list(dict.fromkeys(playlists))
+
+
+def playlist_name(playlist):
+    """Korte naam van een afspeellijst die als bestandsnaam bruikbaar is"""
+    if not is_url(playlist):
+        return os.path.splitext(os.path.basename(playlist))[0]
+    parts = urlsplit(playlist)
+    name = os.path.basename(parts.path.rstrip("/")).replace('.m3u8', '').replace('.m3u', '')
+    name = "_".join(filter(None, (parts.hostname, name)))
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+
+
+def output_name(playlist):
+    """Naam van de uitvoermap van één afspeellijst binnen de batchmap"""
+    return playlist_name(playlist) + "_scan_results"
+
+
+class PlaylistBatch:
+    """Scan een reeks afspeellijsten als één geheel
+
+    Alle afspeellijsten worden tegelijk gedownload en geparsed (loaders
+    threads) en als één stroom aan de scanner gegeven. De scanner ontdubbelt
+    al op URL, dus een zender die in tien afspeellijsten staat wordt één keer
+    geprobed en het resultaat gaat naar alle tien. Per afspeellijst komt er een
+    eigen uitvoermap met actieve/inactieve M3U's en rapport onder output_dir,
+    plus een overzicht in batch_report.txt. Het rapport van een afspeellijst
+    telt alleen de eigen zenders; de gegevens van de hele scan (verzoeken,
+    doorvoer, hosts) staan in het overzicht.
+    Heeft dezelfde write/close/abort/discard-vorm als ResultWriter.
+    """
+
+    def __init__(self, scanner, sources, output_dir=None, loaders=4, queue_size=10000):
+        self.scanner = scanner
+        self.playlists = expand_sources(sources)
+        self.output_dir = output_dir or BATCH_OUTPUT_DIR
+        self.loaders = loaders
+        self.queue_size = queue_size
+        self.writers = []
+        self.errors = []   # per afspeellijst: soort fout -> aantal inactieve zenders
+        self._owners = {}  # id(zender) -> index van de afspeellijst, zolang het resultaat nog niet binnen is
+
+    @property
+    def active_count(self):
+        return sum(writer.active_count for writer in self.writers)
+
+    @property
+    def inactive_count(self):
+        return sum(writer.inactive_count for writer in self.writers)
+
+    def open(self, resume=False):
+        """Open het gedeelde logboek en een ResultWriter per afspeellijst"""
+        self.scanner.open_journal(self.output_dir, self.output_dir, resume=resume)
+        used = {}
+        for playlist in self.playlists:
+            name = output_name(playlist)
+            used[name] = used.get(name, 0) + 1
+            if used[name] > 1:
+                name = f"{name}_{used[name]}"
+            self.writers.append(self.scanner.open_writer(playlist, os.path.join(self.output_dir, name)))
+            self.errors.append(Counter())
+        return self
+
+    def channels(self, groups=None):
+        """Generator met de zenders van alle afspeellijsten, in volgorde van binnenkomst"""
+        channels = queue.Queue(maxsize=self.queue_size)
+        sources = queue.Queue()
+        for index, playlist in enumerate(self.playlists):
+            sources.put((index, playlist))
+
+        def put(item):
+            while not self.scanner.stopped:
+                try:
+                    channels.put(item, timeout=0.2)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def load():
+            while True:
+                try:
+                    index, playlist = sources.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    for channel in self.scanner.iter_playlist(playlist):
+                        if (groups is None or channel.group in groups) and not put((index, channel)):
+                            return
+                finally:
+                    put((index, None))
+
+        for _ in range(min(self.loaders, len(self.playlists))):
+            threading.Thread(target=load, daemon=True).start()
+
+        remaining = len(self.playlists)
+        while remaining and not self.scanner.stopped:
+            try:
+                index, channel = channels.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if channel is None:
+                remaining -= 1
+                continue
+            self._owners[id(channel)] = index
+            yield channel
+
+    def write(self, channel, is_active, error_message=""):
+        """Schrijf het resultaat weg bij de afspeellijst waar de zender uit kwam"""
+        index = self._owners.pop(id(channel))
+        self.writers[index].write(channel, is_active, error_message)
+        if not is_active:
+            self.errors[index][error_kind(error_message or channel.error)] += 1
+
+    def close(self, summary=()):
+        """Rond alle afspeellijsten af en schrijf het overzicht; geeft de paden terug
+
+        summary (de regels van de hele scan) komt alleen in het overzicht.
+        Afspeellijsten zonder zenders (bijvoorbeeld een mislukte download)
+        krijgen geen uitvoermap.
+        """
+        paths = []
+        lines = []
+        for playlist, writer, errors in zip(self.playlists, self.writers, self.errors):
+            if writer.active_count or writer.inactive_count:
+                own = []
+                if self.scanner.stopped:
+                    own.append(f"Scan gestopt na {writer.active_count + writer.inactive_count} zenders van deze afspeellijst")
+                if errors:
+                    own.append("Fouten per soort: " + ", ".join(f"{kind} {count}" for kind, count in errors.most_common()))
+                paths.extend(writer.close(own))
+                result = f"{writer.active_count} actief, {writer.inactive_count} inactief -> {writer.output_dir}"
+            else:
+                writer.discard()
+                result = "geen zenders"
+            lines.append(f"{playlist}: {result}")
+
+        report = os.path.join(self.output_dir, BATCH_REPORT_FILE)
+        with open(report + PART_SUFFIX, "w", encoding="utf-8") as f:
+            f.write(f"M3U Batch Rapport voor {len(self.playlists)} afspeellijsten\n")
+            f.write(f"Datum: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write(f"Totaal zenders: {self.active_count + self.inactive_count}\n")
+            f.write(f"Actieve zenders: {self.active_count}\n")
+            f.write(f"Inactieve zenders: {self.inactive_count}\n")
+            for line in summary:
+                f.write(f"{line}\n")
+            f.write("\n")
+            for line in lines:
+                f.write(f"{line}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(report + PART_SUFFIX, report)
+        fsync_dir(self.output_dir)
+        return paths + [report]
+
+    def abort(self):
+        for writer in self.writers:
+            writer.abort()
+
+    def discard(self):
+        for writer in self.writers:
+            writer.discard()
+        try:
+            os.rmdir(self.output_dir)
+        except OSError:
+            pass  # niet leeg (bijvoorbeeld het logboek)
@@ -0,0 +1,81 @@
+import time
+import sqlite3
+import threading
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443, "rtsp": 554, "rtmp": 1935}
+
+
+def normalize_url(url):
+    """Normaliseer een URL zodat schrijfwijzen van dezelfde stream gelijk zijn
+
+    Schema en host in kleine letters, standaardpoort en fragment weg.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        scheme = parts.scheme.lower()
+        netloc = parts.netloc.lower()
+        if "@" in netloc:
+            # Inloggegevens zijn hoofdlettergevoelig
+            userinfo, _, hostport = parts.netloc.rpartition("@")
+            netloc = userinfo + "@" + hostport.lower()
+        if parts.port is not None and DEFAULT_PORTS.get(scheme) == parts.port:
+            netloc = netloc.rsplit(":", 1)[0]
+        return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+    except ValueError:
+        return url.strip()
+
+
+class ResultCache:
+    """Persistente cache van proberesultaten in SQLite, sleutel is de genormaliseerde URL"""
+
+    def __init__(self, path, ttl=3600, batch_size=500):
+        self.path = path
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self._pending = []
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS probes ("
+            "url TEXT PRIMARY KEY, active INTEGER NOT NULL, error TEXT NOT NULL, "
+            "latency REAL, checked REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def get(self, url):
+        """Geef (is_active, error, latency) terug als url binnen de TTL is gecontroleerd, anders None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT active, error, latency FROM probes WHERE url = ? AND checked >= ?",
+                (normalize_url(url), time.time() - self.ttl),
+            ).fetchone()
+        if row is None:
+            return None
+        return bool(row[0]), row[1], row[2]
+
+    def put(self, channel, is_active):
+        """Bewaar het resultaat van een zender; wordt per batch weggeschreven"""
+        with self._lock:
+            self._pending.append((
+                normalize_url(channel.url), int(is_active), "" if is_active else channel.error,
+                channel.latency, time.time(),
+            ))
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def commit(self):
+        """Schrijf openstaande resultaten weg"""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            self._db.executemany("INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?, ?)", self._pending)
+            self._db.commit()
+            self._pending = []
+
+    def close(self):
+        self.commit()
+        self._db.close()
@@ -0,0 +1,179 @@
+import re
+import sys
+
+# Een #EXTINF-regel in de gebruikelijke vorm: duur, attributen met één spatie ervoor, komma, titel
+EXTINF_RE = re.compile(r'#EXTINF:(-?[0-9.]+)((?: [A-Za-z0-9_:-]+="[^"]*")*),(.*)\Z')
+# Soepelere variant voor afwijkende regels (extra spaties, geen titel, ...)
+LOOSE_EXTINF_RE = re.compile(r'#EXTINF:\s*(-?[0-9.]+)?((?:\s*[A-Za-z0-9_:-]+="[^"]*")*)\s*(?:,(.*))?', re.S)
+ATTRIBUTE_RE = re.compile(r'([A-Za-z0-9_:-]+)="([^"]*)"')
+HOST_RE = re.compile(r'[A-Za-z][A-Za-z0-9+.-]*://([^/?#]*)')
+
+# Waarden die in een afspeellijst vaak herhaald worden en dus één keer in het geheugen hoeven
+INTERNED_ATTRIBUTES = frozenset((
+    "group-title", "tvg-logo", "tvg-country", "tvg-language", "tvg-shift", "tvg-type",
+    "catchup", "catchup-days", "catchup-source", "radio", "parent-code", "audio-track",
+))
+
+# Gedeelde attribuutnamen per volgorde, met de posities waarvan de waarde gedeeld wordt
+_KEY_SETS = {}
+
+
+def _key_set(chunks):
+    """(attribuutnamen, te delen posities) voor stukken als (' tvg-id=', ' group-title=')"""
+    key_set = _KEY_SETS.get(chunks)
+    if key_set is None:
+        keys = tuple(sys.intern(chunk[1:-1]) for chunk in chunks)
+        interned = tuple(i for i, key in enumerate(keys) if key in INTERNED_ATTRIBUTES)
+        key_set = _KEY_SETS[chunks] = (keys, interned)
+    return key_set
+
+
+def title_after_comma(extinf):
+    """Tekst na de eerste komma buiten aanhalingstekens, of None als er geen is
+
+    Vangnet voor regels die ook LOOSE_EXTINF_RE niet tot aan de komma kan lezen,
+    zoals attributen zonder aanhalingstekens (tvg-id=abc) of een duur als "abc".
+    """
+    parts = extinf.split('"')
+    for i in range(0, len(parts), 2):  # de even stukken staan buiten aanhalingstekens
+        comma = parts[i].find(",")
+        if comma >= 0:
+            return '"'.join([parts[i][comma + 1:]] + parts[i + 1:])
+    return None
+
+
+def parse_extinf(extinf):
+    """Parse een (gestripte) #EXTINF-regel
+
+    Geeft ((duur, attribuutnamen, waarden, titel), exact) terug; exact is True
+    als de regel precies uit die delen op te bouwen is.
+    """
+    match = EXTINF_RE.match(extinf)
+    exact = match is not None
+    if not exact:
+        # Afwijkende opmaak: soepel parsen
+        match = LOOSE_EXTINF_RE.match(extinf)
+    duration, attributes, title = match.groups()
+    if title is None and not exact:
+        title = title_after_comma(extinf)
+
+    if exact:
+        # ' a="x" b="y"'.split('"') -> [' a=', 'x', ' b=', 'y', '']; de vorm is al door EXTINF_RE gecontroleerd
+        parts = attributes.split('"')
+        chunks = tuple(parts[0:-1:2])
+        values = parts[1::2]
+    else:
+        pairs = ATTRIBUTE_RE.findall(attributes)
+        chunks = tuple(f' {key}=' for key, _ in pairs)
+        values = [value for _, value in pairs]
+
+    keys, interned = _key_set(chunks)
+    for i in interned:
+        values[i] = sys.intern(values[i])
+    return (sys.intern(duration or ""), keys, tuple(values), title or ""), exact
+
+
+class Channel:
+    """Compacte zender: de #EXTINF-regel wordt pas geparsed als een attribuut nodig is
+
+    Bij het inlezen wordt alleen de ruwe regel bewaard; de meeste zenders
+    worden alleen geprobed en weggeschreven, en daarvoor is die regel genoeg.
+    Bij het eerste gebruik van een attribuut (name, group, attr(), ...) wordt
+    de regel in één keer geparsed. Attribuutnamen, groepen, logo's en hosts
+    worden daarbij gedeeld tussen zenders, en de ruwe regel vervalt als hij
+    exact uit de geparste delen op te bouwen is. Ook de host wordt pas bij het
+    eerste gebruik bepaald.
+    """
+
+    __slots__ = ("url", "_host", "_extinf", "_fields", "error", "latency", "cached")
+
+    def __init__(self, url, title="", keys=(), values=(), duration="-1", extinf=None):
+        self.url = url
+        self._host = None
+        self._extinf = extinf
+        # (duur, gedeelde tuple met attribuutnamen, bijbehorende waarden, titel); None = nog niet geparsed
+        self._fields = None if extinf is not None else (duration, keys, values, title)
+        self.error = ""
+        self.latency = None
+        self.cached = False
+
+    @classmethod
+    def from_extinf(cls, extinf, url):
+        """Maak een zender uit een (gestripte) #EXTINF-regel en de URL eronder"""
+        return cls(url, extinf=extinf)
+
+    @property
+    def host(self):
+        """Host (netloc) in kleine letters, gedeeld tussen zenders"""
+        host = self._host
+        if host is None:
+            host = self._host = sys.intern(host_of(self.url))
+        return host
+
+    def _parsed(self):
+        fields = self._fields
+        if fields is None:
+            fields, exact = parse_extinf(self._extinf)
+            self._fields = fields
+            if exact:
+                self._extinf = None
+        return fields
+
+    @property
+    def duration(self):
+        return self._parsed()[0]
+
+    @property
+    def keys(self):
+        return self._parsed()[1]
+
+    @property
+    def values(self):
+        return self._parsed()[2]
+
+    @property
+    def title(self):
+        return self._parsed()[3]
+
+    def attr(self, key, default=None):
+        """Waarde van een EXTINF-attribuut, bijvoorbeeld attr("group-title")"""
+        _, keys, values, _ = self._parsed()
+        try:
+            return values[keys.index(key)]
+        except ValueError:
+            return default
+
+    @property
+    def name(self):
+        name = self.attr("tvg-name")
+        if name is None:
+            name = self.title or "Onbekend"
+        # Clean up the name by removing quotes if present
+        return name.strip('"\'')
+
+    @property
+    def group(self):
+        return self.attr("group-title", "")
+
+    @property
+    def extinf(self):
+        return self._extinf if self._extinf is not None else self.build_extinf()
+
+    @property
+    def attrs(self):
+        """Alle EXTINF-attributen als dict"""
+        return dict(zip(self.keys, self.values))
+
+    def build_extinf(self):
+        duration, keys, values, title = self._parsed()
+        attributes = "".join(f' {key}="{value}"' for key, value in zip(keys, values))
+        return f"#EXTINF:{duration}{attributes},{title}"
+
+    def __repr__(self):
+        return f"Channel({self.name!r}, {self.url!r})"
+
+
+def host_of(url):
+    """Geef de host (netloc) van een URL terug, in kleine letters"""
+    match = HOST_RE.match(url)
+    return match.group(1).lower() if match else ""
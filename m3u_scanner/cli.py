@@ -0,0 +1,211 @@
+import sys
+import argparse
+
+from .batch import PlaylistBatch, is_batch
+from .i18n import TRANSLATIONS
+from .metrics import ERROR_KINDS, MetricsExporter
+from .protocols import DEFAULT_TIMEOUTS
+from .scanner import M3UScanner, BACKENDS
+from .watch import PlaylistWatcher
+
+
+def protocol_timeout(value):
+    """argparse-type voor --protocol-timeout SOORT=SECONDEN"""
+    kind, _, seconds = value.partition("=")
+    if kind not in DEFAULT_TIMEOUTS:
+        raise argparse.ArgumentTypeError(f"onbekende soort '{kind}', kies uit: {', '.join(DEFAULT_TIMEOUTS)}")
+    try:
+        return kind, float(seconds)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ongeldig aantal seconden: '{seconds}'")
+
+
+def retry_count(value):
+    """argparse-type voor --retry SOORT=AANTAL"""
+    kind, _, count = value.partition("=")
+    if kind not in ERROR_KINDS:
+        raise argparse.ArgumentTypeError(f"onbekende soort '{kind}', kies uit: {', '.join(ERROR_KINDS)}")
+    try:
+        return kind, int(count)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ongeldig aantal: '{count}'")
+
+
+def build_parser():
+    """Maak de argumentparser voor m3u-scan"""
+    parser = argparse.ArgumentParser(
+        prog="m3u-scan",
+        description="Controleer welke zenders in een M3U-afspeellijst werken (zonder GUI)",
+    )
+    parser.add_argument("playlist", nargs="+",
+                        help="pad of http(s)-URL van de M3U-afspeellijst; meerdere, een map of een glob scant alles als één batch")
+    parser.add_argument("-t", "--timeout", type=int, default=5, help="timeout per zender in seconden (standaard: 5)")
+    parser.add_argument("--connect-timeout", type=float, help="max. tijd om te verbinden in seconden (standaard: gelijk aan --timeout)")
+    parser.add_argument("--fixed-timeouts", dest="adaptive_timeouts", action="store_false", help="timeouts niet per host aanpassen aan de gemeten latentie")
+    parser.add_argument("--protocol-timeout", type=protocol_timeout, action="append", default=[], metavar="SOORT=SECONDEN",
+                        help="leestimeout voor rtmp/rtsp, of luistertijd voor udp (standaard udp=2), mag vaker")
+    parser.add_argument("--breaker", type=int, default=5, help="sla een host over na zoveel verbindingsfouten op rij, 0 = nooit (standaard: 5)")
+    parser.add_argument("--retry", type=retry_count, action="append", default=[], metavar="SOORT=AANTAL",
+                        help="herhalingen per soort fout (standaard 1 voor connect_timeout, read_timeout, "
+                             "connection_reset en http_5xx), 0 = alleen in de tweede ronde, mag vaker")
+    parser.add_argument("--retry-backoff", type=float, default=0.5, help="basiswachttijd voor een herhaling in seconden, verdubbelt per poging (standaard: 0.5)")
+    parser.add_argument("--no-second-pass", dest="second_pass", action="store_false", help="URL's die na de herhalingen nog mislukken niet na de scan opnieuw controleren")
+    parser.add_argument("--second-pass-workers", type=int, help="gelijktijdige probes in de tweede ronde (standaard: een kwart van --workers of --concurrency)")
+    parser.add_argument("-w", "--workers", type=int, default=10, help="aantal gelijktijdige verbindingen (standaard: 10)")
+    parser.add_argument("-b", "--backend", choices=BACKENDS, default="threads", help="probe-engine: threads (requests) of async (aiohttp)")
+    parser.add_argument("-c", "--concurrency", type=int, default=500, help="max. gelijktijdige probes voor de async backend (standaard: 500)")
+    parser.add_argument("-p", "--processes", type=int, default=0,
+                        help="verdeel de probes op host over zoveel processen, 0 of 1 = alles in dit proces (standaard: 0)")
+    parser.add_argument("--per-host", type=int, default=4, help="max. gelijktijdige probes per host, 0 = geen limiet (standaard: 4)")
+    parser.add_argument("--pool-size", type=int, default=20, help="aantal hosts waarnaar elke worker verbindingen openhoudt (standaard: 20)")
+    parser.add_argument("--no-pre-resolve", dest="pre_resolve", action="store_false", help="hostnamen niet vooraf opzoeken")
+    parser.add_argument("--dns-ttl", type=int, default=300, help="geldigheid van DNS-resultaten in seconden (standaard: 300)")
+    parser.add_argument("--cache", metavar="PAD", help="SQLite-bestand met eerdere resultaten; recent gecontroleerde URL's worden overgeslagen")
+    parser.add_argument("--cache-ttl", type=int, default=3600, help="hoe lang een cacheresultaat geldig is in seconden (standaard: 3600)")
+    parser.add_argument("--recheck-inactive", action="store_true", help="eerder inactieve zenders altijd opnieuw controleren")
+    parser.add_argument("--window", type=int, default=10000, help="max. aantal zenders tegelijk in behandeling; de verdeling over hosts kijkt niet verder vooruit (standaard: 10000)")
+    parser.add_argument("-g", "--group", action="append", metavar="GROEP", help="alleen zenders met deze group-title controleren (mag vaker)")
+    parser.add_argument("--deep", action="store_true", help="actieve zenders inhoudelijk controleren (HLS-segment, MPEG-TS-syncbytes, HTML-foutpagina's)")
+    parser.add_argument("--deep-workers", type=int, default=4, help="gelijktijdige diepe controles (standaard: 4)")
+    parser.add_argument("--deep-bytes", type=int, default=65536, help="max. aantal bytes per verzoek bij de diepe controle (standaard: 65536)")
+    parser.add_argument("--resume", action="store_true", help="ga verder met een afgebroken scan; al gecontroleerde zenders worden overgeslagen")
+    parser.add_argument("--watch", type=float, metavar="SECONDEN",
+                        help="blijf draaien: haal de afspeellijsten elke zoveel seconden opnieuw op en publiceer de actieve zenders")
+    parser.add_argument("--recheck", type=float, default=0.1,
+                        help="deel van de al gecontroleerde URL's dat in --watch per ronde opnieuw gecontroleerd wordt (standaard: 0.1)")
+    parser.add_argument("--loaders", type=int, default=4, help="afspeellijsten die in batchmodus tegelijk geladen worden (standaard: 4)")
+    parser.add_argument("--metrics-file", metavar="PAD", help="schrijf meetgegevens (Prometheus-tekstformaat) periodiek naar dit bestand")
+    parser.add_argument("--metrics-port", type=int, metavar="POORT", help="serveer meetgegevens op http://127.0.0.1:POORT/metrics")
+    parser.add_argument("--metrics-interval", type=float, default=5.0, help="hoe vaak --metrics-file bijgewerkt wordt in seconden (standaard: 5)")
+    parser.add_argument("-o", "--output-dir",
+                        help="uitvoermap (standaard: <bestandsnaam>_scan_results, in batchmodus batch_scan_results, met --watch watch_results)")
+    parser.add_argument("-l", "--language", choices=sorted(TRANSLATIONS), default="nl", help="taal van de logmeldingen")
+    parser.add_argument("-v", "--verbose", action="store_true", help="toon het resultaat van elke zender")
+    return parser
+
+
+# Exitcode na Ctrl+C, zoals een shell die voor SIGINT gebruikt (128 + 2)
+EXIT_INTERRUPTED = 130
+
+
+def log(message):
+    """Schrijf logmelding naar stderr (in één write, want in batchmodus loggen meerdere threads)"""
+    sys.stderr.write(message + "\n")
+    sys.stderr.flush()
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    scanner = M3UScanner(timeout=args.timeout, max_workers=args.workers, log=log, language=args.language,
+                         backend=args.backend, concurrency=args.concurrency, pool_size=args.pool_size,
+                         per_host_limit=args.per_host, pre_resolve=args.pre_resolve, dns_ttl=args.dns_ttl,
+                         cache_path=args.cache, cache_ttl=args.cache_ttl, recheck_inactive=args.recheck_inactive,
+                         window=args.window, connect_timeout=args.connect_timeout,
+                         adaptive_timeouts=args.adaptive_timeouts, breaker_threshold=args.breaker,
+                         deep=args.deep, deep_workers=args.deep_workers, deep_bytes=args.deep_bytes,
+                         protocol_timeouts=dict(args.protocol_timeout), processes=args.processes,
+                         retries=dict(args.retry), retry_backoff=args.retry_backoff, second_pass=args.second_pass,
+                         second_pass_workers=args.second_pass_workers)
+    messages = scanner.messages
+    connections = args.concurrency if args.backend == "async" else args.workers
+
+    groups = set(args.group) if args.group else None
+
+    exporter = None
+    if args.metrics_file or args.metrics_port is not None:
+        try:
+            exporter = MetricsExporter(scanner, args.metrics_file, args.metrics_port, args.metrics_interval).start()
+        except OSError as e:
+            scanner.log(messages["log_error_metrics"] + str(e))
+            return 1
+
+    if args.watch is not None:
+        return watch(scanner, args, groups, exporter)
+
+    # Resultaten gaan direct naar de uitvoerbestanden; er blijft niets in het geheugen
+    try:
+        if is_batch(args.playlist):
+            # Eén scan over alle afspeellijsten; elke afspeellijst krijgt eigen uitvoer
+            writer = PlaylistBatch(scanner, args.playlist, args.output_dir, loaders=args.loaders)
+            scanner.log(messages["log_batch"].format(count=len(writer.playlists), output_dir=writer.output_dir))
+            writer.open(resume=args.resume)
+            channels = writer.channels(groups)
+        else:
+            playlist = args.playlist[0]
+            scanner.log(messages["log_start_scan"] + playlist)
+            scanner.open_journal(playlist, args.output_dir, resume=args.resume)
+            writer = scanner.open_writer(playlist, args.output_dir)
+            # De afspeellijst wordt gestreamd: de scan begint terwijl er nog gelezen wordt
+            channels = scanner.iter_playlist(playlist)
+            if groups:
+                channels = (channel for channel in channels if channel.group in groups)
+    except IOError as e:
+        scanner.log(messages["log_error_saving"] + str(e))
+        return 1
+    scanner.log(messages["log_timeout"] + str(args.timeout) + " seconden, " + messages["log_max_connections"] + str(connections))
+    scanner.log(messages["log_scanning"])
+
+    interrupted = False
+    try:
+        for channel, is_active, error_message in scanner.scan(channels):
+            writer.write(channel, is_active, error_message)
+
+            if args.verbose:
+                status = "OK  " if is_active else "FOUT"
+                suffix = "" if is_active else f"  ({error_message})"
+                print(f"{status} {channel.name} - {channel.url}{suffix}", flush=True)
+    except KeyboardInterrupt:
+        interrupted = True
+        scanner.stop()
+        scanner.log(messages["log_scan_stopped"])
+    except BaseException:
+        writer.abort()
+        raise
+    finally:
+        if exporter is not None:
+            exporter.stop()
+
+    if not writer.active_count and not writer.inactive_count:
+        writer.discard()
+        scanner.log(messages["log_no_channels"])
+        return EXIT_INTERRUPTED if interrupted else 1
+
+    scanner.log("=" * 60)
+    scanner.log(messages["log_scan_completed"] + str(writer.active_count + writer.inactive_count) + " zenders gecontroleerd")
+    scanner.log(messages["log_active_channels"] + str(writer.active_count))
+    scanner.log(messages["log_inactive_channels"] + str(writer.inactive_count))
+    scanner.log("=" * 60)
+
+    try:
+        paths = writer.close(scanner.report_summary(writer.active_count + writer.inactive_count))
+    except IOError as e:
+        scanner.log(messages["log_error_saving"] + str(e))
+        return 1
+    scanner.log(messages["log_results_saved"])
+    for path in paths:
+        scanner.log(f"- {path}")
+
+    # De resultaten tot de onderbreking zijn opgeslagen, maar de scan is niet compleet
+    return EXIT_INTERRUPTED if interrupted else 0
+
+
+def watch(scanner, args, groups, exporter):
+    """--watch: bewaak de afspeellijsten tot Ctrl+C"""
+    watcher = PlaylistWatcher(scanner, args.playlist, args.output_dir, interval=args.watch, recheck=args.recheck,
+                              groups=groups)
+    scanner.log(scanner.messages["log_watch"].format(count=len(watcher.playlists), interval=args.watch,
+                                                     output_dir=watcher.output_dir))
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        watcher.stop()
+        scanner.log(scanner.messages["log_scan_stopped"])
+        return EXIT_INTERRUPTED
+    except IOError as e:
+        scanner.log(scanner.messages["log_error_saving"] + str(e))
+        return 1
+    finally:
+        if exporter is not None:
+            exporter.stop()
+    return 0
@@ -0,0 +1,130 @@
+import time
+import socket
+import ipaddress
+import threading
+import concurrent.futures
+from urllib.parse import urlparse
+
+def hostname_of(url):
+    """Geef de hostnaam (zonder poort of inloggegevens) van een URL terug"""
+    try:
+        return urlparse(url).hostname or ""
+    except ValueError:
+        return ""
+
+
+def system_resolver(hostname):
+    """Standaard resolver: getaddrinfo, geeft een lijst (family, adres) terug
+
+    Een resolver is elke callable met deze vorm; bij een mislukte lookup
+    gooit hij socket.gaierror (tests kunnen zo een stub meegeven).
+    """
+    addresses = []
+    for family, _, _, _, sockaddr in socket.getaddrinfo(hostname, None, proto=socket.IPPROTO_TCP):
+        if (family, sockaddr[0]) not in addresses:
+            addresses.append((family, sockaddr[0]))
+    return addresses
+
+
+class DNSEntry:
+    __slots__ = ("addresses", "error", "expires")
+
+    def __init__(self, addresses, error, expires):
+        self.addresses = addresses
+        self.error = error
+        self.expires = expires
+
+    @property
+    def failed(self):
+        """Mislukte lookup: NXDOMAIN, maar ook een tijdelijke fout (EAI_AGAIN, timeout)"""
+        return bool(self.error)
+
+
+class DNSCache:
+    """Thread-safe DNS-cache met TTL; hostnamen kunnen op de achtergrond vooruit opgezocht worden
+
+    Ook mislukte lookups worden bewaard, negative_ttl seconden lang; elke soort
+    fout, zodat een haperende resolver niet voor elke zender opnieuw zijn
+    timeout kost.
+    """
+
+    def __init__(self, resolver=None, ttl=300, negative_ttl=60, max_workers=32):
+        self.resolver = resolver or system_resolver
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_workers = max_workers
+        self._entries = {}
+        self._inflight = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def get(self, hostname):
+        """Geef de geldige cache-entry voor hostname terug, of None"""
+        with self._lock:
+            entry = self._entries.get(hostname)
+        if entry is not None and entry.expires > time.monotonic():
+            return entry
+        return None
+
+    def resolve(self, hostname):
+        """Resolve hostname via de cache; IP-adressen worden niet opgezocht
+
+        Vragen meerdere threads tegelijk dezelfde host op, dan doet er één de
+        lookup en wachten de anderen op dat resultaat.
+        """
+        entry = self.get(hostname)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            future = self._inflight.get(hostname)
+            owner = future is None
+            if owner:
+                future = self._inflight[hostname] = concurrent.futures.Future()
+        if not owner:
+            return future.result()
+
+        try:
+            entry = self._lookup(hostname)
+            with self._lock:
+                self._entries[hostname] = entry
+            future.set_result(entry)
+            return entry
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[hostname]
+
+    def _lookup(self, hostname):
+        try:
+            address = ipaddress.ip_address(hostname)
+            family = socket.AF_INET6 if address.version == 6 else socket.AF_INET
+            return DNSEntry([(family, hostname)], "", float("inf"))
+        except ValueError:
+            pass
+        try:
+            return DNSEntry(self.resolver(hostname), "", time.monotonic() + self.ttl)
+        except (socket.gaierror, UnicodeError) as e:
+            return DNSEntry([], str(e), time.monotonic() + self.negative_ttl)
+
+    def prefetch(self, hostname):
+        """Start de lookup van hostname op de achtergrond (niet-blokkerend)"""
+        if hostname and self.get(hostname) is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="dns")
+            self._executor.submit(self.resolve, hostname)
+
+    def cancel_prefetch(self):
+        """Annuleer de vooruit geplande lookups die nog niet begonnen zijn"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def lookup_failed(self, hostname):
+        entry = self.get(hostname)
+        return entry is not None and entry.failed
@@ -0,0 +1,96 @@
+import time
+import threading
+from collections import deque
+
+
+class HostState:
+    __slots__ = ("latencies", "limit", "failures", "open_until", "tripped")
+
+    def __init__(self, samples):
+        self.latencies = deque(maxlen=samples)
+        self.limit = None  # afgeleide timeout, None zolang er te weinig metingen zijn
+        self.failures = 0  # opeenvolgende verbindingsfouten
+        self.open_until = 0.0
+        self.tripped = False
+
+
+class HostHealth:
+    """Adaptieve timeouts en een circuit breaker per host (thread-safe)
+
+    Van elke host worden de laatste latenties bijgehouden. Zodra er genoeg
+    metingen zijn wordt de timeout factor x het 95e percentiel (nooit minder
+    dan min_timeout en nooit meer dan de ingestelde timeouts), zodat een
+    snelle host niet seconden op een dode stream wacht. Na breaker_threshold
+    verbindingsfouten op rij gaat de breaker open en falen de overige zenders
+    van die host direct; na breaker_cooldown seconden mag er weer één probe
+    door. breaker_threshold 0 schakelt de breaker uit.
+    """
+
+    def __init__(self, connect_timeout, read_timeout, adaptive=True, factor=3.0, min_timeout=0.5,
+                 samples=50, min_samples=5, breaker_threshold=5, breaker_cooldown=60):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.adaptive = adaptive
+        self.factor = factor
+        self.min_timeout = min_timeout
+        self.samples = samples
+        self.min_samples = min_samples
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState(self.samples)
+        return state
+
+    def timeouts(self, host):
+        """(connect_timeout, read_timeout) voor de volgende probe naar host"""
+        state = self._hosts.get(host)
+        limit = state.limit if state is not None else None
+        if limit is None:
+            return self.connect_timeout, self.read_timeout
+        return min(self.connect_timeout, limit), min(self.read_timeout, limit)
+
+    def allow(self, host):
+        """Mag er een probe naar host? False zolang de breaker open staat"""
+        if not self.breaker_threshold:
+            return True
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None or state.failures < self.breaker_threshold:
+                return True
+            now = time.monotonic()
+            if now < state.open_until:
+                return False
+            # Half open: één proefprobe, de rest wacht weer een cooldown
+            state.open_until = now + self.breaker_cooldown
+            return True
+
+    def success(self, host, latency):
+        """De host gaf antwoord (ongeacht de statuscode) na latency seconden"""
+        with self._lock:
+            state = self._state(host)
+            state.failures = 0
+            state.latencies.append(latency)
+            if self.adaptive and len(state.latencies) >= self.min_samples:
+                ordered = sorted(state.latencies)
+                p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+                state.limit = max(self.min_timeout, p95 * self.factor)
+
+    def failure(self, host):
+        """Verbinden met host is mislukt (geweigerd, onbereikbaar of connect-timeout)"""
+        with self._lock:
+            state = self._state(host)
+            state.failures += 1
+            if self.breaker_threshold and state.failures >= self.breaker_threshold and not state.open_until > time.monotonic():
+                state.open_until = time.monotonic() + self.breaker_cooldown
+                state.tripped = True
+
+    @property
+    def tripped_hosts(self):
+        """Aantal hosts waarvan de breaker minstens één keer open is gegaan"""
+        with self._lock:
+            return sum(1 for state in self._hosts.values() if state.tripped)
@@ -0,0 +1,146 @@
+"""Vertalingen voor de GUI en de scanner-engine"""
+
+TRANSLATIONS = {
+    "nl": {
+        "title": "M3U Scanner",
+        "file_frame": "M3U Bestand",
+        "browse_file": "Selecteer Bestand",
+        "options_frame": "Scanopties",
+        "timeout": "Timeout (seconden):",
+        "connections": "Gelijktijdige verbindingen:",
+        "per_host": "Max. per host:",
+        "column_name": "Naam",
+        "column_host": "Host",
+        "column_status": "Status",
+        "column_latency": "Latentie (s)",
+        "filter": "Filter:",
+        "min_latency": "Min. latentie (s):",
+        "start_scan": "Start Scan",
+        "stop_scan": "Stop Scan",
+        "progress_label": "Gereed: 0/0 zenders",
+        "log_tab": "Log",
+        "active_tab": "Actieve Zenders (0)",
+        "inactive_tab": "Inactieve Zenders (0)",
+        "status_bar": "Gereed",
+        "file_menu": "Bestand",
+        "open_file": "Open M3U Bestand",
+        "exit": "Afsluiten",
+        "action_menu": "Acties",
+        "save_results": "Resultaten Opslaan",
+        "help_menu": "Help",
+        "about": "Over",
+        "language_menu": "Taal",
+        "english": "Engels",
+        "dutch": "Nederlands",
+        "error_no_file": "Selecteer eerst een M3U-bestand",
+        "log_selected_file": "Bestand geselecteerd: ",
+        "log_start_scan": "Start scan van: ",
+        "log_timeout": "Timeout: ",
+        "log_max_connections": "Max verbindingen: ",
+        "log_no_channels": "Geen zenders gevonden in de afspeellijst",
+        "log_found_channels": "Gevonden: ",
+        "log_scanning": "Scannen...",
+        "log_scan_stopped": "Scan gestopt door gebruiker",
+        "log_scan_completed": "SCAN VOLTOOID: ",
+        "log_active_channels": "ACTIEVE ZENDERS: ",
+        "log_inactive_channels": "INACTIEVE ZENDERS: ",
+        "log_download_playlist": "Afspeellijst downloaden van URL: ",
+        "log_load_playlist": "Afspeellijst laden van bestand: ",
+        "log_invalid_format": "Waarschuwing: Bestand is mogelijk niet in geldig M3U-formaat",
+        "log_error_downloading": "Fout bij downloaden afspeellijst: ",
+        "log_error_reading": "Fout bij lezen afspeellijst: ",
+        "log_error_scanning": "Fout tijdens scan: ",
+        "log_results_saved": "Resultaten opgeslagen in:",
+        "log_error_saving": "Fout bij opslaan resultaten: ",
+        "log_connection_reuse": "Hergebruik verbindingen: ",
+        "log_duplicates": "{unique} unieke URL's, {saved} probes bespaard door dubbele URL's",
+        "log_cache_hits": "Cache: {cached} zenders recent gecontroleerd, {remaining} worden opnieuw gescand",
+        "log_dns_resolved": "DNS: {hosts} hosts opgezocht, {failed} niet gevonden ({channels} zenders direct inactief)",
+        "log_errors": "Fouten per soort: ",
+        "log_error_metrics": "Fout bij het starten van de metrics-export: ",
+        "log_batch": "Batchscan van {count} afspeellijsten naar {output_dir}",
+        "log_retries": "Herhalingen: {retries} probes direct herhaald, {deferred} URL's in de tweede ronde; {recovered} van {failed} zenders alsnog actief",
+        "log_second_pass": "Tweede ronde: {count} mislukte URL's opnieuw controleren, {workers} tegelijk",
+        "log_watch": "Bewaken van {count} afspeellijsten, elke {interval} seconden, naar {output_dir}",
+        "log_watch_cycle": "{new} nieuwe en {recheck} eerder gecontroleerde URL's controleren, {removed} verdwenen",
+        "log_watch_not_modified": "Niet gewijzigd: ",
+        "log_watch_published": "{active} van {total} zenders actief: {path}",
+        "log_resume": "Scan hervatten: {done} URL's waren al gecontroleerd",
+        "log_breaker": "Circuit breaker: {hosts} hosts onbereikbaar, {channels} zenders direct als inactief gemeld",
+        "resume": "Vorige scan hervatten",
+        "deep": "Diepe controle",
+        "log_deep": "Diepe controle: {checked} actieve zenders inhoudelijk gecontroleerd, {failed} afgekeurd",
+        "about_text": "M3U Scanner v1.0\n\nEen tool om M3U-afspeellijsten te scannen en te controleren of de zenders actief zijn.\n\nGebruik:\n1. Selecteer een M3U-bestand\n2. Pas eventueel de scanopties aan\n3. Klik op 'Start Scan'\n4. Resultaten worden automatisch opgeslagen"
+    },
+    "en": {
+        "title": "M3U Scanner",
+        "file_frame": "M3U File",
+        "browse_file": "Select File",
+        "options_frame": "Scan Options",
+        "timeout": "Timeout (seconds):",
+        "connections": "Concurrent connections:",
+        "per_host": "Max. per host:",
+        "column_name": "Name",
+        "column_host": "Host",
+        "column_status": "Status",
+        "column_latency": "Latency (s)",
+        "filter": "Filter:",
+        "min_latency": "Min. latency (s):",
+        "start_scan": "Start Scan",
+        "stop_scan": "Stop Scan",
+        "progress_label": "Ready: 0/0 channels",
+        "log_tab": "Log",
+        "active_tab": "Active Channels (0)",
+        "inactive_tab": "Inactive Channels (0)",
+        "status_bar": "Ready",
+        "file_menu": "File",
+        "open_file": "Open M3U File",
+        "exit": "Exit",
+        "action_menu": "Actions",
+        "save_results": "Save Results",
+        "help_menu": "Help",
+        "about": "About",
+        "language_menu": "Language",
+        "english": "English",
+        "dutch": "Dutch",
+        "error_no_file": "Please select an M3U file first",
+        "log_selected_file": "File selected: ",
+        "log_start_scan": "Starting scan of: ",
+        "log_timeout": "Timeout: ",
+        "log_max_connections": "Max connections: ",
+        "log_no_channels": "No channels found in the playlist",
+        "log_found_channels": "Found: ",
+        "log_scanning": "Scanning...",
+        "log_scan_stopped": "Scan stopped by user",
+        "log_scan_completed": "SCAN COMPLETED: ",
+        "log_active_channels": "ACTIVE CHANNELS: ",
+        "log_inactive_channels": "INACTIVE CHANNELS: ",
+        "log_download_playlist": "Downloading playlist from URL: ",
+        "log_load_playlist": "Loading playlist from file: ",
+        "log_invalid_format": "Warning: File may not be in valid M3U format",
+        "log_error_downloading": "Error downloading playlist: ",
+        "log_error_reading": "Error reading playlist: ",
+        "log_error_scanning": "Error during scan: ",
+        "log_results_saved": "Results saved in:",
+        "log_error_saving": "Error saving results: ",
+        "log_connection_reuse": "Connection reuse: ",
+        "log_duplicates": "{unique} unique URLs, {saved} probes saved on duplicate URLs",
+        "log_cache_hits": "Cache: {cached} channels checked recently, {remaining} will be scanned",
+        "log_dns_resolved": "DNS: {hosts} hosts resolved, {failed} failed ({channels} channels marked inactive)",
+        "log_errors": "Errors by kind: ",
+        "log_error_metrics": "Error starting the metrics export: ",
+        "log_batch": "Batch scan of {count} playlists into {output_dir}",
+        "log_retries": "Retries: {retries} probes retried directly, {deferred} URLs in the second pass; {recovered} of {failed} channels recovered",
+        "log_second_pass": "Second pass: re-checking {count} failed URLs, {workers} at a time",
+        "log_watch": "Watching {count} playlists every {interval} seconds into {output_dir}",
+        "log_watch_cycle": "Checking {new} new and {recheck} previously checked URLs, {removed} removed",
+        "log_watch_not_modified": "Not modified: ",
+        "log_watch_published": "{active} of {total} channels active: {path}",
+        "log_resume": "Resuming scan: {done} URLs were already checked",
+        "log_breaker": "Circuit breaker: {hosts} hosts unreachable, {channels} channels marked inactive without a probe",
+        "resume": "Resume previous scan",
+        "deep": "Deep validation",
+        "log_deep": "Deep validation: {checked} active channels checked, {failed} rejected",
+        "about_text": "M3U Scanner v1.0\n\nA tool to scan M3U playlists and check if the channels are active.\n\nUsage:\n1. Select an M3U file\n2. Adjust scan options if needed\n3. Click 'Start Scan'\n4. Results are saved automatically"
+    }
+}
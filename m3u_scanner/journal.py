@@ -0,0 +1,74 @@
+import os
+import json
+import time
+
+from .cache import normalize_url
+
+JOURNAL_FILE = "scan.journal"
+
+
+class ScanJournal:
+    """Logboek van afgeronde zenders waarmee een afgebroken scan hervat kan worden
+
+    Elke regel is een JSON-lijst [url, is_active, error, latency]. Regels worden
+    gebufferd toegevoegd en minstens elke sync_interval seconden naar schijf
+    geforceerd; een half geschreven laatste regel na een crash wordt genegeerd.
+    Heeft dezelfde get/put-vorm als ResultCache.
+    """
+
+    def __init__(self, path, resume=False, sync_interval=1.0):
+        self.path = path
+        self.sync_interval = sync_interval
+        self.results = {}  # ingelezen resultaten: genormaliseerde URL -> (is_active, error, latency)
+        complete = True
+        if resume:
+            complete = self._load()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+        if not complete:
+            self._file.write("\n")  # begin na een afgebroken regel op een nieuwe regel
+        self.last_sync = time.monotonic()
+
+    def _load(self):
+        """Lees een bestaand logboek in; geeft False als de laatste regel afgebroken is"""
+        line = "\n"
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        url, is_active, error, latency = json.loads(line)
+                    except ValueError:
+                        continue  # afgebroken regel
+                    self.results[url] = (bool(is_active), error, latency)
+        except FileNotFoundError:
+            pass
+        return line.endswith("\n")
+
+    def __len__(self):
+        return len(self.results)
+
+    def get(self, url):
+        """Geef (is_active, error, latency) terug als de zender al gecontroleerd is, anders None"""
+        return self.results.get(normalize_url(url))
+
+    def put(self, channel, is_active):
+        """Leg het resultaat van een zender vast (alleen vanuit de thread die de resultaten verwerkt)"""
+        error = "" if is_active else channel.error
+        self._file.write(json.dumps([normalize_url(channel.url), is_active, error, channel.latency]) + "\n")
+        if time.monotonic() - self.last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.last_sync = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def remove(self):
+        """Sluit en verwijder het logboek (de scan is volledig afgerond)"""
+        self.close()
+        os.remove(self.path)
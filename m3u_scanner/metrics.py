@@ -0,0 +1,415 @@
+"""Meetgegevens van een scan: tijden per probe, per host, doorvoer en soorten fouten
+
+ScanMetrics verzamelt alles tijdens de scan (thread-safe) en roept voor elke
+probe de opgegeven callbacks aan met een ProbeEvent. MetricsExporter zet de
+stand in Prometheus-tekstformaat in een bestand en/of op een lokale
+HTTP-poort.
+"""
+import os
+import ssl
+import time
+import errno
+import socket
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PHASES = ("dns", "connect", "tls", "first_byte")
+# Grenzen (seconden) van de histogrammen per fase
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+ERROR_KINDS = (
+    "dns", "connect_refused", "connect_timeout", "unreachable", "tls", "read_timeout",
+    "connection_reset", "http_4xx", "http_5xx", "protocol", "content", "breaker", "other",
+)
+
+# Namen van fouttypes uit requests/urllib3/aiohttp, zodat die hier niet geïmporteerd hoeven te worden
+DNS_ERRORS = ("NameResolutionError",)
+CONNECT_TIMEOUTS = ("ConnectTimeout", "ConnectTimeoutError", "ConnectionTimeoutError")
+READ_TIMEOUTS = ("ReadTimeout", "ReadTimeoutError", "SocketTimeoutError", "ServerTimeoutError")
+RESET_ERRORS = ("RemoteDisconnected", "ProtocolError", "ServerDisconnectedError", "ClientPayloadError",
+                "ChunkedEncodingError")
+UNREACHABLE_ERRNOS = {errno.ENETUNREACH, errno.EHOSTUNREACH, errno.EHOSTDOWN}
+
+# Meldingen die geen exception als bron hebben: (begin van de melding, soort)
+MESSAGE_KINDS = (
+    ("DNS lookup failed", "dns"),
+    ("Host overgeslagen", "breaker"),
+    ("Diepe controle", "content"),
+    ("RTSP", "protocol"),
+    ("RTMP", "protocol"),
+    ("Geen RTSP", "protocol"),
+    ("Geen UDP", "protocol"),
+    ("Onverwachte RTMP", "protocol"),
+    ("Ongeldige poort", "protocol"),
+    ("Geen poort", "protocol"),
+)
+
+
+def exception_chain(e):
+    """De exception en alles wat hij omhult (reason, os_error, args[0], __cause__, __context__)
+
+    Na "raise ... from None" wordt __context__ niet gevolgd.
+    """
+    seen = set()
+    while e is not None and id(e) not in seen:
+        seen.add(id(e))
+        yield e
+        inner = None
+        for candidate in (getattr(e, "reason", None), getattr(e, "os_error", None),
+                          e.args[0] if e.args else None, e.__cause__,
+                          None if e.__suppress_context__ else e.__context__):
+            if isinstance(candidate, BaseException):
+                inner = candidate
+                break
+        e = inner
+
+
+def classify_exception(e):
+    """Soort fout (zie ERROR_KINDS) voor een exception van een probe"""
+    for error in exception_chain(e):
+        name = type(error).__name__
+        if isinstance(error, socket.gaierror) or name in DNS_ERRORS:
+            return "dns"
+        if isinstance(error, ssl.SSLError) or "SSL" in name or "Certificate" in name:
+            return "tls"
+        if name in CONNECT_TIMEOUTS:
+            return "connect_timeout"
+        if isinstance(error, ConnectionRefusedError):
+            return "connect_refused"
+        if isinstance(error, ConnectionResetError) or name in RESET_ERRORS:
+            return "connection_reset"
+        if isinstance(error, OSError) and error.errno in UNREACHABLE_ERRNOS:
+            return "unreachable"
+        if name in READ_TIMEOUTS or isinstance(error, TimeoutError):
+            return "read_timeout"
+    return "other"
+
+
+def describe_error(e):
+    """Korte foutmelding "soort: oorzaak" in plaats van de lange str(e) van requests/aiohttp"""
+    chain = list(exception_chain(e))
+    detail = ""
+    for error in reversed(chain):
+        if isinstance(error, OSError) and error.strerror:
+            detail = error.strerror
+            break
+    if not detail:
+        detail = str(chain[-1]) or type(chain[-1]).__name__
+        # "HTTPConnectionPool(host='x', port=80): Read timed out." -> "Read timed out."
+        detail = detail.split("): ", 1)[-1]
+    return f"{classify_exception(e)}: {detail}"
+
+
+def error_kind(message):
+    """Soort fout bij een foutmelding uit een resultaat (ook uit cache, logboek of shard)"""
+    kind = message.partition(":")[0]
+    if kind in ERROR_KINDS:
+        return kind
+    if message.startswith("Status code: "):
+        code = message[13:]
+        if code[:1] == "4":
+            return "http_4xx"
+        if code[:1] == "5":
+            return "http_5xx"
+        return "other"
+    for prefix, kind in MESSAGE_KINDS:
+        if message.startswith(prefix):
+            return kind
+    return "other"
+
+
+class ProbeTiming:
+    """Duur van de fasen van één probe in seconden; None als een fase niet gemeten is"""
+
+    __slots__ = PHASES
+
+    def __init__(self, dns=None, connect=None, tls=None, first_byte=None):
+        self.dns = dns
+        self.connect = connect
+        self.tls = tls
+        self.first_byte = first_byte
+
+    def add(self, phase, seconds):
+        setattr(self, phase, (getattr(self, phase) or 0.0) + seconds)
+
+    def finish(self, elapsed):
+        """Wat van elapsed niet aan DNS, verbinden of TLS op ging is wachten op de eerste bytes"""
+        self.first_byte = max(0.0, elapsed - (self.connect or 0.0) - (self.tls or 0.0))
+
+    def astuple(self):
+        return tuple(getattr(self, phase) for phase in PHASES)
+
+
+_local = threading.local()
+
+
+def start_timing():
+    """Begin een nieuwe meting voor de probe in deze thread"""
+    timing = _local.timing = ProbeTiming()
+    return timing
+
+
+def current_timing():
+    """Meting van de probe in deze thread, of None (bijvoorbeeld bij de diepe controle)"""
+    return getattr(_local, "timing", None)
+
+
+class ProbeEvent:
+    """Wat een metrics-callback per probe krijgt"""
+
+    __slots__ = ("channel", "is_active", "error", "error_kind", "latency") + PHASES
+
+    def __init__(self, channel, is_active, error, timing):
+        self.channel = channel
+        self.is_active = is_active
+        self.error = error
+        self.error_kind = "" if is_active else error_kind(error)
+        self.latency = channel.latency
+        for phase in PHASES:
+            setattr(self, phase, getattr(timing, phase))
+
+    def __repr__(self):
+        return f"ProbeEvent({self.channel.url!r}, is_active={self.is_active}, error_kind={self.error_kind!r})"
+
+
+class HostMetrics:
+    __slots__ = ("probes", "failures", "latency_sum", "latency_max", "phase_sums", "phase_counts")
+
+    def __init__(self):
+        self.probes = 0
+        self.failures = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.phase_sums = [0.0] * len(PHASES)
+        self.phase_counts = [0] * len(PHASES)
+
+
+class ScanMetrics:
+    """Meetgegevens van één scan (thread-safe)
+
+    probe() wordt per echte probe aangeroepen met de tijden per fase en roept
+    de callbacks aan; result() telt elk opgeleverd resultaat (ook uit cache of
+    van een dubbele URL) voor de doorvoer per seconde en de soorten fouten.
+    """
+
+    def __init__(self, callbacks=()):
+        self.callbacks = list(callbacks)
+        self.started = time.monotonic()
+        self.hosts = {}
+        self.errors = Counter()
+        self.results = 0
+        self.active = 0
+        self.series = []  # opgeleverde resultaten per seconde sinds de start
+        self.buckets = {phase: [0] * (len(BUCKETS) + 1) for phase in PHASES + ("total",)}
+        self.sums = dict.fromkeys(PHASES + ("total",), 0.0)
+        self._lock = threading.Lock()
+
+    def probe(self, channel, is_active, error_message, timing):
+        event = ProbeEvent(channel, is_active, error_message, timing)
+        with self._lock:
+            host = self.hosts.get(channel.host)
+            if host is None:
+                host = self.hosts[channel.host] = HostMetrics()
+            host.probes += 1
+            host.failures += not is_active
+            if event.latency is not None:
+                host.latency_sum += event.latency
+                host.latency_max = max(host.latency_max, event.latency)
+                self._observe("total", event.latency)
+            for i, phase in enumerate(PHASES):
+                seconds = getattr(timing, phase)
+                if seconds is not None:
+                    host.phase_sums[i] += seconds
+                    host.phase_counts[i] += 1
+                    self._observe(phase, seconds)
+        for callback in self.callbacks:
+            callback(event)
+
+    def _observe(self, phase, seconds):
+        buckets = self.buckets[phase]
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                buckets[i] += 1
+                break
+        else:
+            buckets[-1] += 1
+        self.sums[phase] += seconds
+
+    def result(self, is_active, error_message):
+        second = int(time.monotonic() - self.started)
+        with self._lock:
+            if len(self.series) <= second:
+                self.series.extend([0] * (second + 1 - len(self.series)))
+            self.series[second] += 1
+            self.results += 1
+            if is_active:
+                self.active += 1
+            else:
+                self.errors[error_kind(error_message)] += 1
+
+    def throughput(self, window=10):
+        """Gemiddeld aantal resultaten per seconde over de laatste window volle seconden"""
+        with self._lock:
+            complete = self.series[:-1] if self.series else []
+        recent = complete[-window:]
+        return sum(recent) / len(recent) if recent else 0.0
+
+    def _series_rates(self):
+        """(gemiddelde, piek) van de resultaten per seconde sinds de start; aanroepen met _lock"""
+        if not self.series:
+            return 0.0, 0
+        return sum(self.series) / len(self.series), max(self.series)
+
+    def slowest_hosts(self, count=5, min_probes=3):
+        """[(host, gemiddelde latentie, probes)] van de traagste hosts"""
+        with self._lock:
+            hosts = [(host, metrics.latency_sum / metrics.probes, metrics.probes)
+                     for host, metrics in self.hosts.items() if metrics.probes >= min_probes]
+        return sorted(hosts, key=lambda item: item[1], reverse=True)[:count]
+
+    def summary(self):
+        """Regels voor het scanrapport"""
+        lines = []
+        with self._lock:
+            average, peak = self._series_rates()
+            errors = self.errors.most_common()
+        if peak:
+            lines.append(f"Doorvoer: gemiddeld {average:.1f} zenders/s, piek {peak}/s")
+        if errors:
+            lines.append("Fouten per soort: " + ", ".join(f"{kind} {count}" for kind, count in errors))
+        slowest = self.slowest_hosts()
+        if slowest:
+            lines.append("Traagste hosts: " + ", ".join(f"{host} ({latency:.2f} s, {probes} probes)"
+                                                         for host, latency, probes in slowest))
+        return lines
+
+    def prometheus(self, stats=None):
+        """Alle meetgegevens in Prometheus-tekstformaat"""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{escape_label(value)}"' for key, value in labels)
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        with self._lock:
+            metric("m3u_scan_results_total", "counter", "Opgeleverde zenders",
+                   [((("status", "active"),), self.active), ((("status", "inactive"),), self.results - self.active)])
+            metric("m3u_scan_errors_total", "counter", "Inactieve zenders per soort fout",
+                   [((("kind", kind),), count) for kind, count in sorted(self.errors.items())])
+            metric("m3u_scan_elapsed_seconds", "gauge", "Looptijd van de scan",
+                   [((), round(time.monotonic() - self.started, 3))])
+            average, peak = self._series_rates()
+            metric("m3u_scan_throughput_avg", "gauge", "Gemiddeld aantal resultaten per seconde sinds de start",
+                   [((), f"{average:.2f}")])
+            metric("m3u_scan_throughput_peak", "gauge", "Hoogste aantal resultaten in één seconde",
+                   [((), peak)])
+
+            lines.append("# HELP m3u_probe_phase_seconds Duur per fase van de probes")
+            lines.append("# TYPE m3u_probe_phase_seconds histogram")
+            for phase in PHASES + ("total",):
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), self.buckets[phase]):
+                    cumulative += count
+                    lines.append(f'm3u_probe_phase_seconds_bucket{{phase="{phase}",le="{bound}"}} {cumulative}')
+                lines.append(f'm3u_probe_phase_seconds_sum{{phase="{phase}"}} {self.sums[phase]:.6f}')
+                lines.append(f'm3u_probe_phase_seconds_count{{phase="{phase}"}} {cumulative}')
+
+            hosts = sorted(self.hosts.items())
+            metric("m3u_host_probes_total", "counter", "Probes per host",
+                   [((("host", host),), metrics.probes) for host, metrics in hosts])
+            metric("m3u_host_failures_total", "counter", "Mislukte probes per host",
+                   [((("host", host),), metrics.failures) for host, metrics in hosts])
+            metric("m3u_host_latency_seconds_sum", "counter", "Totale probeduur per host",
+                   [((("host", host),), f"{metrics.latency_sum:.6f}") for host, metrics in hosts])
+            metric("m3u_host_latency_seconds_max", "gauge", "Langste probe per host",
+                   [((("host", host),), f"{metrics.latency_max:.6f}") for host, metrics in hosts])
+            metric("m3u_host_phase_seconds_avg", "gauge", "Gemiddelde duur per fase per host",
+                   [((("host", host), ("phase", phase)), f"{metrics.phase_sums[i] / metrics.phase_counts[i]:.6f}")
+                    for host, metrics in hosts for i, phase in enumerate(PHASES) if metrics.phase_counts[i]])
+
+        metric("m3u_scan_throughput", "gauge", "Resultaten per seconde over de laatste 10 seconden",
+               [((), f"{self.throughput():.2f}")])
+        if stats is not None:
+            metric("m3u_scan_counter", "counter", "Tellers van de scan (ScanStats)",
+                   [((("name", name),), value) for name, value in sorted(stats.counters.items())])
+        return "\n".join(lines) + "\n"
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsExporter:
+    """Publiceer de meetgegevens van een scanner in Prometheus-tekstformaat
+
+    Met path wordt het bestand elke interval seconden atomair vervangen (voor
+    bijvoorbeeld de textfile-collector van node_exporter), met port serveert
+    een lokale HTTP-server /metrics. Leest steeds scanner.metrics, dus één
+    exporter kan meerdere scans na elkaar volgen.
+    """
+
+    def __init__(self, scanner, path=None, port=None, interval=5.0, host="127.0.0.1"):
+        self.scanner = scanner
+        self.path = path
+        self.port = port
+        self.interval = interval
+        self.host = host
+        self.server = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def render(self):
+        return self.scanner.metrics.prometheus(self.scanner.stats)
+
+    def write(self):
+        """Schrijf de huidige stand naar path (eerst naar een .part-bestand, dan hernoemen)"""
+        part = self.path + ".part"
+        with open(part, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(part, self.path)
+
+    def start(self):
+        if self.port is not None:
+            exporter = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] not in ("/", "/metrics"):
+                        self.send_error(404)
+                        return
+                    body = exporter.render().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass  # geen regel per request op stderr
+
+            self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+            self.server.daemon_threads = True
+            threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        if self.path is not None:
+            self.write()  # een onbruikbaar pad geeft hier al een OSError
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def stop(self):
+        """Stop de exporter; het bestand krijgt nog de eindstand"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self.write()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
@@ -0,0 +1,327 @@
+import time
+import heapq
+import queue
+import itertools
+import threading
+
+from .cache import normalize_url
+from .dns import hostname_of
+
+# Soorten berichten in de resultatenqueue
+PROBED = "probed"  # resultaat van een probe van de backend
+VALIDATED = "validated"  # resultaat van de diepe controle
+READY = "ready"    # resultaat dat zonder probe bekend is (cache of dubbele URL)
+ERROR = "error"
+FED = "fed"        # de feeder is klaar; bevat het aantal ingediende probes
+DONE = "done"
+STOPPED = "stopped"  # scanner.stop(): niet op het volgende resultaat wachten
+
+
+class ScanPipeline:
+    """Streaming scan: parsen, ontdubbelen, cache, DNS en probes lopen tegelijk
+
+    Een feeder-thread leest de zenders uit de (lazy) invoer en geeft ze door aan
+    de backend terwijl de aanroeper de resultaten al verwerkt. Er zijn nooit meer
+    dan scanner.window zenders tegelijk onderweg (ingelezen maar nog niet
+    opgeleverd), dus het geheugen hangt niet af van de grootte van de afspeellijst.
+    Daardoor ziet de planner van de backend alleen hosts binnen het window: staan
+    er meer dan window zenders van één host achter elkaar, dan wacht het inlezen
+    op die host en werkt de verdeling over hosts pas weer na dat blok. Een groter
+    window helpt dan, ten koste van geheugen.
+    Alleen per unieke URL wordt het resultaat onthouden om dubbele URL's later
+    in de lijst te kunnen beantwoorden.
+    Met scanner.deep gaan actieve HTTP-zenders daarna nog door de
+    StreamValidator, met een eigen threadpool naast de backend.
+    Probes met een tijdelijke fout (zie scanner.retry_policy) worden na een
+    wachttijd opnieuw bij de backend ingediend; de backend wordt pas gesloten
+    als er geen probes of herhalingen meer openstaan. URL's die daarna nog
+    mislukken wachten op de tweede ronde en tellen niet meer mee in het window.
+    """
+
+    def __init__(self, scanner, channels):
+        self.scanner = scanner
+        self.channels = channels
+        self.stats = scanner.stats
+        self.results = queue.Queue()
+        self.window = threading.Semaphore(scanner.window)
+        self.lock = threading.Lock()
+        self.pending = {}   # genormaliseerde URL -> [zenders die op deze probe wachten]
+        self.finished = {}  # genormaliseerde URL -> (is_active, error, latency)
+        self.hosts = set()
+        # Met shardprocessen zoekt elke shard zijn eigen hosts al op; hier nog eens zou dubbel werk zijn
+        self.prefetch = scanner.pre_resolve and scanner.processes <= 1
+        self.total = None  # aantal ingelezen zenders, zodra de invoer op is
+        self.backend = scanner.create_backend(
+            lambda result: self.results.put((PROBED, result)),
+            lambda: self.results.put((DONE, None)),
+        )
+        self.validator = scanner.create_validator(lambda result: self.results.put((VALIDATED, result)))
+        self.validating = 0
+        self.policy = scanner.retry_policy
+        self.submitted = None  # aantal probes bij de backend, zodra de feeder klaar is
+        self.resubmitted = 0
+        self.received = 0
+        self.closed = False
+        self.attempts = {}     # genormaliseerde URL -> aantal herhalingen tot nu toe
+        self.retries = []      # heap met (tijdstip, volgnummer, zender) van ingeplande herhalingen
+        self.deferred = []     # zenders voor de tweede ronde
+        self.released = set()  # genormaliseerde URL's in de tweede ronde: hun zenders tellen niet in het window
+        self.retried = set()   # genormaliseerde URL's met een vast resultaat na herhaling
+        self.second_pass = False
+        self.finished_backends = []  # de backend van de hoofdscan tijdens de tweede ronde
+        self._order = itertools.count()
+
+    def run(self):
+        """Generator met (channel, is_active, error_message) in volgorde van voltooiing"""
+        self.backend.start()
+        feeder = threading.Thread(target=self._feed, daemon=True)
+        feeder.start()
+        completed = False
+        probes_done = False
+        try:
+            while not self.scanner.stopped:
+                if probes_done and not self.validating:
+                    completed = True
+                    break
+                self._submit_retries()
+                try:
+                    kind, item = self.results.get(timeout=self._retry_wait())
+                except queue.Empty:
+                    self._submit_retries()
+                    continue
+                if kind == STOPPED:
+                    continue
+                if kind == ERROR:
+                    raise item
+                if kind == FED:
+                    self.submitted = item
+                    self.total = self.stats.get("channels")
+                    self._close_backend()
+                    continue
+                if kind == DONE:
+                    if self.deferred:
+                        self._start_second_pass()
+                    else:
+                        probes_done = True
+                    continue
+                if kind == VALIDATED:
+                    self.validating -= 1
+                if isinstance(item, Exception):
+                    raise item
+                if kind == PROBED:
+                    self.received += 1
+                    retry = not item[1] and self._retry(item[0], item[2])
+                    self._close_backend()
+                    if retry:
+                        continue
+
+                if kind == PROBED and self.validator is not None and item[1] and item[0].url.startswith(('http://', 'https://')):
+                    # Snelle probe geslaagd: de inhoud nog controleren voordat het resultaat vaststaat
+                    self.validating += 1
+                    self.validator.submit(item[0])
+                    continue
+
+                if kind == READY:
+                    self.window.release()
+                    if item[0].cached and self.scanner.journal is not None:
+                        self.scanner.journal.put(item[0], item[1])
+                    yield item
+                    continue
+
+                yield from self._fan_out(*item)
+        finally:
+            if completed:
+                if self.validator is not None:
+                    self.validator.shutdown()
+                for backend in self.finished_backends:
+                    backend.shutdown()
+                self.backend.shutdown()
+            else:
+                # Voortijdig afgebroken (Stop of de aanroeper stopt met lezen)
+                self.scanner.stop()
+                self.backend.stop()
+                if self.validator is not None:
+                    self.validator.stop()
+
+    def _retry(self, channel, error_message):
+        """Plan een herhaling of de tweede ronde in voor een mislukte probe; False als het resultaat vaststaat"""
+        if self.second_pass or not self.policy.is_transient(error_message):
+            return False
+        key = normalize_url(channel.url)
+        attempt = self.attempts.get(key, 0) + 1
+        if attempt <= self.policy.attempts(error_message):
+            # Alleen vastleggen als er echt een herhaling komt: _fan_out telt de URL dan als herhaald
+            self.attempts[key] = attempt
+            self.stats.incr("retries")
+            heapq.heappush(self.retries, (time.monotonic() + self.policy.delay(attempt), next(self._order), channel))
+            return True
+        if not self.policy.second_pass:
+            return False
+        # Tot de hoofdscan klaar is wachten, zonder de rest van de invoer op te houden
+        self.attempts[key] = attempt
+        self.stats.incr("deferred")
+        self.deferred.append(channel)
+        with self.lock:
+            self.released.add(key)
+            waiting = len(self.pending.get(key, ()))
+        for _ in range(waiting):
+            self.window.release()
+        return True
+
+    def _retry_wait(self):
+        """Hoe lang op een resultaat gewacht kan worden voor de volgende herhaling (None = onbeperkt)"""
+        if not self.retries:
+            return None
+        return max(0.0, self.retries[0][0] - time.monotonic())
+
+    def _submit_retries(self):
+        now = time.monotonic()
+        while self.retries and self.retries[0][0] <= now:
+            channel = heapq.heappop(self.retries)[2]
+            self.resubmitted += 1
+            self.backend.submit(channel)
+
+    def _close_backend(self):
+        """Sluit de backend zodra de invoer op is en er geen probe of herhaling meer openstaat"""
+        if (not self.closed and self.submitted is not None and not self.retries
+                and self.received == self.submitted + self.resubmitted):
+            self.closed = True
+            self.backend.close()
+
+    def _start_second_pass(self):
+        """De hoofdscan is klaar: controleer de uitgestelde URL's opnieuw met minder probes tegelijk"""
+        self.second_pass = True
+        self.finished_backends.append(self.backend)
+        limit = self.scanner.second_pass_limit
+        self.scanner.log(self.scanner.messages["log_second_pass"].format(count=len(self.deferred), workers=limit))
+        self.backend = self.scanner.create_backend(
+            lambda result: self.results.put((PROBED, result)),
+            lambda: self.results.put((DONE, None)),
+            limit=limit,
+        )
+        self.backend.start()
+        for channel in self.deferred:
+            self.backend.submit(channel)
+        self.deferred = []
+        self.backend.close()
+
+    def interrupt(self):
+        """Laat run() direct merken dat de scan gestopt is (aanroepbaar vanuit elke thread)"""
+        self.results.put((STOPPED, None))
+
+    def _fan_out(self, channel, is_active, error_message):
+        """Bewaar een proberesultaat en geef het door aan alle zenders met dezelfde URL"""
+        key = normalize_url(channel.url)
+        latency = channel.latency
+        if not is_active:
+            channel.error = error_message
+        if self.scanner.result_cache is not None:
+            self.scanner.result_cache.put(channel, is_active)
+        if self.scanner.journal is not None:
+            self.scanner.journal.put(channel, is_active)
+
+        with self.lock:
+            waiting = self.pending.pop(key, [channel])
+            self.finished[key] = (is_active, error_message, latency)
+            released = key in self.released
+            self.released.discard(key)
+            retried = self.attempts.pop(key, None) is not None
+            if retried:
+                self.retried.add(key)  # latere dubbele zenders tellen ook als herhaald
+
+        for waiting_channel in waiting:
+            if waiting_channel is not channel:
+                self._apply(waiting_channel, is_active, error_message, latency)
+            if retried:
+                self._count_retried(is_active)
+            if not released:
+                self.window.release()
+            yield waiting_channel, is_active, error_message
+
+    def _count_retried(self, is_active):
+        self.stats.incr("retried_channels")
+        if is_active:
+            self.stats.incr("recovered_channels")
+
+    def _apply(self, channel, is_active, error_message, latency, cached=False):
+        if not is_active:
+            channel.error = error_message
+        if latency is not None:
+            channel.latency = latency
+        if cached:
+            channel.cached = True
+        return channel, is_active, error_message
+
+    def _feed(self):
+        """Lees de invoer en verdeel elke zender over dubbele URL's, cache en backend"""
+        scanner = self.scanner
+        submitted = 0
+        try:
+            for channel in self.channels:
+                while not self.window.acquire(timeout=0.2):
+                    if scanner.stopped:
+                        return
+                if scanner.stopped:
+                    return
+                self.stats.incr("channels")
+                key = normalize_url(channel.url)
+
+                with self.lock:
+                    hit = self.finished.get(key)
+                    waiting = self.pending.get(key) if hit is None else None
+                    if waiting is not None:
+                        waiting.append(channel)
+                    released = key in self.released
+                    retried = hit is not None and key in self.retried
+                if waiting is not None and released:
+                    self.window.release()  # wacht op de tweede ronde
+                if hit is not None or waiting is not None:
+                    self.stats.incr("probes_saved")
+                    if hit is not None:
+                        if retried:
+                            self._count_retried(hit[0])
+                        self.results.put((READY, self._apply(channel, *hit)))
+                    continue
+
+                if scanner.journal is not None:
+                    # Al gecontroleerd in een eerdere, afgebroken scan
+                    hit = scanner.journal.get(channel.url)
+                    if hit is not None:
+                        self.stats.incr("resumed")
+                        with self.lock:
+                            self.finished[key] = hit
+                        self.results.put((READY, self._apply(channel, *hit)))
+                        continue
+
+                if scanner.result_cache is not None:
+                    hit = scanner.result_cache.get(channel.url)
+                    if hit is not None and not (scanner.recheck_inactive and not hit[0]):
+                        self.stats.incr("cache_hits")
+                        with self.lock:
+                            self.finished[key] = hit
+                        self.results.put((READY, self._apply(channel, *hit, cached=True)))
+                        continue
+
+                hostname = hostname_of(channel.url)
+                if scanner.pre_resolve and hostname not in self.hosts:
+                    self.hosts.add(hostname)
+                    if self.prefetch:
+                        # Los de host alvast op terwijl de zender nog in de wachtrij staat
+                        scanner.dns_cache.prefetch(hostname)
+
+                with self.lock:
+                    self.pending[key] = [channel]
+                self.stats.incr("probes")
+                submitted += 1
+                self.backend.submit(channel)
+        except Exception as e:
+            self.results.put((ERROR, e))
+        finally:
+            # De backend sluit pas als ook alle herhalingen binnen zijn (zie run)
+            self.results.put((FED, submitted))
+
+    @property
+    def failed_hosts(self):
+        if not self.prefetch:
+            return self.stats.get("dns_failed_hosts")  # opgeteld uit de shards
+        return sum(1 for hostname in self.hosts if self.scanner.dns_cache.lookup_failed(hostname))
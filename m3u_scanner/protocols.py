@@ -0,0 +1,256 @@
+"""Lichte probes voor zenders die niet via HTTP lopen
+
+RTMP: TCP-verbinding plus het begin van de handshake (C0+C1, wacht op S0+S1).
+RTSP: een OPTIONS-verzoek; 2xx/3xx betekent actief.
+UDP/RTP: kort luisteren (bij multicast na het joinen van de groep) of er
+datagrammen binnenkomen; bij multicast telt alleen verkeer voor die groep,
+en bij udp://bron@groep:poort alleen van die bron.
+
+De protocollogica staat los van de I/O, zodat zowel de thread-backend
+(probe) als de async backend (probe_async) dezelfde controles doen.
+"""
+import os
+import ssl
+import sys
+import time
+import socket
+import struct
+import asyncio
+import ipaddress
+from urllib.parse import urlsplit
+
+from .metrics import describe_error
+
+DEFAULT_PORTS = {"rtmp": 1935, "rtmps": 443, "rtsp": 554, "rtsps": 322}
+TCP_SCHEMES = ("rtmp", "rtmps", "rtsp", "rtsps")
+UDP_SCHEMES = ("udp", "rtp")
+PREFIXES = tuple(scheme + "://" for scheme in TCP_SCHEMES + UDP_SCHEMES)
+
+# Leestimeout per soort probe; None = de (adaptieve) leestimeout van de host
+DEFAULT_TIMEOUTS = {"rtmp": None, "rtsp": None, "udp": 2.0}
+
+# Zonder IP_MULTICAST_ALL=0 levert Linux op een socket het verkeer van álle groepen af die
+# op die poort gejoind zijn, ook door andere sockets (Python kent de constante niet altijd)
+IP_MULTICAST_ALL = getattr(socket, "IP_MULTICAST_ALL", 49 if sys.platform.startswith("linux") else None)
+
+RTMP_VERSION = 3
+RTMP_HANDSHAKE_SIZE = 1536
+
+
+class ProbeError(Exception):
+    """Het protocol antwoordde niet zoals verwacht"""
+
+
+class ConnectTimeout(TimeoutError):
+    """Verbinden duurde te lang; de naam geeft de soort connect_timeout (zie metrics.CONNECT_TIMEOUTS)"""
+
+
+def probe_kind(url):
+    """Soort probe voor een URL: "rtmp", "rtsp", "udp" of None"""
+    scheme = url.partition("://")[0].lower()
+    if scheme in UDP_SCHEMES:
+        return "udp"
+    if scheme in TCP_SCHEMES:
+        return scheme.rstrip("s")
+    return None
+
+
+def split_target(url):
+    """(scheme, host, port) van een niet-HTTP-URL; bij UDP mag de host leeg zijn (udp://@:1234)"""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        raise ProbeError(f"Ongeldige URL: {url}")  # bijvoorbeeld een IPv6-adres zonder ]
+    scheme = parts.scheme.lower()
+    try:
+        # udp://bron@groep:poort -> hostname is de groep
+        port = parts.port or DEFAULT_PORTS.get(scheme)
+    except ValueError:
+        raise ProbeError(f"Ongeldige poort in {url}")
+    if port is None:
+        raise ProbeError(f"Geen poort in {url}")
+    return scheme, parts.hostname or "", port
+
+
+def udp_source(url):
+    """Bronadres van udp://bron@groep:poort als ip_address, anders None (elke afzender)"""
+    try:
+        source = urlsplit(url).username
+        return ipaddress.ip_address(source) if source else None
+    except ValueError:
+        return None
+
+
+def from_source(sender, source):
+    """Komt een datagram van sender ((adres, poort, ...) van recvfrom) van de gevraagde bron?"""
+    if source is None:
+        return True
+    try:
+        return ipaddress.ip_address(sender[0].partition("%")[0]) == source
+    except ValueError:
+        return False
+
+
+def rtmp_c0c1():
+    """C0 (versie) + C1 (tijd, nullen, willekeurige bytes)"""
+    return bytes((RTMP_VERSION,)) + struct.pack(">II", 0, 0) + os.urandom(RTMP_HANDSHAKE_SIZE - 8)
+
+
+def check_rtmp_reply(data):
+    if len(data) < 1 + RTMP_HANDSHAKE_SIZE:
+        raise ProbeError("RTMP-handshake onvolledig")
+    if data[0] != RTMP_VERSION:
+        raise ProbeError(f"Onverwachte RTMP-versie: {data[0]}")
+
+
+def rtsp_options(url):
+    return f"OPTIONS {url} RTSP/1.0\r\nCSeq: 1\r\nUser-Agent: m3u-scanner\r\n\r\n".encode("utf-8")
+
+
+def check_rtsp_reply(status_line):
+    """Foutmelding bij een status buiten 2xx/3xx, anders een lege string"""
+    parts = status_line.decode("latin-1").split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("RTSP/") or not parts[1].isdigit():
+        raise ProbeError("Geen RTSP-antwoord")
+    status = int(parts[1])
+    return "" if 200 <= status < 400 else f"RTSP status code: {status}"
+
+
+def udp_socket(host, port):
+    """Niet-blokkerende UDP-socket op port; joint de multicastgroep als host er een is"""
+    try:
+        address = ipaddress.ip_address(host) if host else None
+    except ValueError:
+        address = None
+    family = socket.AF_INET6 if address is not None and address.version == 6 else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_DGRAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if address is None or not address.is_multicast:
+            # Luisteren op de poort waar de stream naartoe gestuurd wordt
+            sock.bind(("", port))
+        else:
+            # IPTV-lijsten zetten vaak veel groepen op dezelfde poort: op het groepsadres
+            # binden, zodat gelijktijdige probes elkaars verkeer niet zien. Windows kan dat niet.
+            try:
+                sock.bind((host, port))
+            except OSError:
+                sock.bind(("", port))
+            if family == socket.AF_INET:
+                if IP_MULTICAST_ALL is not None:
+                    try:
+                        sock.setsockopt(socket.IPPROTO_IP, IP_MULTICAST_ALL, 0)
+                    except OSError:
+                        pass
+                membership = struct.pack("4s4s", address.packed, socket.inet_aton("0.0.0.0"))
+                sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+            else:
+                membership = struct.pack("16sI", address.packed, 0)
+                sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_JOIN_GROUP, membership)
+        sock.setblocking(False)
+        return sock
+    except OSError:
+        sock.close()
+        raise
+
+
+def probe(url, connect_timeout, read_timeout):
+    """Controleer een niet-HTTP-zender; geeft een foutmelding of een lege string
+
+    Bij UDP is read_timeout de luistertijd. Lukt het verbinden niet, dan volgt
+    een OSError (voor de circuit breaker); ProbeError betekent dat er wel een
+    verbinding was maar geen geldig antwoord.
+    """
+    scheme, host, port = split_target(url)
+    if scheme in UDP_SCHEMES:
+        source = udp_source(url)
+        deadline = time.monotonic() + read_timeout
+        with udp_socket(host, port) as sock:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                sock.settimeout(remaining)
+                try:
+                    _, sender = sock.recvfrom(2048)
+                except socket.timeout:
+                    break
+                if from_source(sender, source):
+                    return ""
+        return f"Geen UDP-data binnen {read_timeout} seconden"
+
+    try:
+        sock = socket.create_connection((host, port), timeout=connect_timeout)
+    except TimeoutError:
+        # Anders telt een dode host als read_timeout, en in de async backend niet
+        raise ConnectTimeout(f"Verbinden met {host}:{port} duurde langer dan {connect_timeout} seconden") from None
+    try:
+        sock.settimeout(read_timeout)
+        if scheme.endswith("s"):
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=host)
+        if scheme.startswith("rtmp"):
+            sock.sendall(rtmp_c0c1())
+            data = b""
+            while len(data) < 1 + RTMP_HANDSHAKE_SIZE:
+                chunk = sock.recv(1 + RTMP_HANDSHAKE_SIZE - len(data))
+                if not chunk:
+                    break
+                data += chunk
+            check_rtmp_reply(data)
+            return ""
+        sock.sendall(rtsp_options(url))
+        with sock.makefile("rb") as reply:
+            return check_rtsp_reply(reply.readline(1024))
+    except OSError as e:
+        raise ProbeError(describe_error(e))
+    finally:
+        sock.close()
+
+
+class _DatagramWaiter(asyncio.DatagramProtocol):
+    def __init__(self, future, source=None):
+        self.future = future
+        self.source = source
+
+    def datagram_received(self, data, addr):
+        if not self.future.done() and from_source(addr, self.source):
+            self.future.set_result(data)
+
+
+async def probe_async(url, connect_timeout, read_timeout):
+    """Async variant van probe() voor de async backend"""
+    scheme, host, port = split_target(url)
+    loop = asyncio.get_running_loop()
+    if scheme in UDP_SCHEMES:
+        future = loop.create_future()
+        transport, _ = await loop.create_datagram_endpoint(lambda: _DatagramWaiter(future, udp_source(url)), sock=udp_socket(host, port))
+        try:
+            await asyncio.wait_for(future, read_timeout)
+            return ""
+        except asyncio.TimeoutError:
+            return f"Geen UDP-data binnen {read_timeout} seconden"
+        finally:
+            transport.close()
+
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(
+            host, port, ssl=ssl.create_default_context() if scheme.endswith("s") else None), connect_timeout)
+    except asyncio.TimeoutError:
+        raise ConnectTimeout(f"Verbinden met {host}:{port} duurde langer dan {connect_timeout} seconden") from None
+    try:
+        if scheme.startswith("rtmp"):
+            writer.write(rtmp_c0c1())
+            await writer.drain()
+            try:
+                data = await asyncio.wait_for(reader.readexactly(1 + RTMP_HANDSHAKE_SIZE), read_timeout)
+            except asyncio.IncompleteReadError as e:
+                data = e.partial
+            check_rtmp_reply(data)
+            return ""
+        writer.write(rtsp_options(url))
+        await writer.drain()
+        return check_rtsp_reply(await asyncio.wait_for(reader.readline(), read_timeout))
+    except (OSError, asyncio.TimeoutError) as e:
+        raise ProbeError(describe_error(e))
+    finally:
+        writer.close()
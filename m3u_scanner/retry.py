@@ -0,0 +1,36 @@
+import random
+
+from .metrics import error_kind
+
+# Soorten fouten (zie metrics.ERROR_KINDS) die vaak tijdelijk zijn, met het aantal directe herhalingen
+DEFAULT_RETRIES = {"connect_timeout": 1, "read_timeout": 1, "connection_reset": 1, "http_5xx": 1}
+
+
+class RetryPolicy:
+    """Welke mislukte probes opnieuw geprobeerd worden, en wanneer
+
+    retries geeft per soort fout het aantal directe herhalingen (aangevuld met
+    DEFAULT_RETRIES); andere soorten, zoals een 404 of een geweigerde
+    verbinding, worden nooit herhaald. Herhaling n wacht willekeurig tussen 0
+    en min(cap, backoff * 2**(n-1)) seconden ("full jitter"), zodat herhalingen
+    naar dezelfde host niet tegelijk komen. Met second_pass krijgen URL's die
+    daarna nog met zo'n fout mislukken een tweede ronde als de hoofdscan klaar
+    is (ook soorten met 0 directe herhalingen).
+    """
+
+    def __init__(self, retries=None, backoff=0.5, cap=10.0, second_pass=True):
+        self.retries = dict(DEFAULT_RETRIES, **(retries or {}))
+        self.backoff = backoff
+        self.cap = cap
+        self.second_pass = second_pass
+
+    def is_transient(self, error_message):
+        return error_kind(error_message) in self.retries
+
+    def attempts(self, error_message):
+        """Aantal directe herhalingen voor deze foutmelding"""
+        return self.retries.get(error_kind(error_message), 0)
+
+    def delay(self, attempt):
+        """Wachttijd in seconden voor herhaling attempt (vanaf 1)"""
+        return random.uniform(0, min(self.cap, self.backoff * 2 ** (attempt - 1)))
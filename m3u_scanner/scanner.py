@@ -0,0 +1,641 @@
+import os
+import time
+import socket
+import weakref
+import threading
+from urllib.parse import urlparse
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .backends import ThreadBackend
+from .cache import ResultCache
+from . import protocols
+from .channel import Channel
+from .dns import DNSCache, hostname_of
+from .health import HostHealth
+from .i18n import TRANSLATIONS
+from .journal import JOURNAL_FILE, ScanJournal
+from .metrics import ScanMetrics, current_timing, describe_error, start_timing
+from .pipeline import ScanPipeline
+from .retry import RetryPolicy
+from .stats import ScanStats
+from .writer import ResultWriter, default_output_dir
+
+BACKENDS = ("threads", "async")
+
+
+def shorten_error(error_message, limit=100):
+    """Verkort de foutmelding voor leesbaarheid"""
+    if len(error_message) > limit:
+        error_message = error_message[:limit] + "..."
+    return error_message
+
+
+def is_connect_error(e):
+    """Is de requests-fout ontstaan voordat er een verbinding was (geweigerd, onbereikbaar, connect-timeout)?"""
+    if isinstance(e, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(e, requests.exceptions.ConnectionError) and e.args:
+        return isinstance(getattr(e.args[0], "reason", e.args[0]), urllib3.exceptions.NewConnectionError)
+    return False
+
+
+def shutdown_socket(sock):
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass  # al gesloten
+
+
+class OpenSockets:
+    """De open probe-sockets van een scanner, zodat Stop ze direct kan afbreken
+
+    Een socket die na abort() nog geopend wordt, wordt meteen afgebroken.
+    """
+
+    def __init__(self):
+        self.aborted = False
+        self._sockets = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def add(self, sock):
+        with self._lock:
+            if not self.aborted:
+                self._sockets.add(sock)
+                return
+        shutdown_socket(sock)
+
+    def abort(self):
+        """Breek alle open sockets af; reads en writes die erop wachten keren direct terug met een fout"""
+        with self._lock:
+            self.aborted = True
+            sockets = list(self._sockets)
+            self._sockets.clear()
+        for sock in sockets:
+            shutdown_socket(sock)
+
+    def reset(self):
+        with self._lock:
+            self.aborted = False
+
+
+# OpenSockets van de scanner waarvoor de huidige thread probes doet (zie M3UScanner.session)
+_thread_sockets = threading.local()
+# DNSCache van die scanner, als pre_resolve aan staat; anders zoekt urllib3 zelf op
+_thread_dns = threading.local()
+
+
+class TimedConnectionMixin:
+    """Telt de duur van de TCP-verbinding op bij de meting van de lopende probe
+
+    en meldt de socket aan bij de OpenSockets van de scanner. Met een DNSCache
+    wordt verbonden met de adressen uit de cache in plaats van dat urllib3 de
+    host bij elke nieuwe verbinding opnieuw opzoekt; een host die nog niet in
+    de cache staat (zoals het doel van een redirect) wordt via de cache
+    opgezocht en telt als fase dns.
+    """
+
+    def _new_conn(self):
+        timing = current_timing()
+        start = time.perf_counter()
+        looked_up = 0.0
+        try:
+            dns_cache = getattr(_thread_dns, "cache", None)
+            if dns_cache is None:
+                return super()._new_conn()
+            hostname = self._dns_host
+            entry = dns_cache.get(hostname)
+            if entry is None:
+                entry = dns_cache.resolve(hostname)
+                looked_up = time.perf_counter() - start
+                if timing is not None:
+                    timing.add("dns", looked_up)
+            if not entry.addresses:
+                return super()._new_conn()  # mislukte lookup: urllib3 geeft de gewone NameResolutionError
+            # Zoals urllib3 zelf: de adressen om de beurt proberen. self.host leest _dns_host, maar de
+            # TLS-servernaam wordt pas na _new_conn() bepaald, als de hostnaam al terug is.
+            try:
+                for i, (_, address) in enumerate(entry.addresses):
+                    self._dns_host = address
+                    try:
+                        return super()._new_conn()
+                    except urllib3.exceptions.ConnectTimeoutError:  # ook NewConnectionError
+                        if i == len(entry.addresses) - 1:
+                            raise
+            finally:
+                self._dns_host = hostname
+        finally:
+            if timing is not None:
+                timing.add("connect", time.perf_counter() - start - looked_up)
+
+    def connect(self):
+        super().connect()
+        # Na connect(), want bij HTTPS vervangt de TLS-socket de oorspronkelijke
+        sockets = getattr(_thread_sockets, "sockets", None)
+        if sockets is not None:
+            sockets.add(self.sock)
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        # connect() = TCP-verbinding (_new_conn) + TLS-handshake
+        timing = current_timing()
+        connected = (timing.connect or 0.0) if timing is not None else 0.0
+        start = time.perf_counter()
+        super().connect()
+        if timing is not None:
+            timing.add("tls", time.perf_counter() - start - ((timing.connect or 0.0) - connected))
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter die verbindingen en TLS-handshakes meet en bij het opruimen van een pool telt
+    hoeveel verbindingen en verzoeken er waren"""
+
+    def __init__(self, stats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pools.dispose_func = self._dispose_pool
+        self.poolmanager.pool_classes_by_scheme = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
+
+    def _dispose_pool(self, pool):
+        self.stats.incr("http_requests", pool.num_requests)
+        self.stats.incr("http_connections", pool.num_connections)
+        pool.close()
+
+
+class M3UScanner:
+    """Headless scanner: laadt een M3U-afspeellijst en controleert de zenders zonder Tk
+
+    backend "threads" gebruikt max_workers threads met requests, backend "async"
+    houdt tot concurrency probes tegelijk open op één aiohttp event loop.
+    Elke worker-thread heeft een eigen requests.Session die verbindingen naar
+    maximaal pool_size hosts openhoudt (keep-alive). Zenders worden round-robin
+    over de hosts verdeeld met maximaal per_host_limit probes per host tegelijk.
+    Met pre_resolve wordt elke nieuwe hostnaam op de achtergrond opgezocht zodra
+    hij in de invoer opduikt; zenders op hosts waarvan de lookup mislukt
+    (NXDOMAIN, maar ook een timeout van de resolver) zijn dan direct inactief
+    zonder HTTP-verzoek. resolver is een callable
+    hostname -> [(family, adres)] (zie dns.system_resolver).
+    Met cache_path worden resultaten in een SQLite-cache bewaard; URL's die
+    korter dan cache_ttl seconden geleden zijn gecontroleerd worden niet opnieuw
+    geprobed (met recheck_inactive alleen de eerder actieve). Er zijn nooit meer
+    dan window zenders tegelijk ingelezen maar nog niet opgeleverd; de
+    verdeling over hosts ziet alleen die zenders (zie pipeline.ScanPipeline).
+    connect_timeout (standaard gelijk aan timeout) en timeout (lezen) zijn
+    bovengrenzen; met adaptive_timeouts worden ze per host verkort op basis
+    van de gemeten latenties. Na breaker_threshold verbindingsfouten op rij
+    worden de overige zenders van een host direct als inactief gemeld.
+    Met deep worden actieve zenders daarna inhoudelijk gecontroleerd (HLS,
+    MPEG-TS, HTML-foutpagina's) door deep_workers threads die per verzoek
+    hooguit deep_bytes lezen (zie validate.StreamValidator).
+    RTMP-, RTSP- en UDP/RTP-zenders krijgen een eigen lichte probe (zie
+    protocols); protocol_timeouts overschrijft per soort ("rtmp", "rtsp",
+    "udp") de leestimeout, bij UDP is dat hoe lang er geluisterd wordt.
+    Met processes > 1 worden de probes op host verdeeld over zoveel
+    processen met elk een eigen backend en eigen DNS-lookups (zie
+    shard.ProcessBackend); de rest van de scan blijft in dit proces.
+    metrics_callback wordt na elke probe aangeroepen met een
+    metrics.ProbeEvent (tijden per fase, soort fout); dat gebeurt vanuit de
+    worker-threads, dus de callback moet snel en thread-safe zijn. Alle
+    meetgegevens van de laatste scan staan in scanner.metrics.
+    Probes die met een tijdelijke fout mislukken (timeout, verbroken
+    verbinding, 5xx) worden zonder een worker bezet te houden opnieuw
+    ingepland na een willekeurige, exponentieel groeiende wachttijd (retries
+    per soort fout, retry_backoff); met second_pass krijgen de URL's die dan
+    nog mislukken na de hoofdscan een tweede ronde met second_pass_workers
+    probes tegelijk (standaard een kwart). Zie retry.RetryPolicy.
+    Met open_journal() wordt bijgehouden welke zenders klaar zijn, zodat een
+    afgebroken scan later hervat kan worden.
+    """
+
+    def __init__(self, timeout=5, max_workers=10, log=None, language="nl", backend="threads", concurrency=500,
+                 pool_size=20, per_host_limit=4, pre_resolve=True, resolver=None, dns_ttl=300,
+                 cache_path=None, cache_ttl=3600, recheck_inactive=False, window=10000,
+                 connect_timeout=None, adaptive_timeouts=True, breaker_threshold=5, breaker_cooldown=60,
+                 deep=False, deep_workers=4, deep_bytes=65536, protocol_timeouts=None, processes=0,
+                 metrics_callback=None, retries=None, retry_backoff=0.5, second_pass=True,
+                 second_pass_workers=None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Onbekende backend: {backend}")
+        self.timeout = timeout
+        self.connect_timeout = timeout if connect_timeout is None else connect_timeout
+        self.host_health = HostHealth(self.connect_timeout, timeout, adaptive=adaptive_timeouts,
+                                      breaker_threshold=breaker_threshold, breaker_cooldown=breaker_cooldown)
+        self.max_workers = max_workers
+        self.backend = backend
+        self.concurrency = concurrency
+        self.pool_size = pool_size
+        self.per_host_limit = per_host_limit
+        self.pre_resolve = pre_resolve
+        self.dns_cache = DNSCache(resolver=resolver, ttl=dns_ttl)
+        self.result_cache = ResultCache(cache_path, ttl=cache_ttl) if cache_path else None
+        self.journal = None
+        self.recheck_inactive = recheck_inactive
+        self.window = window
+        self.deep = deep
+        self.deep_workers = deep_workers
+        self.deep_bytes = deep_bytes
+        self.protocol_timeouts = dict(protocols.DEFAULT_TIMEOUTS, **(protocol_timeouts or {}))
+        self.processes = processes
+        self.retry_policy = RetryPolicy(retries, retry_backoff, second_pass=second_pass)
+        self.second_pass_workers = second_pass_workers
+        self.pipeline = None
+        self.language = language
+        self.stats = ScanStats()
+        self.metrics_callbacks = [metrics_callback] if metrics_callback is not None else []
+        self.metrics = ScanMetrics(self.metrics_callbacks)
+        self._log = log
+        self._stop_event = threading.Event()
+        self.open_sockets = OpenSockets()
+        self._local = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+
+    @property
+    def messages(self):
+        return TRANSLATIONS[self.language]
+
+    def log(self, message):
+        """Stuur bericht naar de log-callback (indien opgegeven)"""
+        if self._log is not None:
+            self._log(message)
+
+    def stop(self):
+        """Stop de lopende scan: lopende probes worden afgebroken en er starten geen nieuwe meer"""
+        self._stop_event.set()
+        self.open_sockets.abort()
+        self.dns_cache.cancel_prefetch()
+        if self.pipeline is not None:
+            self.pipeline.interrupt()
+
+    @property
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    def session(self):
+        """Geef de requests.Session van de huidige worker-thread terug"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = PooledAdapter(self.stats, pool_connections=self.pool_size, pool_maxsize=1)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._local.session = session
+            _thread_sockets.sockets = self.open_sockets
+            _thread_dns.cache = self.dns_cache if self.pre_resolve else None
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    def close_sessions(self):
+        """Sluit alle worker-sessies; hierbij worden ook de verbindingsstatistieken bijgewerkt"""
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._local = threading.local()
+
+    def load_playlist(self, m3u_path):
+        """Laad en parse de M3U-afspeellijst van bestand of URL"""
+        return list(self.iter_playlist(m3u_path))
+
+    def iter_playlist(self, m3u_path):
+        """Lees de M3U-afspeellijst regel voor regel van bestand of URL en lever zenders op zodra ze gevonden zijn"""
+        try:
+            # Check if it's a URL or local file
+            if m3u_path.startswith(('http://', 'https://')):
+                self.log(self.messages["log_download_playlist"] + m3u_path)
+                with requests.get(m3u_path, timeout=self.timeout, stream=True) as response:
+                    response.raise_for_status()
+                    response.encoding = response.encoding or "utf-8"
+                    yield from self.iter_m3u(response.iter_lines(chunk_size=65536, decode_unicode=True))
+            else:
+                self.log(self.messages["log_load_playlist"] + m3u_path)
+                with open(m3u_path, 'r', encoding='utf-8', errors='ignore') as file:
+                    yield from self.iter_m3u(file)
+
+        except requests.exceptions.RequestException as e:
+            self.log(self.messages["log_error_downloading"] + str(e))
+        except IOError as e:
+            self.log(self.messages["log_error_reading"] + str(e))
+
+    def parse_m3u(self, content):
+        """Parse M3U-inhoud en extraheer zenderinformatie"""
+        return list(self.iter_m3u(content.splitlines()))
+
+    def iter_m3u(self, lines):
+        """Parse M3U-regels (elke iterable van strings) en lever de zenders één voor één op"""
+        extinf = None
+        count = 0
+        empty = True
+
+        for line in lines:
+            if empty:
+                empty = False
+                if not line.startswith('#EXTM3U'):
+                    self.log(self.messages["log_invalid_format"])
+
+            line = line.strip()
+
+            if not line:
+                continue
+
+            if line.startswith('#EXTINF:'):
+                extinf = line
+
+            elif not line.startswith('#') and extinf:
+                # This is a URL
+                count += 1
+                yield Channel.from_extinf(extinf, line)
+                extinf = None
+
+        if empty:
+            self.log(self.messages["log_invalid_format"])
+        if count:
+            self.log(self.messages["log_found_channels"] + str(count) + " zenders")
+
+    def check_channel(self, channel, timeout=None):
+        """Controleer of een zender actief is door te proberen verbinding te maken
+
+        timeout is een getal of (connect, read); standaard de adaptieve timeouts van de host.
+        """
+        url = channel.url
+        timeout = self.host_health.timeouts(channel.host) if timeout is None else timeout
+        timing = current_timing()
+        session = self.session()
+        response = None
+
+        try:
+            # Voor HTTP/HTTPS URL's
+            if url.startswith(('http://', 'https://')):
+                # Probeer HEAD-request, als dat niet werkt, probeer een snelle GET-request
+                start = time.perf_counter()
+                try:
+                    response = session.head(url, timeout=timeout, allow_redirects=True)
+                    is_active = 200 <= response.status_code < 400
+                except requests.exceptions.RequestException as e:
+                    if is_connect_error(e) or self.stopped:
+                        raise  # Geen verbinding (een GET zou ook mislukken) of afgebroken door Stop
+                    # Probeer met een GET-request maar beperk de gedownloade bytes
+                    start = time.perf_counter()
+                    response = session.get(url, timeout=timeout, stream=True, allow_redirects=True)
+                    is_active = 200 <= response.status_code < 400
+                    response.close()  # Sluit de verbinding
+                self.host_health.success(channel.host, time.perf_counter() - start)
+                if timing is not None:
+                    timing.finish(time.perf_counter() - start)
+
+            # RTMP, RTSP en UDP/RTP hebben een eigen probe
+            elif url.lower().startswith(protocols.PREFIXES):
+                return self.check_protocol(channel)
+
+            # Voor andere protocollen kunnen we alleen controleren of de URL-indeling geldig lijkt
+            else:
+                try:
+                    parsed = urlparse(url)
+                except ValueError:
+                    return (channel, False, shorten_error(f"Ongeldige URL: {url}"))
+                is_active = bool(parsed.scheme and parsed.netloc)
+
+            if is_active:
+                return (channel, True, "")
+            else:
+                return (channel, False, f"Status code: {getattr(response, 'status_code', 'N/A')}")
+
+        except (requests.exceptions.RequestException, ValueError) as e:
+            # urllib3 geeft een ongeldige host (ook in een redirect) als LocationParseError,
+            # een ValueError die requests niet inpakt
+            if is_connect_error(e):
+                self.host_health.failure(channel.host)
+            return (channel, False, shorten_error(describe_error(e)))
+
+    def protocol_timeout(self, channel):
+        """(soort, connect_timeout, read_timeout) voor een RTMP/RTSP/UDP-probe"""
+        kind = protocols.probe_kind(channel.url)
+        connect, read = self.host_health.timeouts(channel.host)
+        override = self.protocol_timeouts.get(kind)
+        return kind, connect, read if override is None else override
+
+    def check_protocol(self, channel):
+        """RTMP-handshake, RTSP OPTIONS of UDP-luistervenster; zelfde uitvoer als check_channel"""
+        kind, connect, read = self.protocol_timeout(channel)
+        start = time.perf_counter()
+        try:
+            error_message = protocols.probe(channel.url, connect, read)
+        except protocols.ProbeError as e:
+            error_message = str(e)
+        except OSError as e:
+            if kind != "udp":
+                self.host_health.failure(channel.host)
+            return (channel, False, shorten_error(describe_error(e)))
+        if kind != "udp":
+            self.host_health.success(channel.host, time.perf_counter() - start)
+        return (channel, not error_message, shorten_error(error_message))
+
+    def scan(self, channels):
+        """Controleer alle zenders en lever elk resultaat op zodra het binnen is
+
+        channels mag elke iterable zijn, ook een generator zoals iter_playlist();
+        de probes beginnen terwijl de invoer nog gelezen wordt. Levert tuples
+        (channel, is_active, error_message) op in volgorde van voltooiing.
+        De foutmelding wordt ook in channel.error bewaard voor het rapport.
+        """
+        self._stop_event.clear()
+        self.open_sockets.reset()
+        self.stats = ScanStats()
+        self.metrics = ScanMetrics(self.metrics_callbacks)
+        self.pipeline = ScanPipeline(self, channels)
+        try:
+            for result in self.pipeline.run():
+                self.metrics.result(result[1], result[2])
+                yield result
+        finally:
+            if self.result_cache is not None:
+                self.result_cache.commit()
+            if self.journal is not None:
+                # Na een volledige scan is er niets meer te hervatten
+                if self.stopped:
+                    self.journal.close()
+                else:
+                    self.journal.remove()
+                self.journal = None
+
+        if not self.stopped:
+            self.log_stats()
+
+    def create_backend(self, on_result, on_done, limit=None):
+        """Maak de probe-backend voor deze scan
+
+        Met limit (max. gelijktijdige probes, zoals voor de tweede ronde) draait
+        de backend altijd in dit proces.
+        """
+        if self.processes > 1 and limit is None:
+            from .shard import ProcessBackend  # importeert zelf uit deze module
+            return ProcessBackend(self, on_result, on_done)
+        if self.backend == "async":
+            from .aio import AsyncBackend  # aiohttp is optioneel
+            return AsyncBackend(self, on_result, on_done, concurrency=limit)
+        return ThreadBackend(self, on_result, on_done, workers=limit)
+
+    @property
+    def second_pass_limit(self):
+        """Gelijktijdige probes in de tweede ronde"""
+        if self.second_pass_workers:
+            return self.second_pass_workers
+        return max(1, (self.concurrency if self.backend == "async" else self.max_workers) // 4)
+
+    def shard_options(self):
+        """Argumenten voor een M3UScanner in een shardproces: dezelfde probe-instellingen, zonder cache of sharding"""
+        health = self.host_health
+        return dict(timeout=self.timeout, max_workers=self.max_workers, language=self.language, backend=self.backend,
+                    concurrency=self.concurrency, pool_size=self.pool_size, per_host_limit=self.per_host_limit,
+                    pre_resolve=self.pre_resolve, dns_ttl=self.dns_cache.ttl, connect_timeout=self.connect_timeout,
+                    adaptive_timeouts=health.adaptive, breaker_threshold=health.breaker_threshold,
+                    breaker_cooldown=health.breaker_cooldown, protocol_timeouts=self.protocol_timeouts)
+
+    def create_validator(self, on_result):
+        """Maak de StreamValidator voor de diepe controle, of None als die uit staat"""
+        if not self.deep:
+            return None
+        from .validate import StreamValidator  # importeert zelf uit deze module
+        return StreamValidator(self, on_result)
+
+    def check_dns(self, channel):
+        """Geef een foutmelding terug als de host van de zender niet op te zoeken is, anders een lege string"""
+        hostname = hostname_of(channel.url)
+        if not hostname:
+            return ""
+        entry = self.dns_cache.resolve(hostname)
+        if not entry.failed:
+            return ""
+        self.stats.incr("dns_failed_channels")
+        return shorten_error("DNS lookup failed: " + entry.error)
+
+    def check_breaker(self, channel):
+        """Geef een foutmelding terug als de circuit breaker van de host open staat, anders een lege string"""
+        if self.host_health.allow(channel.host):
+            return ""
+        self.stats.incr("breaker_skipped")
+        return "Host overgeslagen na herhaalde verbindingsfouten (circuit breaker)"
+
+    def timed_check(self, channel):
+        """check_channel met DNS-controle vooraf, de duur in channel.latency (seconden) en de meting in metrics"""
+        start = time.perf_counter()
+        timing = start_timing()
+        error_message = self.check_breaker(channel)
+        if not error_message and self.pre_resolve:
+            error_message = self.check_dns(channel)
+            timing.dns = time.perf_counter() - start
+        if error_message:
+            result = (channel, False, error_message)
+        else:
+            result = self.check_channel(channel)
+        channel.latency = round(time.perf_counter() - start, 3)
+        self.metrics.probe(channel, result[1], result[2], timing)
+        return result
+
+    def log_stats(self):
+        """Log de statistieken van de laatste scan"""
+        stats = self.stats
+        if stats.get("probes_saved"):
+            self.log(self.messages["log_duplicates"].format(unique=stats.get("channels") - stats.get("probes_saved"),
+                                                            saved=stats.get("probes_saved")))
+        if self.result_cache is not None:
+            self.log(self.messages["log_cache_hits"].format(cached=stats.get("cache_hits"), remaining=stats.get("probes")))
+        if self.pre_resolve and self.pipeline.hosts:
+            self.log(self.messages["log_dns_resolved"].format(hosts=len(self.pipeline.hosts), failed=self.pipeline.failed_hosts,
+                                                              channels=stats.get("dns_failed_channels")))
+        if stats.get("deep_checked"):
+            self.log(self.messages["log_deep"].format(checked=stats.get("deep_checked"), failed=stats.get("deep_failed")))
+        if stats.get("breaker_skipped"):
+            tripped_hosts = self.host_health.tripped_hosts + stats.get("breaker_hosts")
+            self.log(self.messages["log_breaker"].format(hosts=tripped_hosts,
+                                                         channels=stats.get("breaker_skipped")))
+        if stats.get("http_requests"):
+            self.log(self.messages["log_connection_reuse"] + stats.format_reuse())
+        if stats.get("retried_channels"):
+            self.log(self.messages["log_retries"].format(
+                retries=stats.get("retries"), deferred=stats.get("deferred"),
+                recovered=stats.get("recovered_channels"), failed=stats.get("retried_channels")))
+        if self.metrics.errors:
+            self.log(self.messages["log_errors"] + ", ".join(f"{kind} {count}" for kind, count in self.metrics.errors.most_common()))
+
+    def open_journal(self, m3u_path, output_dir=None, resume=False):
+        """Houd in de uitvoermap bij welke zenders klaar zijn; met resume worden die overgeslagen"""
+        path = os.path.join(output_dir or default_output_dir(m3u_path), JOURNAL_FILE)
+        self.journal = ScanJournal(path, resume=resume)
+        if resume:
+            self.log(self.messages["log_resume"].format(done=len(self.journal)))
+        return self.journal
+
+    def open_writer(self, m3u_path, output_dir=None):
+        """Open een ResultWriter die de resultaten tijdens de scan al wegschrijft"""
+        return ResultWriter(output_dir or default_output_dir(m3u_path), m3u_path)
+
+    def report_summary(self, written=None):
+        """Extra regels voor de kop van het scanrapport
+
+        written is het aantal zenders in de uitvoer (standaard alle opgeleverde
+        resultaten); na Stop kan de aanroeper er minder weggeschreven hebben.
+        """
+        lines = []
+        if self.stopped:
+            # De uitvoer is na Stop wel afgerond, maar de actieve lijst is dan niet volledig
+            done = self.metrics.results if written is None else written
+            read = self.stats.get("channels")
+            if self.pipeline is not None and self.pipeline.total is not None:
+                lines.append(f"Scan gestopt na {done} van {read} zenders")
+            else:
+                lines.append(f"Scan gestopt na {done} van {read} zenders (afspeellijst nog niet helemaal gelezen)")
+        if self.stats.get("resumed"):
+            lines.append(f"Hervat: {self.stats.get('resumed')} zenders uit een eerdere scan overgenomen")
+        if self.stats.get("deep_checked"):
+            lines.append(f"Diepe controle: {self.stats.get('deep_checked')} gecontroleerd, {self.stats.get('deep_failed')} afgekeurd")
+        if self.stats.get("probes_saved"):
+            lines.append(f"Bespaarde probes (dubbele URL's): {self.stats.get('probes_saved')}")
+        if self.stats.get("http_requests"):
+            lines.append(f"Hergebruik verbindingen: {self.stats.format_reuse()}")
+        if self.stats.get("retried_channels"):
+            # Zenders die alsnog actief werden waren na de eerste poging inactief
+            active = self.metrics.active
+            inactive = self.metrics.results - active
+            recovered = self.stats.get("recovered_channels")
+            lines.append(f"Eerste poging: {active - recovered} actief, {inactive + recovered} inactief; "
+                         f"eindresultaat: {active} actief, {inactive} inactief")
+            lines.append(f"Herhaald: {self.stats.get('retries')} directe herhalingen, "
+                         f"{self.stats.get('deferred')} URL's in de tweede ronde, "
+                         f"{recovered} van {self.stats.get('retried_channels')} zenders alsnog actief")
+        lines.extend(self.metrics.summary())
+        return lines
+
+    def save_results(self, m3u_path, active_channels, inactive_channels, output_dir=None):
+        """Sla de scanresultaten op naar bestanden en geef de paden terug"""
+        writer = self.open_writer(m3u_path, output_dir)
+        try:
+            for channel in active_channels:
+                writer.write(channel, True)
+            for channel in inactive_channels:
+                writer.write(channel, False)
+        except BaseException:
+            writer.abort()
+            raise
+        return writer.close(self.report_summary())
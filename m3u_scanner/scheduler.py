@@ -0,0 +1,58 @@
+from collections import deque
+
+
+class HostScheduler:
+    """Eerlijke planner: verdeelt zenders round-robin over hosts met een maximum per host
+
+    Zenders worden per host in een eigen wachtrij gezet. next() loopt de hosts
+    om de beurt af en slaat hosts over die al per_host_limit probes open hebben;
+    per_host_limit 0 betekent geen limiet. Niet thread-safe: alleen aanroepen
+    vanuit de lus die de probes inplant.
+    """
+
+    def __init__(self, channels=(), per_host_limit=4):
+        self.per_host_limit = per_host_limit
+        self.queues = {}
+        self.in_flight = {}
+        self.ring = deque()
+        self.pending = 0
+        for channel in channels:
+            self.add(channel)
+
+    def add(self, channel):
+        """Zet een zender in de wachtrij van zijn host"""
+        host = channel.host
+        queue = self.queues.get(host)
+        if queue is None:
+            queue = self.queues[host] = deque()
+            self.in_flight.setdefault(host, 0)
+        if not queue:
+            self.ring.append(host)
+        queue.append(channel)
+        self.pending += 1
+
+    def next(self):
+        """Geef de volgende zender die nu gestart mag worden, of None"""
+        for _ in range(len(self.ring)):
+            host = self.ring[0]
+            if self.per_host_limit and self.in_flight[host] >= self.per_host_limit:
+                self.ring.rotate(-1)
+                continue
+
+            queue = self.queues[host]
+            channel = queue.popleft()
+            self.in_flight[host] += 1
+            self.pending -= 1
+            if queue:
+                self.ring.rotate(-1)
+            else:
+                self.ring.popleft()
+            return channel
+        return None
+
+    def done(self, channel):
+        """Meld dat de probe van deze zender klaar is"""
+        self.in_flight[channel.host] -= 1
+
+    def __len__(self):
+        return self.pending
@@ -0,0 +1,216 @@
+import queue
+import zlib
+import threading
+import multiprocessing
+
+from .channel import Channel
+from .dns import hostname_of
+from .metrics import PHASES, ProbeTiming
+from .scanner import M3UScanner
+
+# Berichten van een shard naar de aggregator
+RESULTS = "results"
+FAILED = "failed"
+FINISHED = "finished"
+
+# Berichten van de aggregator naar een shard, naast lijsten met zenders
+CLOSE = "close"  # er komen geen zenders meer bij
+STOP = "stop"    # breek de scan af
+
+# Zoveel zenders of resultaten gaan hooguit samen in één bericht tussen processen
+BATCH_SIZE = 512
+
+
+def shard_of(host, shards):
+    """Vaste shard voor een host (crc32, dus gelijk in elk proces en bij elke run)"""
+    return zlib.crc32(host.encode("utf-8", errors="surrogatepass")) % shards
+
+
+def drain(source, first, limit=BATCH_SIZE):
+    """first plus wat er verder direct in source klaarstaat, tot limit items"""
+    items = [first]
+    while len(items) < limit:
+        try:
+            items.append(source.get_nowait())
+        except queue.Empty:
+            break
+    return items
+
+
+def run_shard(options, inbox, outbox):
+    """Hoofdfunctie van een shardproces: controleer de toegewezen zenders met een eigen backend
+
+    inbox levert lijsten (volgnummer, url), CLOSE of STOP; resultaten
+    gaan als lijsten (volgnummer, is_active, error, latency, fasen) terug via
+    outbox, met de tijden per fase zoals ProbeTiming.astuple().
+    """
+    scanner = M3UScanner(**options)
+    phases = {}  # volgnummer -> tijden per fase, van de metrics-callback tot het resultaat verstuurd is
+    scanner.metrics.callbacks.append(
+        lambda event: phases.__setitem__(event.channel.seq, tuple(getattr(event, phase) for phase in PHASES)))
+    results = queue.Queue()
+    done = threading.Event()
+    backend = scanner.create_backend(results.put, done.set)
+    backend.start()
+
+    def send_results():
+        while not (done.is_set() and results.empty()):
+            try:
+                first = results.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            batch = []
+            for item in drain(results, first):
+                if isinstance(item, Exception):
+                    outbox.put((FAILED, f"{item.__class__.__name__}: {item}"))
+                    continue
+                channel, is_active, error_message = item
+                batch.append((channel.seq, is_active, error_message, channel.latency, phases.pop(channel.seq, ())))
+            outbox.put((RESULTS, batch))
+
+    sender = threading.Thread(target=send_results, daemon=True)
+    sender.start()
+
+    hosts = set()
+    while True:
+        message = inbox.get()
+        if message == CLOSE:
+            backend.close()
+            break
+        if message == STOP:
+            scanner.stop()
+            backend.stop()
+            done.set()
+            break
+        for seq, url in message:
+            channel = ShardChannel(url, seq)
+            hostname = hostname_of(url)
+            if scanner.pre_resolve and hostname not in hosts:
+                hosts.add(hostname)
+                scanner.dns_cache.prefetch(hostname)
+            backend.submit(channel)
+
+    done.wait()
+    sender.join()
+    if not scanner.stopped:
+        backend.shutdown()
+    scanner.stats.incr("dns_failed_hosts", sum(1 for hostname in hosts if scanner.dns_cache.lookup_failed(hostname)))
+    outbox.put((FINISHED, (scanner.stats.counters, scanner.host_health.tripped_hosts)))
+
+
+class ShardChannel(Channel):
+    """Zender in een shardproces: alleen de URL en het volgnummer bij de aggregator"""
+
+    __slots__ = ("seq",)
+
+    def __init__(self, url, seq):
+        super().__init__(url)
+        self.seq = seq
+
+
+class ProcessBackend:
+    """Verdeel de probes op host over meerdere processen, elk met een eigen backend
+
+    Elke host hoort bij precies één shard (crc32 van de host), zodat de
+    per-host-limiet, de adaptieve timeouts en de circuit breaker per host
+    hetzelfde werken als in één proces. De zenders gaan in batches naar de
+    shards en de resultaten stromen terug naar deze backend, die ze aan de
+    gewone pipeline geeft: ontdubbelen, cache, logboek, diepe controle en
+    uitvoerbestanden blijven dus in het hoofdproces. Zelfde interface als
+    backends.ThreadBackend.
+    """
+
+    def __init__(self, scanner, on_result, on_done):
+        self.scanner = scanner
+        self.on_result = on_result
+        self.on_done = on_done
+        self.shards = scanner.processes
+        self.context = multiprocessing.get_context("spawn")
+        self.outbox = self.context.Queue()
+        self.inboxes = []
+        self.processes = []
+        self.pending = {}  # volgnummer -> zender, tot het resultaat terug is
+        self.submitted = queue.Queue()
+        self._seq = 0
+        self._sender = None
+        self._receiver = None
+
+    def start(self):
+        options = self.scanner.shard_options()
+        for _ in range(self.shards):
+            inbox = self.context.Queue()
+            process = self.context.Process(target=run_shard, args=(options, inbox, self.outbox), daemon=True)
+            process.start()
+            self.inboxes.append(inbox)
+            self.processes.append(process)
+        self._sender = threading.Thread(target=self._send, daemon=True)
+        self._sender.start()
+        self._receiver = threading.Thread(target=self._receive, daemon=True)
+        self._receiver.start()
+
+    def submit(self, channel):
+        """Plan een zender in (aanroepbaar vanuit elke thread)"""
+        self.submitted.put(channel)
+
+    def close(self):
+        """Er komen geen nieuwe zenders meer bij"""
+        self.submitted.put(CLOSE)
+
+    def stop(self):
+        """Breek de scan af in alle shards"""
+        self.submitted.put(STOP)
+
+    def shutdown(self):
+        self._receiver.join()
+        for process in self.processes:
+            process.join()
+
+    def _send(self):
+        """Verdeel de ingeplande zenders in batches over de shards"""
+        while True:
+            batches = [[] for _ in range(self.shards)]
+            last = None
+            for channel in drain(self.submitted, self.submitted.get()):
+                if channel in (CLOSE, STOP):
+                    last = channel
+                    break
+                self._seq += 1
+                self.pending[self._seq] = channel
+                batches[shard_of(channel.host, self.shards)].append((self._seq, channel.url))
+            for inbox, batch in zip(self.inboxes, batches):
+                if batch:
+                    inbox.put(batch)
+            if last is not None:
+                for inbox in self.inboxes:
+                    inbox.put(last)
+                return
+
+    def _receive(self):
+        """Geef de resultaten van de shards door en tel hun statistieken op"""
+        running = self.shards
+        try:
+            while running:
+                try:
+                    kind, data = self.outbox.get(timeout=1)
+                except queue.Empty:
+                    if not any(process.is_alive() for process in self.processes):
+                        self.on_result(RuntimeError(f"{running} shardproces(sen) onverwacht gestopt"))
+                        return
+                    continue
+                if kind == RESULTS:
+                    for seq, is_active, error_message, latency, phases in data:
+                        channel = self.pending.pop(seq)
+                        channel.latency = latency
+                        self.scanner.metrics.probe(channel, is_active, error_message, ProbeTiming(*phases))
+                        self.on_result((channel, is_active, error_message))
+                elif kind == FAILED:
+                    self.on_result(RuntimeError(data))
+                else:
+                    running -= 1
+                    counters, tripped_hosts = data
+                    for name in ("http_requests", "http_connections", "dns_failed_channels", "dns_failed_hosts",
+                                 "breaker_skipped"):
+                        self.scanner.stats.incr(name, counters.get(name, 0))
+                    self.scanner.stats.incr("breaker_hosts", tripped_hosts)
+        finally:
+            self.on_done()
@@ -0,0 +1,28 @@
+import threading
+
+
+class ScanStats:
+    """Thread-safe tellers voor één scan"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+
+    def incr(self, name, amount=1):
+        """Verhoog teller name met amount"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def get(self, name):
+        return self.counters.get(name, 0)
+
+    @property
+    def reuse_ratio(self):
+        """Aandeel HTTP-verzoeken dat over een bestaande verbinding ging (0.0 - 1.0)"""
+        requests = self.get("http_requests")
+        if not requests:
+            return 0.0
+        return max(0, requests - self.get("http_connections")) / requests
+
+    def format_reuse(self):
+        return f"{self.reuse_ratio:.1%} ({self.get('http_requests')} verzoeken, {self.get('http_connections')} verbindingen)"
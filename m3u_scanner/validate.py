@@ -0,0 +1,160 @@
+import concurrent.futures
+from urllib.parse import urljoin
+
+import requests
+
+from .metrics import describe_error
+from .scanner import shorten_error
+
+TS_PACKET_SIZE = 188
+TS_SYNC_BYTE = 0x47
+
+# Herkenbare begin-bytes van mediaformaten: (offset, bytes)
+MEDIA_SIGNATURES = (
+    (0, b"ID3"),               # MP3/AAC met ID3-tag
+    (0, b"FLV"),
+    (0, b"OggS"),
+    (0, b"RIFF"),
+    (0, b"\x1a\x45\xdf\xa3"),  # Matroska/WebM
+    (4, b"ftyp"),              # MP4 / fMP4
+    (4, b"styp"),
+    (4, b"moof"),
+)
+
+
+def has_ts_sync(data, packets=3):
+    """Staat er een 0x47-syncbyte aan het begin van een aantal opeenvolgende MPEG-TS-pakketten?
+
+    Er zijn minstens twee volledige pakketten nodig: één byte 0x47 is ook
+    gewoon een "G", zoals in een tekstje "Geo-blocked".
+    """
+    packets = min(packets, len(data) // TS_PACKET_SIZE)
+    if packets < 2:
+        return False
+    return any(all(data[offset + i * TS_PACKET_SIZE] == TS_SYNC_BYTE for i in range(packets))
+               for offset in range(TS_PACKET_SIZE))
+
+
+def is_hls(data, content_type):
+    return "mpegurl" in content_type or data.lstrip()[:7] == b"#EXTM3U"
+
+
+def first_uri(playlist, truncated=False):
+    """Eerste variant of segment uit een HLS-playlist, of None als hij leeg is
+
+    truncated: de playlist is afgekapt (niet helemaal gelezen).
+    """
+    lines = playlist.decode("utf-8", errors="ignore").splitlines()
+    # Bij een afgekapte playlist kan de laatste regel een half URI zijn
+    if truncated and not playlist.endswith(b"\n"):
+        lines = lines[:-1]
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            return line
+    return None
+
+
+def check_media(data, content_type):
+    """Foutmelding als de bytes geen mediastream lijken, anders een lege string"""
+    if not data:
+        return "Lege respons"
+    if has_ts_sync(data):
+        return ""
+    if "mp2t" in content_type:
+        # Eén volledig pakket is genoeg als de server zelf MPEG-TS opgeeft
+        if len(data) >= TS_PACKET_SIZE and data[0] == TS_SYNC_BYTE:
+            return ""
+        return "Geen MPEG-TS-syncbytes (0x47)"
+    if "text/html" in content_type or data.lstrip()[:1] == b"<":
+        return "HTML-pagina in plaats van een stream"
+    for offset, signature in MEDIA_SIGNATURES:
+        if data[offset:offset + len(signature)] == signature:
+            return ""
+    if len(data) > 1 and data[0] == 0xFF and data[1] & 0xE0 == 0xE0:
+        return ""  # MPEG-audioframe (MP3/ADTS)
+    if content_type.startswith(("video/", "audio/")):
+        return ""
+    return f"Onbekende inhoud ({content_type or 'geen content-type'})"
+
+
+class StreamValidator:
+    """Diepe controle van zenders die de snelle HEAD-probe doorstaan hebben
+
+    Leest per verzoek hooguit max_bytes en controleert de inhoud: bij HLS wordt
+    de playlist geparsed en de eerste variant en het eerste segment opgehaald,
+    bij MPEG-TS wordt op 0x47-syncbytes gecontroleerd en HTML-foutpagina's of
+    lege playlists worden afgekeurd. Draait op een eigen, kleine threadpool
+    zodat de bulk-scan er niet op hoeft te wachten. Resultaten gaan als
+    (channel, is_active, error_message) naar on_result.
+    """
+
+    MAX_DEPTH = 2  # master-playlist -> media-playlist -> segment
+
+    def __init__(self, scanner, on_result):
+        self.scanner = scanner
+        self.on_result = on_result
+        self.max_bytes = scanner.deep_bytes
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=scanner.deep_workers,
+                                                              thread_name_prefix="deep")
+
+    def submit(self, channel):
+        future = self.executor.submit(self.validate, channel)
+        future.add_done_callback(self._completed)
+
+    def _completed(self, future):
+        if future.cancelled():
+            return
+        try:
+            self.on_result(future.result())
+        except Exception as e:
+            self.on_result(e)
+
+    def stop(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+        self.scanner.close_sessions()
+
+    def validate(self, channel):
+        """Controleer de inhoud van een zender; geeft (channel, is_active, error_message)"""
+        self.scanner.stats.incr("deep_checked")
+        try:
+            error_message = self.check_url(channel.url, channel.host)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            # ValueError: ongeldige host in een segment-URL of redirect (urllib3 LocationParseError)
+            error_message = describe_error(e)
+        if not error_message:
+            return (channel, True, "")
+        self.scanner.stats.incr("deep_failed")
+        return (channel, False, shorten_error("Diepe controle: " + error_message))
+
+    def fetch(self, url, host):
+        """Haal hooguit max_bytes op; geeft (status, content_type, data, uiteindelijke URL)"""
+        connect, _ = self.scanner.host_health.timeouts(host)
+        with self.scanner.session().get(url, stream=True, allow_redirects=True,
+                                        timeout=(connect, self.scanner.timeout)) as response:
+            data = bytearray()
+            if 200 <= response.status_code < 400:
+                for chunk in response.iter_content(chunk_size=min(16384, self.max_bytes)):
+                    data += chunk
+                    if len(data) >= self.max_bytes:
+                        break
+            content_type = response.headers.get("Content-Type", "").lower()
+            return response.status_code, content_type, bytes(data[:self.max_bytes]), response.url
+
+    def check_url(self, url, host, depth=0):
+        status, content_type, data, final_url = self.fetch(url, host)
+        if not 200 <= status < 400:
+            return f"Status code: {status}"
+        if not is_hls(data, content_type):
+            return check_media(data, content_type)
+
+        # fetch() leest hooguit max_bytes: is dat bereikt, dan is de playlist misschien afgekapt
+        uri = first_uri(data, truncated=len(data) >= self.max_bytes)
+        if uri is None:
+            return "Lege HLS-playlist"
+        if depth >= self.MAX_DEPTH:
+            return "HLS-playlist verwijst alleen naar andere playlists"
+        return self.check_url(urljoin(final_url, uri), host, depth + 1)
@@ -0,0 +1,188 @@
+import os
+import math
+import time
+import threading
+
+import requests
+
+from .batch import expand_sources, is_url, playlist_name
+from .cache import normalize_url
+from .writer import PART_SUFFIX, fsync_dir
+
+WATCH_OUTPUT_DIR = "watch_results"
+ACTIVE_SUFFIX = "_active.m3u"
+
+
+class WatchedPlaylist:
+    """Stand van één bewaakte afspeellijst tussen twee rondes"""
+
+    def __init__(self, source, path):
+        self.source = source
+        self.path = path        # gepubliceerde afspeellijst met de actieve zenders
+        self.version = None     # (ETag, Last-Modified) bij een URL, (mtime, grootte) bij een bestand
+        self.channels = None    # zenders van de laatst geladen versie, in volgorde
+        self.keys = []          # genormaliseerde URL per zender
+
+
+class PlaylistWatcher:
+    """Bewaak afspeellijsten en publiceer steeds een afspeellijst met alleen de actieve zenders
+
+    Elke interval seconden wordt elke afspeellijst opnieuw opgehaald: een URL
+    met If-None-Match/If-Modified-Since, zodat een ongewijzigde lijst niet
+    opnieuw gedownload wordt (304), een bestand alleen als mtime of grootte
+    veranderd is. Alleen URL's die nieuw zijn ten opzichte van de vorige ronde
+    worden gecontroleerd, plus per ronde het deel recheck van de bekende URL's
+    die het langst niet gecontroleerd zijn. Daarna wordt per afspeellijst
+    <naam>_active.m3u in output_dir atomair vervangen, als er iets veranderd is.
+    Een mislukte of lege download laat de vorige versie staan.
+    """
+
+    def __init__(self, scanner, sources, output_dir=None, interval=300, recheck=0.1, groups=None):
+        self.scanner = scanner
+        self.output_dir = output_dir or WATCH_OUTPUT_DIR
+        self.interval = interval
+        self.recheck = recheck
+        self.groups = groups
+        self.results = {}  # genormaliseerde URL -> (is_active, error, tijdstip van de controle)
+        self.playlists = []
+        used = {}
+        for source in expand_sources(sources):
+            name = playlist_name(source)
+            used[name] = used.get(name, 0) + 1
+            if used[name] > 1:
+                name = f"{name}_{used[name]}"
+            self.playlists.append(WatchedPlaylist(source, os.path.join(self.output_dir, name + ACTIVE_SUFFIX)))
+        self._stop = threading.Event()
+
+    def run(self, cycles=None):
+        """Voer rondes uit tot stop() (of na cycles rondes)"""
+        count = 0
+        while not self._stop.is_set():
+            try:
+                self.cycle()
+            except Exception as e:
+                # Een mislukte ronde stopt de bewaking niet; de vorige publicatie blijft staan
+                self.scanner.log(self.scanner.messages["log_error_scanning"] + str(e))
+            count += 1
+            if cycles is not None and count >= cycles:
+                break
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+        self.scanner.stop()
+
+    def cycle(self):
+        """Eén ronde: ophalen, vergelijken, controleren en publiceren; geeft de gepubliceerde paden terug"""
+        messages = self.scanner.messages
+        reloaded = [playlist for playlist in self.playlists if self.refresh(playlist)]
+
+        current = {}
+        for playlist in self.playlists:
+            if playlist.channels is not None:
+                for key, channel in zip(playlist.keys, playlist.channels):
+                    current.setdefault(key, channel)
+        removed = self.results.keys() - current.keys()
+        for key in removed:
+            del self.results[key]
+
+        new = [channel for key, channel in current.items() if key not in self.results]
+        known = sorted((key for key in current if key in self.results), key=lambda key: self.results[key][2])
+        recheck = [current[key] for key in known[:math.ceil(len(known) * self.recheck)]]
+        self.scanner.log(messages["log_watch_cycle"].format(new=len(new), recheck=len(recheck), removed=len(removed)))
+
+        changed = set()
+        for channel, is_active, error_message in self.scanner.scan(new + recheck):
+            key = normalize_url(channel.url)
+            previous = self.results.get(key)
+            if previous is None or previous[0] != is_active:
+                changed.add(key)
+            self.results[key] = (is_active, error_message, time.time())
+        if self.scanner.stopped:
+            return []  # geen half bijgewerkte afspeellijsten publiceren
+
+        # Elke ronde opnieuw: cycle() kan ook los aangeroepen worden en de map kan intussen weg zijn
+        os.makedirs(self.output_dir, exist_ok=True)
+        paths = []
+        for playlist in self.playlists:
+            if playlist.channels is None:
+                continue
+            if playlist in reloaded or not os.path.exists(playlist.path) or not changed.isdisjoint(playlist.keys):
+                self.publish(playlist)
+                paths.append(playlist.path)
+        return paths
+
+    def refresh(self, playlist):
+        """Laad de afspeellijst opnieuw als hij gewijzigd is; True als er een nieuwe versie is"""
+        messages = self.scanner.messages
+        try:
+            if is_url(playlist.source):
+                channels, version = self.download(playlist)
+            else:
+                channels, version = self.read(playlist)
+        except requests.exceptions.RequestException as e:
+            self.scanner.log(messages["log_error_downloading"] + str(e))
+            return False
+        except IOError as e:
+            self.scanner.log(messages["log_error_reading"] + str(e))
+            return False
+
+        if channels is None:
+            self.scanner.log(messages["log_watch_not_modified"] + playlist.source)
+            return False
+        if not channels:
+            # Vaak een tijdelijke foutpagina van de provider: de vorige versie blijft gelden
+            self.scanner.log(messages["log_no_channels"] + ": " + playlist.source)
+            return False
+        if self.groups is not None:
+            channels = [channel for channel in channels if channel.group in self.groups]
+        playlist.channels = channels
+        playlist.keys = [normalize_url(channel.url) for channel in channels]
+        playlist.version = version
+        return True
+
+    def download(self, playlist):
+        """Conditionele GET; geeft (zenders, versie), of (None, versie) bij 304 Not Modified"""
+        headers = {}
+        if playlist.channels is not None and playlist.version is not None:
+            etag, last_modified = playlist.version
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        self.scanner.log(self.scanner.messages["log_download_playlist"] + playlist.source)
+        with requests.get(playlist.source, headers=headers, timeout=self.scanner.timeout, stream=True) as response:
+            if response.status_code == 304:
+                return None, playlist.version
+            response.raise_for_status()
+            response.encoding = response.encoding or "utf-8"
+            channels = list(self.scanner.iter_m3u(response.iter_lines(chunk_size=65536, decode_unicode=True)))
+            return channels, (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+
+    def read(self, playlist):
+        """Lees een bestand als het gewijzigd is; geeft (zenders, versie), of (None, versie) als het gelijk is"""
+        stat = os.stat(playlist.source)
+        version = (stat.st_mtime_ns, stat.st_size)
+        if playlist.channels is not None and version == playlist.version:
+            return None, version
+        self.scanner.log(self.scanner.messages["log_load_playlist"] + playlist.source)
+        with open(playlist.source, 'r', encoding='utf-8', errors='ignore') as file:
+            return list(self.scanner.iter_m3u(file)), version
+
+    def publish(self, playlist):
+        """Vervang playlist.path atomair door de actieve zenders van de afspeellijst"""
+        part = playlist.path + PART_SUFFIX
+        active = 0
+        with open(part, "w", encoding="utf-8") as f:
+            f.write("#EXTM3U\n")
+            for key, channel in zip(playlist.keys, playlist.channels):
+                result = self.results.get(key)
+                if result is not None and result[0]:
+                    f.write(f"{channel.extinf}\n{channel.url}\n")
+                    active += 1
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(part, playlist.path)
+        fsync_dir(self.output_dir)
+        self.scanner.log(self.scanner.messages["log_watch_published"].format(
+            active=active, total=len(playlist.channels), path=playlist.path))
@@ -0,0 +1,134 @@
+import os
+import time
+import shutil
+
+ACTIVE_FILE = "active_channels.m3u"
+INACTIVE_FILE = "inactive_channels.m3u"
+REPORT_FILE = "scan_report.txt"
+PART_SUFFIX = ".part"
+
+
+def default_output_dir(m3u_path):
+    """Uitvoermap op basis van de invoerbestandsnaam: <naam>_scan_results"""
+    input_name = os.path.basename(m3u_path).replace('.m3u', '')
+    if input_name == m3u_path:  # In geval van een URL
+        input_name = "playlist"
+    return f"{input_name}_scan_results"
+
+
+def fsync_dir(path):
+    """Zorg dat een rename in de map op schijf staat (niet mogelijk op Windows)"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class ResultWriter:
+    """Schrijft elk resultaat direct weg in plaats van alles aan het einde
+
+    Tijdens de scan staan de resultaten in <bestand>.part-bestanden die steeds
+    geldige M3U's zijn; ze worden gebufferd geschreven en minstens elke
+    fsync_interval seconden naar schijf geforceerd. close() maakt het rapport
+    en hernoemt alles atomair naar de definitieve namen. Na een crash blijven
+    de .part-bestanden met de resultaten tot dan toe staan.
+    """
+
+    def __init__(self, output_dir, source, fsync_interval=1.0, buffer_size=65536):
+        self.output_dir = output_dir
+        self.source = source
+        self.fsync_interval = fsync_interval
+        self.active_count = 0
+        self.inactive_count = 0
+        os.makedirs(output_dir, exist_ok=True)
+
+        self.paths = {name: os.path.join(output_dir, name) for name in (ACTIVE_FILE, INACTIVE_FILE, REPORT_FILE)}
+        # Het foutengedeelte van het rapport; de kop met de totalen volgt pas bij close()
+        self.errors_path = os.path.join(output_dir, REPORT_FILE + ".errors" + PART_SUFFIX)
+        self.files = {
+            name: open(path, "w", encoding="utf-8", buffering=buffer_size)
+            for name, path in ((ACTIVE_FILE, self.paths[ACTIVE_FILE] + PART_SUFFIX),
+                               (INACTIVE_FILE, self.paths[INACTIVE_FILE] + PART_SUFFIX),
+                               ("errors", self.errors_path))
+        }
+        self.files[ACTIVE_FILE].write("#EXTM3U\n")
+        self.files[INACTIVE_FILE].write("#EXTM3U\n")
+        self.last_sync = time.monotonic()
+
+    def write(self, channel, is_active, error_message=""):
+        """Schrijf één resultaat weg"""
+        if is_active:
+            self.active_count += 1
+            self.files[ACTIVE_FILE].write(f"{channel.extinf}\n{channel.url}\n")
+        else:
+            self.inactive_count += 1
+            self.files[INACTIVE_FILE].write(f"{channel.extinf}\n{channel.url}\n")
+            self.files["errors"].write(f"{self.inactive_count}. {channel.name}\n"
+                                       f"   URL: {channel.url}\n"
+                                       f"   Fout: {error_message or channel.error or 'Onbekende fout'}\n\n")
+
+        if time.monotonic() - self.last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        """Forceer alles wat geschreven is naar schijf"""
+        for f in self.files.values():
+            f.flush()
+            os.fsync(f.fileno())
+        self.last_sync = time.monotonic()
+
+    def close(self, summary=()):
+        """Rond af: schrijf het rapport en hernoem de bestanden; geeft de paden terug
+
+        summary zijn extra regels voor de kop van het rapport.
+        """
+        self.sync()
+        for f in self.files.values():
+            f.close()
+
+        report_part = self.paths[REPORT_FILE] + PART_SUFFIX
+        with open(report_part, "w", encoding="utf-8") as f:
+            f.write(f"M3U Scan Rapport voor: {self.source}\n")
+            f.write(f"Datum: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write(f"Totaal zenders: {self.active_count + self.inactive_count}\n")
+            f.write(f"Actieve zenders: {self.active_count}\n")
+            f.write(f"Inactieve zenders: {self.inactive_count}\n")
+            for line in summary:
+                f.write(f"{line}\n")
+            f.write("\n")
+
+            f.write("="*60 + "\n")
+            f.write("INACTIEVE ZENDERS MET FOUTEN:\n")
+            f.write("="*60 + "\n")
+            with open(self.errors_path, "r", encoding="utf-8") as errors:
+                shutil.copyfileobj(errors, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.remove(self.errors_path)
+
+        for path in self.paths.values():
+            os.replace(path + PART_SUFFIX, path)
+        fsync_dir(self.output_dir)
+        return self.paths[ACTIVE_FILE], self.paths[INACTIVE_FILE], self.paths[REPORT_FILE]
+
+    def abort(self):
+        """Sluit af zonder te hernoemen; de .part-bestanden blijven bruikbaar"""
+        for f in self.files.values():
+            if not f.closed:
+                f.flush()
+                os.fsync(f.fileno())
+                f.close()
+
+    def discard(self):
+        """Sluit af en verwijder alles wat deze writer aangemaakt heeft"""
+        for f in self.files.values():
+            f.close()
+        for path in (self.paths[ACTIVE_FILE] + PART_SUFFIX, self.paths[INACTIVE_FILE] + PART_SUFFIX, self.errors_path):
+            os.remove(path)
+        try:
+            os.rmdir(self.output_dir)
+        except OSError:
+            pass  # niet leeg
@@ -0,0 +1,101 @@
+import os
+import sys
+import time
+import threading
+import collections
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+TS_PACKETS = (b"\x47" + b"\x00" * 187) * 2
+
+
+class StreamHandler(BaseHTTPRequestHandler):
+    """Het begin van het pad kiest het antwoord (zoals benchmarks/mock_server.py)
+
+        /ok/...      200 zonder inhoud
+        /dead/...    404
+        /once/...    503 op het eerste verzoek, daarna 200
+        /twice/...   503 op de eerste twee verzoeken, daarna 200
+        /always/...  altijd 503
+        /slow/...    200 na 5 seconden
+        /ts/...      twee MPEG-TS-pakketten
+        /text/...    200 met "Geo-blocked" als tekst
+        /hls/...     .m3u8: playlist zonder slotregeleinde met één segment, anders MPEG-TS
+        /badhls/...  .m3u8: playlist met een ongeldige segment-URL, anders MPEG-TS
+        /badredirect/...  302 naar een URL met een ongeldige host
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self):
+        server = self.server
+        with server.lock:
+            server.counts[self.path] += 1
+            count = server.counts[self.path]
+        kind = self.path.split("/")[1]
+        if kind == "slow":
+            time.sleep(5)
+        failures = {"once": 1, "twice": 2, "always": count}.get(kind, 0)
+        code = 503 if count <= failures else 404 if kind == "dead" else 302 if kind == "badredirect" else 200
+        content_type, body = "video/mp2t", b""
+        if kind in ("ts", "hls", "badhls") and not self.path.endswith(".m3u8"):
+            body = TS_PACKETS
+        elif kind == "text":
+            content_type, body = "text/plain", b"Geo-blocked"
+        elif kind == "hls":
+            content_type, body = "application/vnd.apple.mpegurl", b"#EXTM3U\n#EXTINF:10,\nsegment.ts"
+        elif kind == "badhls":
+            content_type, body = "application/vnd.apple.mpegurl", b"#EXTM3U\n#EXTINF:10,\nhttp://a..b/seg.ts\n"
+        self.send_response(code)
+        if kind == "badredirect":
+            self.send_header("Location", "http://a..b/x")
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command == "GET":
+            self.wfile.write(body)
+
+    do_GET = do_HEAD
+
+    def log_message(self, *args):
+        pass
+
+
+class StreamServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StreamHandler)
+        self.counts = collections.Counter()
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+    @property
+    def requests(self):
+        return sum(self.counts.values())
+
+
+@pytest.fixture
+def http_server():
+    server = StreamServer()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=["threads", "async"])
+def backend(request):
+    """Draai de test met elke backend; de async backend alleen als aiohttp er is"""
+    if request.param == "async":
+        pytest.importorskip("aiohttp")
+    return request.param
@@ -0,0 +1,56 @@
+import os
+
+from m3u_scanner import M3UScanner
+from m3u_scanner.batch import BATCH_REPORT_FILE, PlaylistBatch
+
+
+def write_playlist(path, urls):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("#EXTM3U\n")
+        for number, url in enumerate(urls):
+            f.write(f"#EXTINF:-1,Zender {number}\n{url}\n")
+    return str(path)
+
+
+def test_reports_count_only_own_channels(http_server, tmp_path):
+    base = http_server.base_url
+    good = write_playlist(tmp_path / "good.m3u", [f"{base}/ok/{i}.ts" for i in range(3)])
+    bad = write_playlist(tmp_path / "bad.m3u", [f"{base}/ok/0.ts"] + [f"{base}/dead/{i}.ts" for i in range(2)])
+    scanner = M3UScanner(timeout=2, max_workers=4, retries=0)
+    batch = PlaylistBatch(scanner, [good, bad], str(tmp_path / "out")).open()
+    for channel, is_active, error_message in scanner.scan(batch.channels()):
+        batch.write(channel, is_active, error_message)
+    batch.close(["Fouten per soort: http_4xx 2", "Doorvoer: hele scan"])
+
+    def report(name):
+        with open(os.path.join(tmp_path, "out", name), encoding="utf-8") as f:
+            return f.read()
+
+    good_report = report(os.path.join("good_scan_results", "scan_report.txt"))
+    bad_report = report(os.path.join("bad_scan_results", "scan_report.txt"))
+    batch_report = report(BATCH_REPORT_FILE)
+    assert "http_4xx" not in good_report
+    assert "Fouten per soort: http_4xx 2" in bad_report
+    assert "Doorvoer" not in good_report + bad_report
+    assert "Doorvoer: hele scan" in batch_report
+    assert batch.active_count == 4 and batch.inactive_count == 2
+
+
+def test_stopped_batch_marks_every_report(http_server, tmp_path):
+    base = http_server.base_url
+    first = write_playlist(tmp_path / "een.m3u", [f"{base}/ok/a{i}.ts" for i in range(20)])
+    second = write_playlist(tmp_path / "twee.m3u", [f"{base}/ok/b{i}.ts" for i in range(20)])
+    scanner = M3UScanner(timeout=2, max_workers=2)
+    batch = PlaylistBatch(scanner, [first, second], str(tmp_path / "out")).open()
+    for channel, is_active, error_message in scanner.scan(batch.channels()):
+        batch.write(channel, is_active, error_message)
+        if batch.active_count == 5:
+            scanner.stop()
+    written = batch.active_count + batch.inactive_count
+    batch.close(scanner.report_summary(written))
+    with open(os.path.join(tmp_path, "out", BATCH_REPORT_FILE), encoding="utf-8") as f:
+        assert f"Scan gestopt na {written} van " in f.read()
+    for writer in batch.writers:
+        if writer.active_count:
+            with open(os.path.join(writer.output_dir, "scan_report.txt"), encoding="utf-8") as f:
+                assert f"Scan gestopt na {writer.active_count} zenders van deze afspeellijst" in f.read()
@@ -0,0 +1,79 @@
+from m3u_scanner import Channel, M3UScanner
+from m3u_scanner.channel import host_of
+
+EXTINF = '#EXTINF:-1 tvg-id="npo1.nl" tvg-name="NPO 1" group-title="Nieuws",NPO 1 HD'
+
+
+def test_attributes():
+    channel = Channel.from_extinf(EXTINF, "http://Provider.example:8080/live/1.ts")
+    assert channel.name == "NPO 1"
+    assert channel.group == "Nieuws"
+    assert channel.title == "NPO 1 HD"
+    assert channel.duration == "-1"
+    assert channel.attr("tvg-id") == "npo1.nl"
+    assert channel.attr("tvg-logo") is None
+    assert channel.attrs == {"tvg-id": "npo1.nl", "tvg-name": "NPO 1", "group-title": "Nieuws"}
+    assert channel.host == "provider.example:8080"
+
+
+def test_parsed_lazily():
+    channel = Channel.from_extinf(EXTINF, "http://example.com/1.ts")
+    assert channel._fields is None
+    assert channel.extinf == EXTINF
+    assert channel.url == "http://example.com/1.ts"
+    assert channel._fields is None
+    channel.group
+    assert channel._fields is not None
+    # Exact op te bouwen: de ruwe regel is niet meer nodig
+    assert channel._extinf is None
+    assert channel.extinf == EXTINF
+
+
+def test_irregular_line_is_kept():
+    extinf = '#EXTINF:-1  tvg-name="A"   group-title="B" ,Titel'
+    channel = Channel.from_extinf(extinf, "http://example.com/1.ts")
+    assert channel.name == "A"
+    assert channel.group == "B"
+    assert channel.extinf == extinf
+
+
+def test_name_fallbacks():
+    assert Channel.from_extinf("#EXTINF:-1,Alleen titel", "http://x/1").name == "Alleen titel"
+    assert Channel.from_extinf("#EXTINF:-1", "http://x/1").name == "Onbekend"
+    assert Channel.from_extinf("#EXTINF:-1 tvg-id=abc,Channel Name", "http://x/1").name == "Channel Name"
+    assert Channel.from_extinf('#EXTINF:-1 tvg-id="a" radio=true,T', "http://x/1").name == "T"
+    assert Channel.from_extinf("#EXTINF:abc,T", "http://x/1").name == "T"
+    # Een komma binnen aanhalingstekens is geen scheiding
+    channel = Channel.from_extinf('#EXTINF:-1 tvg-id=x group-title="A, B",Titel', "http://x/1")
+    assert channel.name == "Titel"
+    assert Channel("http://x/1", "Zender").name == "Zender"
+
+
+def test_shared_strings():
+    a = Channel.from_extinf(EXTINF, "http://example.com/1.ts")
+    b = Channel.from_extinf(EXTINF.replace("npo1", "npo2"), "http://example.com/2.ts")
+    assert a.keys is b.keys
+    assert a.group is b.group
+    assert a.host is b.host
+
+
+def test_host_of():
+    assert host_of("HTTP://User@Example.com:80/x") == "user@example.com:80"
+    assert host_of("rtsp://cam.local/stream") == "cam.local"
+    assert host_of("geen url") == ""
+
+
+def test_iter_m3u():
+    content = "\n".join([
+        "#EXTM3U",
+        EXTINF,
+        "#EXTVLCOPT:http-user-agent=VLC",
+        "http://example.com/1.ts",
+        "",
+        "#EXTINF:-1,Zonder attributen",
+        "http://example.com/2.ts",
+        "http://example.com/zonder-extinf.ts",
+    ])
+    channels = M3UScanner().parse_m3u(content)
+    assert [channel.url for channel in channels] == ["http://example.com/1.ts", "http://example.com/2.ts"]
+    assert [channel.name for channel in channels] == ["NPO 1", "Zonder attributen"]
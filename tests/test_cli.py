@@ -0,0 +1,38 @@
+import os
+
+from m3u_scanner import M3UScanner
+from m3u_scanner.cli import EXIT_INTERRUPTED, main
+
+
+def write_playlist(path, urls):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("#EXTM3U\n")
+        for number, url in enumerate(urls):
+            f.write(f"#EXTINF:-1,Zender {number}\n{url}\n")
+    return str(path)
+
+
+def test_completed_scan_exits_zero(http_server, tmp_path):
+    playlist = write_playlist(tmp_path / "lijst.m3u", [f"{http_server.base_url}/ok/{i}.ts" for i in range(3)])
+    assert main([playlist, "-o", str(tmp_path / "out")]) == 0
+    with open(tmp_path / "out" / "scan_report.txt", encoding="utf-8") as f:
+        assert "Scan gestopt" not in f.read()
+
+
+def test_ctrl_c_exits_130_and_keeps_results(http_server, tmp_path, monkeypatch):
+    scan = M3UScanner.scan
+
+    def interrupted_scan(self, channels):
+        for number, result in enumerate(scan(self, channels)):
+            if number == 2:
+                raise KeyboardInterrupt
+            yield result
+
+    monkeypatch.setattr(M3UScanner, "scan", interrupted_scan)
+    playlist = write_playlist(tmp_path / "lijst.m3u", [f"{http_server.base_url}/ok/{i}.ts" for i in range(10)])
+    assert main([playlist, "-o", str(tmp_path / "out")]) == EXIT_INTERRUPTED
+    with open(tmp_path / "out" / "active_channels.m3u", encoding="utf-8") as f:
+        assert f.read().count("#EXTINF") == 2
+    # Het rapport zegt dat de uitvoer onvolledig is
+    with open(tmp_path / "out" / "scan_report.txt", encoding="utf-8") as f:
+        assert "Scan gestopt na 2 van " in f.read()
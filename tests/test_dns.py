@@ -0,0 +1,126 @@
+import time
+import socket
+import threading
+
+from m3u_scanner import Channel, M3UScanner
+from m3u_scanner.dns import DNSCache
+
+
+class StubResolver:
+    """Resolver die elke lookup telt en na delay seconden met errno mislukt"""
+
+    def __init__(self, errno=socket.EAI_AGAIN, delay=0.0):
+        self.errno = errno
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, hostname):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        raise socket.gaierror(self.errno, "stub: " + hostname)
+
+
+def scan(resolver, channels, **kwargs):
+    scanner = M3UScanner(resolver=resolver, max_workers=8, per_host_limit=0, second_pass=False, **kwargs)
+    return scanner, list(scanner.scan(channels))
+
+
+def test_temporary_failure_is_looked_up_once(backend):
+    resolver = StubResolver(socket.EAI_AGAIN, delay=0.2)
+    channels = [Channel(f"http://dead-dns.invalid/{i}.ts") for i in range(20)]
+    scanner, results = scan(resolver, channels, backend=backend)
+    assert resolver.calls == 1
+    assert len(results) == 20
+    assert all(not is_active and "DNS lookup failed" in error for _, is_active, error in results)
+    assert scanner.stats.get("dns_failed_channels") == 20
+
+
+def test_nxdomain_is_looked_up_once():
+    resolver = StubResolver(socket.EAI_NONAME)
+    channels = [Channel(f"http://nx.invalid/{i}.ts") for i in range(10)]
+    _, results = scan(resolver, channels)
+    assert resolver.calls == 1
+    assert not any(is_active for _, is_active, _ in results)
+
+
+def test_negative_entry_expires():
+    resolver = StubResolver()
+    cache = DNSCache(resolver=resolver, negative_ttl=0.05)
+    assert cache.resolve("example.invalid").failed
+    assert cache.resolve("example.invalid").failed
+    assert resolver.calls == 1
+    time.sleep(0.1)
+    cache.resolve("example.invalid")
+    assert resolver.calls == 2
+
+
+def test_concurrent_lookups_share_one_resolve():
+    resolver = StubResolver(delay=0.1)
+    cache = DNSCache(resolver=resolver)
+    threads = [threading.Thread(target=cache.resolve, args=("example.invalid",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert resolver.calls == 1
+    assert cache.lookup_failed("example.invalid")
+
+
+def test_ip_address_is_not_resolved():
+    resolver = StubResolver()
+    cache = DNSCache(resolver=resolver)
+    entry = cache.resolve("127.0.0.1")
+    assert not entry.failed
+    assert entry.addresses == [(socket.AF_INET, "127.0.0.1")]
+    assert resolver.calls == 0
+
+
+def test_successful_lookup_is_cached():
+    calls = []
+
+    def resolver(hostname):
+        calls.append(hostname)
+        return [(socket.AF_INET, "192.0.2.1")]
+
+    cache = DNSCache(resolver=resolver)
+    assert cache.resolve("tv.example").addresses == [(socket.AF_INET, "192.0.2.1")]
+    cache.resolve("tv.example")
+    assert calls == ["tv.example"]
+
+
+def test_process_backend_leaves_lookups_to_shards():
+    resolver = StubResolver()
+    channels = [Channel(f"http://nx{i % 2}.invalid/{i}.ts") for i in range(10)]
+    scanner, results = scan(resolver, channels, processes=2)
+    assert resolver.calls == 0
+    assert len(results) == 10
+    assert all(not is_active and "DNS lookup failed" in error for _, is_active, error in results)
+    assert scanner.pipeline.failed_hosts == 2
+    assert scanner.stats.get("dns_failed_channels") == 10
+
+
+class MappingResolver:
+    """Resolver die hostnamen uit een dict teruggeeft en elke lookup telt"""
+
+    def __init__(self, hosts):
+        self.hosts = hosts
+        self.calls = []
+
+    def __call__(self, hostname):
+        self.calls.append(hostname)
+        if hostname not in self.hosts:
+            raise socket.gaierror(socket.EAI_NONAME, "stub: " + hostname)
+        return [(socket.AF_INET, self.hosts[hostname])]
+
+
+def test_connections_use_the_cached_address(http_server, backend):
+    # stream.test bestaat alleen in de stub: het lukt alleen als de verbinding het adres uit de cache gebruikt
+    resolver = MappingResolver({"stream.test": "127.0.0.1"})
+    port = http_server.server_port
+    channels = [Channel(f"http://stream.test:{port}/ok/{i}.ts") for i in range(5)]
+    scanner = M3UScanner(resolver=resolver, per_host_limit=0, second_pass=False, backend=backend)
+    results = list(scanner.scan(channels))
+    assert all(is_active for _, is_active, _ in results)
+    assert resolver.calls == ["stream.test"]
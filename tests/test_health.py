@@ -0,0 +1,75 @@
+import time
+import socket
+
+from m3u_scanner import Channel, M3UScanner
+from m3u_scanner.health import HostHealth
+
+
+def test_default_timeouts_until_enough_samples():
+    health = HostHealth(3, 5, min_samples=5)
+    for _ in range(4):
+        health.success("tv.example", 0.1)
+    assert health.timeouts("tv.example") == (3, 5)
+    health.success("tv.example", 0.1)
+    connect, read = health.timeouts("tv.example")
+    assert round(connect, 6) == round(read, 6) == 0.5  # 3 x 0.1, maar minstens min_timeout
+    assert health.timeouts("other.example") == (3, 5)
+
+
+def test_adaptive_timeout_follows_p95_within_bounds():
+    health = HostHealth(3, 5, factor=3.0, min_samples=5)
+    for _ in range(20):
+        health.success("tv.example", 0.4)
+    assert tuple(round(t, 6) for t in health.timeouts("tv.example")) == (1.2, 1.2)
+    for _ in range(50):
+        health.success("tv.example", 10)
+    # Nooit meer dan de ingestelde timeouts
+    assert health.timeouts("tv.example") == (3, 5)
+
+
+def test_not_adaptive():
+    health = HostHealth(3, 5, adaptive=False)
+    for _ in range(20):
+        health.success("tv.example", 0.1)
+    assert health.timeouts("tv.example") == (3, 5)
+
+
+def test_breaker_opens_and_half_opens():
+    health = HostHealth(3, 5, breaker_threshold=3, breaker_cooldown=0.1)
+    for _ in range(2):
+        health.failure("dead.example")
+    assert health.allow("dead.example")
+    health.failure("dead.example")
+    assert not health.allow("dead.example")
+    assert health.allow("other.example")
+    assert health.tripped_hosts == 1
+
+    time.sleep(0.15)
+    # Half open: één proefprobe, daarna weer dicht tot de volgende cooldown
+    assert health.allow("dead.example")
+    assert not health.allow("dead.example")
+    health.success("dead.example", 0.1)
+    assert health.allow("dead.example")
+
+
+def test_breaker_disabled():
+    health = HostHealth(3, 5, breaker_threshold=0)
+    for _ in range(10):
+        health.failure("dead.example")
+    assert health.allow("dead.example")
+    assert health.tripped_hosts == 0
+
+
+def test_scan_skips_host_after_breaker(backend):
+    # Een poort waar niemand luistert: elke verbinding wordt geweigerd
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    channels = [Channel(f"http://127.0.0.1:{port}/{i}.ts") for i in range(12)]
+    scanner = M3UScanner(backend=backend, max_workers=1, concurrency=1, per_host_limit=1,
+                         breaker_threshold=3, second_pass=False)
+    results = list(scanner.scan(channels))
+    assert len(results) == 12
+    assert not any(is_active for _, is_active, _ in results)
+    assert scanner.stats.get("breaker_skipped") == 9
+    assert sum("circuit breaker" in error for _, _, error in results) == 9
@@ -0,0 +1,68 @@
+from m3u_scanner import Channel
+from m3u_scanner.journal import ScanJournal
+
+
+def finished(url, is_active, error="", latency=0.2):
+    channel = Channel(url)
+    channel.error = error
+    channel.latency = latency
+    return channel, is_active
+
+
+def test_resume_reads_results(tmp_path):
+    path = str(tmp_path / "scan.journal")
+    journal = ScanJournal(path)
+    journal.put(*finished("http://Example.com:80/a.ts", True))
+    journal.put(*finished("http://example.com/b.ts", False, "Status code: 404"))
+    journal.close()
+
+    resumed = ScanJournal(path, resume=True)
+    assert len(resumed) == 2
+    assert resumed.get("http://example.com/a.ts") == (True, "", 0.2)
+    assert resumed.get("http://example.com/b.ts") == (False, "Status code: 404", 0.2)
+    assert resumed.get("http://example.com/c.ts") is None
+    resumed.close()
+
+
+def test_without_resume_starts_empty(tmp_path):
+    path = str(tmp_path / "scan.journal")
+    journal = ScanJournal(path)
+    journal.put(*finished("http://example.com/a.ts", True))
+    journal.close()
+    journal = ScanJournal(path)
+    journal.close()
+    assert len(ScanJournal(path, resume=True)) == 0
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    path = tmp_path / "scan.journal"
+    journal = ScanJournal(str(path))
+    journal.put(*finished("http://example.com/a.ts", True))
+    journal.close()
+    # Crash midden in het schrijven van een regel
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('["http://example.com/b.ts", tr')
+
+    resumed = ScanJournal(str(path), resume=True)
+    assert len(resumed) == 1
+    resumed.put(*finished("http://example.com/c.ts", True))
+    resumed.close()
+    # De nieuwe regel begint na de afgebroken regel op een eigen regel
+    again = ScanJournal(str(path), resume=True)
+    assert again.get("http://example.com/c.ts") == (True, "", 0.2)
+    assert again.get("http://example.com/b.ts") is None
+    again.close()
+
+
+def test_missing_journal_on_resume(tmp_path):
+    journal = ScanJournal(str(tmp_path / "nieuw" / "scan.journal"), resume=True)
+    assert len(journal) == 0
+    journal.close()
+
+
+def test_remove(tmp_path):
+    path = tmp_path / "scan.journal"
+    journal = ScanJournal(str(path))
+    journal.put(*finished("http://example.com/a.ts", True))
+    journal.remove()
+    assert not path.exists()
@@ -0,0 +1,39 @@
+from m3u_scanner.metrics import ScanMetrics
+
+
+def sample(text, name):
+    for line in text.splitlines():
+        if line.startswith(name + " "):
+            return float(line.split()[1])
+    raise AssertionError(f"{name} ontbreekt")
+
+
+def test_throughput_matches_report():
+    metrics = ScanMetrics()
+    metrics.series = [4, 10, 1]
+    metrics.results = 15
+    text = metrics.prometheus()
+    assert "# TYPE m3u_scan_throughput_avg gauge" in text
+    assert sample(text, "m3u_scan_throughput_avg") == 5.0
+    assert sample(text, "m3u_scan_throughput_peak") == 10
+    assert sample(text, "m3u_scan_throughput") == 7.0  # laatste volle seconden
+    assert "Doorvoer: gemiddeld 5.0 zenders/s, piek 10/s" in metrics.summary()
+
+
+def test_empty_scan_has_zero_throughput():
+    metrics = ScanMetrics()
+    text = metrics.prometheus()
+    assert sample(text, "m3u_scan_throughput_avg") == 0.0
+    assert sample(text, "m3u_scan_throughput_peak") == 0
+    assert not any(line.startswith("Doorvoer") for line in metrics.summary())
+
+
+def test_results_fill_the_series():
+    metrics = ScanMetrics()
+    for _ in range(3):
+        metrics.result(True, "")
+    metrics.result(False, "Status code: 404")
+    assert sum(metrics.series) == 4
+    text = metrics.prometheus()
+    assert sample(text, "m3u_scan_throughput_peak") == max(metrics.series)
+    assert 'm3u_scan_errors_total{kind="http_4xx"} 1' in text
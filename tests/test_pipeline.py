@@ -0,0 +1,119 @@
+import time
+import threading
+
+from m3u_scanner import Channel, M3UScanner
+from m3u_scanner.journal import JOURNAL_FILE
+
+
+def urls(server, kind, count):
+    return [f"{server.base_url}/{kind}/{i}.ts" for i in range(count)]
+
+
+def scan(scanner, urls):
+    return list(scanner.scan(Channel(url) for url in urls))
+
+
+def test_duplicates_are_probed_once(http_server, backend):
+    unique = urls(http_server, "ok", 10) + urls(http_server, "dead", 5)
+    # Zelfde streams in een andere schrijfwijze: schema in hoofdletters, met fragment
+    variants = [url.replace("http://", "HTTP://") + "#x" for url in unique]
+    scanner = M3UScanner(backend=backend, per_host_limit=0, second_pass=False)
+    results = scan(scanner, unique + unique + variants)
+
+    assert len(results) == 45
+    assert http_server.requests == 15
+    assert scanner.stats.get("probes") == 15
+    assert scanner.stats.get("probes_saved") == 30
+    by_url = {}
+    for channel, is_active, _ in results:
+        by_url.setdefault(channel.url.split("#")[0], set()).add(is_active)
+    assert all(len(outcomes) == 1 for outcomes in by_url.values())
+    assert sum(is_active for _, is_active, _ in results) == 30
+
+
+def test_small_window_does_not_block(http_server, backend):
+    channels = urls(http_server, "ok", 20)
+    channels = channels + channels[::2] + urls(http_server, "dead", 5)
+    scanner = M3UScanner(backend=backend, per_host_limit=2, window=3, second_pass=False)
+    results = scan(scanner, channels)
+    assert len(results) == 35
+    assert http_server.requests == 25
+    assert scanner.pipeline.total == 35
+
+
+def test_results_are_streamed(http_server):
+    def channels():
+        for url in urls(http_server, "ok", 5):
+            yield Channel(url)
+        # De eerste resultaten komen binnen voordat de invoer op is
+        deadline = time.monotonic() + 5
+        while not received and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert received
+        yield Channel(http_server.base_url + "/ok/last.ts")
+
+    received = []
+    scanner = M3UScanner(per_host_limit=0)
+    for result in scanner.scan(channels()):
+        received.append(result)
+    assert len(received) == 6
+
+
+def test_stop_returns_promptly(http_server, backend):
+    scanner = M3UScanner(backend=backend, max_workers=8, concurrency=8, per_host_limit=0, timeout=30)
+    timer = threading.Timer(0.3, scanner.stop)
+    timer.start()
+    start = time.monotonic()
+    results = scan(scanner, urls(http_server, "slow", 50))
+    elapsed = time.monotonic() - start
+    timer.cancel()
+
+    assert scanner.stopped
+    assert elapsed < 2
+    assert len(results) < 50
+    requests = http_server.requests
+    time.sleep(0.3)
+    assert http_server.requests == requests  # na Stop starten er geen nieuwe probes
+
+
+def test_resume_skips_finished_channels(tmp_path, http_server):
+    output_dir = str(tmp_path)
+    channels = urls(http_server, "ok", 30) + urls(http_server, "dead", 10)
+
+    scanner = M3UScanner(max_workers=2, per_host_limit=0)
+    scanner.open_journal("lijst.m3u", output_dir)
+    first = []
+    for result in scanner.scan(Channel(url) for url in channels):
+        first.append(result)
+        if len(first) == 10:
+            scanner.stop()
+    assert (tmp_path / JOURNAL_FILE).exists()
+    requests = http_server.requests
+
+    scanner = M3UScanner(max_workers=2, per_host_limit=0)
+    assert len(scanner.open_journal("lijst.m3u", output_dir, resume=True)) >= 10
+    second = scan(scanner, channels)
+    assert len(second) == 40
+    assert scanner.stats.get("resumed") >= 10
+    assert http_server.requests - requests == 40 - scanner.stats.get("resumed")
+    assert sum(is_active for _, is_active, _ in second) == 30
+    # Na een volledige scan is er niets meer te hervatten
+    assert not (tmp_path / JOURNAL_FILE).exists()
+
+
+def test_caller_stops_reading(http_server):
+    scanner = M3UScanner(max_workers=2, per_host_limit=0)
+    results = scanner.scan(Channel(url) for url in urls(http_server, "ok", 50))
+    next(results)
+    results.close()
+    assert scanner.stopped
+
+
+def test_malformed_host_fails_only_that_channel(http_server, backend):
+    # urllib3 meldt een ongeldige host als ValueError; dat mag de scan niet afbreken
+    scanner = M3UScanner(backend=backend, per_host_limit=0, pre_resolve=False, second_pass=False)
+    bad = [f"{http_server.base_url}/badredirect/1.ts", "http://a..b/x.ts"]
+    results = {channel.url: (is_active, error) for channel, is_active, error in scan(scanner, bad + urls(http_server, "ok", 2))}
+    assert len(results) == 4
+    assert all(not results[url][0] and results[url][1] for url in bad)
+    assert all(is_active for url, (is_active, _) in results.items() if url not in bad)
@@ -0,0 +1,173 @@
+import os
+import sys
+import socket
+import asyncio
+import ipaddress
+
+import pytest
+
+from m3u_scanner import Channel, M3UScanner
+from m3u_scanner.protocols import ProbeError, from_source, probe, probe_async, probe_kind, split_target, udp_source
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from mock_protocols import MockRTMPServer, MockRTSPServer, MockTCPServer, UDPSender  # noqa: E402
+
+
+class WrongVersionRTMPServer(MockTCPServer):
+    async def handle(self, reader, writer):
+        await reader.readexactly(1537)
+        writer.write(b"\x06" + bytes(1536))
+        await writer.drain()
+
+
+class HTTPServerOnRTSPPort(MockTCPServer):
+    async def handle(self, reader, writer):
+        await reader.readline()
+        writer.write(b"HTTP/1.1 400 Bad Request\r\n\r\n")
+        await writer.drain()
+
+
+@pytest.fixture(scope="module")
+def servers():
+    servers = {
+        "rtmp": MockRTMPServer().start(),
+        "rtmp_bad": WrongVersionRTMPServer().start(),
+        "rtsp": MockRTSPServer().start(),
+        "rtsp_http": HTTPServerOnRTSPPort().start(),
+    }
+    udp = UDPSender(interval=0.05).start()
+    yield servers, udp
+    for server in servers.values():
+        server.stop()
+    udp.stop()
+
+
+def cases(servers, udp):
+    port = {name: server.port for name, server in servers.items()}
+    closed = UDPSender.free_port()
+    return [
+        (f"rtmp://127.0.0.1:{port['rtmp']}/live/stream", True, ""),
+        (f"rtmp://127.0.0.1:{port['rtmp_bad']}/live/stream", False, "Onverwachte RTMP-versie: 6"),
+        (f"rtmp://127.0.0.1:{closed}/live/stream", False, "connect_refused"),
+        (f"rtsp://127.0.0.1:{port['rtsp']}/live", True, ""),
+        (f"rtsp://127.0.0.1:{port['rtsp']}/dead", False, "RTSP status code: 404"),
+        (f"rtsp://127.0.0.1:{port['rtsp_http']}/live", False, "Geen RTSP-antwoord"),
+        (f"udp://@127.0.0.1:{udp.port}", True, ""),
+        (f"udp://@127.0.0.1:{closed}", False, "Geen UDP-data binnen 0.3 seconden"),
+        ("rtmp://[::1/x", False, "Ongeldige URL: rtmp://[::1/x"),
+        ("rtsp://[::1/x", False, "Ongeldige URL: rtsp://[::1/x"),
+        ("rtsp://127.0.0.1:99999/x", False, "Ongeldige poort in rtsp://127.0.0.1:99999/x"),
+        ("foo://[::1/x", False, "Ongeldige URL: foo://[::1/x"),
+    ]
+
+
+def test_probe_kind():
+    assert probe_kind("RTMPS://x/y") == "rtmp"
+    assert probe_kind("rtsp://x/y") == "rtsp"
+    assert probe_kind("rtp://@239.0.0.1:5000") == "udp"
+    assert probe_kind("http://x/y") is None
+
+
+def test_split_target():
+    assert split_target("rtmp://example.com/live") == ("rtmp", "example.com", 1935)
+    assert split_target("rtsps://example.com:8322/x") == ("rtsps", "example.com", 8322)
+    assert split_target("udp://@239.1.1.1:1234") == ("udp", "239.1.1.1", 1234)
+    with pytest.raises(ProbeError):
+        split_target("rtmp://[::1/x")
+    with pytest.raises(ProbeError):
+        split_target("udp://@239.1.1.1")
+
+
+def test_probe(servers):
+    servers, udp = servers
+    for url, is_active, error in cases(servers, udp):
+        if url.startswith("foo"):
+            continue  # geen protocolprobe
+        try:
+            message = probe(url, 1, 0.3)
+        except ProbeError as e:
+            message = str(e)
+        except OSError:
+            message = "connect_refused"
+        assert (not message) == is_active, url
+        if not is_active:
+            assert error in message, url
+
+
+def test_probe_async(servers):
+    servers, udp = servers
+
+    async def run(url):
+        try:
+            return await probe_async(url, 1, 0.3)
+        except ProbeError as e:
+            return str(e)
+        except OSError:
+            return "connect_refused"
+
+    for url, is_active, error in cases(servers, udp):
+        if url.startswith("foo"):
+            continue  # geen protocolprobe
+        message = asyncio.run(run(url))
+        assert (not message) == is_active, url
+        if not is_active:
+            assert error in message, url
+
+
+def test_scan(servers, backend):
+    servers, udp = servers
+    expected = cases(servers, udp)
+    scanner = M3UScanner(backend=backend, timeout=1, protocol_timeouts={"udp": 0.3}, second_pass=False)
+    # Een ongeldige URL breekt de scan niet af
+    results = {channel.url: (is_active, error)
+               for channel, is_active, error in scanner.scan(Channel(url) for url, _, _ in expected)}
+    assert len(results) == len(expected)
+    for url, is_active, error in expected:
+        assert results[url][0] == is_active, (url, results[url])
+        assert error in results[url][1], (url, results[url])
+
+
+def test_udp_source():
+    assert udp_source("udp://10.0.0.1@239.1.1.1:1234") == ipaddress.ip_address("10.0.0.1")
+    assert udp_source("udp://@239.1.1.1:1234") is None
+    assert from_source(("10.0.0.1", 5000), ipaddress.ip_address("10.0.0.1"))
+    assert not from_source(("10.0.0.2", 5000), ipaddress.ip_address("10.0.0.1"))
+    assert from_source(("10.0.0.2", 5000), None)
+
+
+def test_multicast_probe_ignores_other_traffic_on_the_port():
+    port = UDPSender.free_port()
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        try:
+            sock.sendto(b"x", ("239.1.1.3", port))
+        except OSError:
+            pytest.skip("geen multicastroute")
+    unicast = UDPSender(port=port, interval=0.05).start()
+    group = UDPSender(host="239.1.1.3", port=port, interval=0.05).start()
+    try:
+        # Unicast naar de poort en een andere groep op dezelfde poort tellen niet mee
+        assert probe(f"udp://@239.1.1.2:{port}", 1, 0.3) == "Geen UDP-data binnen 0.3 seconden"
+        assert asyncio.run(probe_async(f"udp://@239.1.1.2:{port}", 1, 0.3)) == "Geen UDP-data binnen 0.3 seconden"
+        assert probe(f"udp://@239.1.1.3:{port}", 1, 0.3) == ""
+        assert asyncio.run(probe_async(f"udp://@239.1.1.3:{port}", 1, 0.3)) == ""
+        # Met een bron alleen datagrammen van die bron
+        assert probe(f"udp://192.0.2.123@239.1.1.3:{port}", 1, 0.3) == "Geen UDP-data binnen 0.3 seconden"
+    finally:
+        unicast.stop()
+        group.stop()
+
+
+def test_connect_timeout_kind_is_the_same_on_both_backends():
+    # Een volle backlog laat nieuwe verbindingen hangen tot de connect-timeout
+    with socket.socket() as server, socket.socket() as first:
+        server.bind(("127.0.0.1", 0))
+        server.listen(0)
+        first.connect(server.getsockname())
+        url = f"rtsp://127.0.0.1:{server.getsockname()[1]}/live"
+        threaded = M3UScanner(timeout=0.3, breaker_threshold=0, second_pass=False)
+        [(_, is_active, error)] = threaded.scan([Channel(url)])
+        assert not is_active and error.startswith("connect_timeout: ")
+        pytest.importorskip("aiohttp")
+        asynchronous = M3UScanner(timeout=0.3, backend="async", breaker_threshold=0, second_pass=False)
+        assert list(asynchronous.scan([Channel(url)]))[0][1:] == (False, error)
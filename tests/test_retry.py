@@ -0,0 +1,88 @@
+import random
+
+from m3u_scanner import Channel, M3UScanner
+from m3u_scanner.retry import DEFAULT_RETRIES, RetryPolicy
+
+
+def test_transient_kinds():
+    policy = RetryPolicy()
+    assert policy.is_transient("Status code: 503")
+    assert policy.is_transient("read_timeout: Read timed out")
+    assert not policy.is_transient("Status code: 404")
+    assert not policy.is_transient("connect_refused: Connection refused")
+    assert policy.attempts("Status code: 503") == DEFAULT_RETRIES["http_5xx"]
+    assert policy.attempts("Status code: 404") == 0
+
+
+def test_retries_override_defaults():
+    policy = RetryPolicy({"http_5xx": 3, "read_timeout": 0})
+    assert policy.attempts("Status code: 502") == 3
+    assert policy.attempts("read_timeout: Read timed out") == 0
+    assert policy.is_transient("read_timeout: Read timed out")  # nog wel in de tweede ronde
+    assert policy.attempts("connect_timeout: timed out") == DEFAULT_RETRIES["connect_timeout"]
+
+
+def test_delay_is_jittered_exponential_backoff_with_cap():
+    random.seed(1)
+    policy = RetryPolicy(backoff=0.5, cap=3.0)
+    for attempt, bound in ((1, 0.5), (2, 1.0), (3, 2.0), (4, 3.0), (10, 3.0)):
+        delays = [policy.delay(attempt) for _ in range(200)]
+        assert all(0 <= delay <= bound for delay in delays)
+        assert max(delays) > bound / 2  # echt verspreid, niet steeds 0
+
+
+def scan(http_server, paths, backend="threads", **kwargs):
+    scanner = M3UScanner(timeout=2, max_workers=4, per_host_limit=0, retry_backoff=0.01, backend=backend, **kwargs)
+    results = {channel.url: (is_active, error)
+               for channel, is_active, error in scanner.scan(Channel(http_server.base_url + path) for path in paths)}
+    return scanner, {url[len(http_server.base_url):]: result for url, result in results.items()}
+
+
+def test_retry_recovers_from_one_failure(http_server, backend):
+    scanner, results = scan(http_server, ["/once/a.ts", "/dead/b.ts"], backend, second_pass=False)
+    assert results["/once/a.ts"] == (True, "")
+    assert not results["/dead/b.ts"][0]
+    assert http_server.counts["/once/a.ts"] == 2
+    assert http_server.counts["/dead/b.ts"] == 1  # een 404 wordt niet herhaald
+    assert scanner.stats.get("retries") == 1
+    assert scanner.stats.get("recovered_channels") == 1
+
+
+def test_second_pass_after_failed_retry(http_server, backend):
+    scanner, results = scan(http_server, ["/twice/a.ts"], backend)
+    assert results["/twice/a.ts"] == (True, "")
+    assert http_server.counts["/twice/a.ts"] == 3
+    assert scanner.stats.get("retries") == 1
+    assert scanner.stats.get("deferred") == 1
+    assert scanner.stats.get("recovered_channels") == 1
+
+
+def test_without_second_pass_failure_stands(http_server, backend):
+    scanner, results = scan(http_server, ["/twice/a.ts"], backend, second_pass=False)
+    assert not results["/twice/a.ts"][0]
+    assert http_server.counts["/twice/a.ts"] == 2
+    assert scanner.stats.get("deferred") == 0
+    assert scanner.stats.get("retried_channels") == 1
+    assert scanner.stats.get("recovered_channels") == 0
+
+
+def test_retry_count_per_kind(http_server):
+    scanner, results = scan(http_server, ["/always/a.ts"], retries={"http_5xx": 2}, second_pass=False)
+    assert not results["/always/a.ts"][0]
+    assert http_server.counts["/always/a.ts"] == 3
+    assert scanner.stats.get("retries") == 2
+
+
+def test_no_retries_but_second_pass(http_server):
+    scanner, results = scan(http_server, ["/once/a.ts"], retries={"http_5xx": 0})
+    assert results["/once/a.ts"] == (True, "")
+    assert scanner.stats.get("retries") == 0
+    assert scanner.stats.get("deferred") == 1
+
+
+def test_failure_without_any_retry_is_not_counted_as_retried(http_server):
+    scanner, results = scan(http_server, ["/always/a.ts", "/once/b.ts"], retries={"http_5xx": 0}, second_pass=False)
+    assert not results["/always/a.ts"][0] and not results["/once/b.ts"][0]
+    assert http_server.requests == 2
+    assert scanner.stats.get("retries") == 0
+    assert scanner.stats.get("retried_channels") == 0
@@ -0,0 +1,72 @@
+from m3u_scanner import Channel, M3UScanner
+from m3u_scanner.validate import TS_PACKET_SIZE, check_media, first_uri, has_ts_sync
+
+PACKET = b"\x47" + b"\x00" * (TS_PACKET_SIZE - 1)
+
+
+def test_has_ts_sync():
+    assert has_ts_sync(PACKET * 3)
+    assert has_ts_sync(PACKET * 2)
+    # Niet op een pakketgrens begonnen
+    assert has_ts_sync(b"\x00" * 10 + PACKET * 3)
+    assert not has_ts_sync(PACKET)
+    assert not has_ts_sync(b"Geo-blocked")
+    assert not has_ts_sync(b"G" + b"x" * 400)
+    assert not has_ts_sync(b"")
+
+
+def test_first_uri():
+    assert first_uri(b"#EXTM3U\n#EXTINF:10,\nseg1.ts\n") == "seg1.ts"
+    # Volledig gelezen playlist zonder regeleinde aan het eind
+    assert first_uri(b"#EXTM3U\n#EXTINF:10,\nseg1.ts") == "seg1.ts"
+    assert first_uri(b"#EXTM3U\r\n#EXT-X-STREAM-INF:BANDWIDTH=1\r\n  low/index.m3u8  \r\n") == "low/index.m3u8"
+    # Afgekapt: de laatste regel kan een half URI zijn
+    assert first_uri(b"#EXTM3U\n#EXTINF:10,\nseg1.t", truncated=True) is None
+    assert first_uri(b"#EXTM3U\n#EXTINF:10,\nseg1.ts\nseg2", truncated=True) == "seg1.ts"
+    assert first_uri(b"#EXTM3U\n#EXT-X-ENDLIST\n") is None
+    assert first_uri(b"") is None
+
+
+def test_check_media():
+    assert check_media(b"", "video/mp2t") == "Lege respons"
+    assert check_media(PACKET * 3, "") == ""
+    assert check_media(PACKET * 3, "application/octet-stream") == ""
+    # Eén pakket alleen met een MPEG-TS-content-type
+    assert check_media(PACKET, "video/mp2t") == ""
+    assert check_media(PACKET, "application/octet-stream").startswith("Onbekende inhoud")
+    assert check_media(b"x" * 400, "video/mp2t") == "Geen MPEG-TS-syncbytes (0x47)"
+    # Korte tekst die met een G begint is geen stream
+    for body in (b"Geo-blocked", b"Gone", b"Geen toegang"):
+        assert check_media(body, "") != ""
+        assert check_media(body, "text/plain") != ""
+        assert check_media(body, "video/mp2t") != ""
+    assert check_media(b"<html><body>Error</body></html>", "") == "HTML-pagina in plaats van een stream"
+    assert check_media(b"  <!DOCTYPE html>", "application/octet-stream") == "HTML-pagina in plaats van een stream"
+    assert check_media(b"\x00\x00\x00\x18ftypmp42", "") == ""
+    assert check_media(b"ID3\x04\x00", "") == ""
+    assert check_media(b"\xff\xf1\x50\x80", "") == ""
+    assert check_media(b"abc", "audio/aac") == ""
+    assert check_media(b"abc", "").startswith("Onbekende inhoud")
+
+
+def test_deep_scan(http_server, backend):
+    base = http_server.base_url
+    urls = [f"{base}/ts/1.ts", f"{base}/text/1.ts", f"{base}/hls/index.m3u8", f"{base}/ok/empty.ts"]
+    scanner = M3UScanner(backend=backend, deep=True, per_host_limit=0)
+    results = {channel.url: (is_active, error) for channel, is_active, error in scanner.scan(Channel(url) for url in urls)}
+    assert results[f"{base}/ts/1.ts"] == (True, "")
+    assert results[f"{base}/hls/index.m3u8"] == (True, "")
+    assert not results[f"{base}/text/1.ts"][0]
+    assert results[f"{base}/ok/empty.ts"] == (False, "Diepe controle: Lege respons")
+    assert scanner.stats.get("deep_checked") == 4
+    assert scanner.stats.get("deep_failed") == 2
+
+
+def test_malformed_segment_url_fails_only_that_channel(http_server, backend):
+    base = http_server.base_url
+    urls = [f"{base}/badhls/index.m3u8", f"{base}/ts/1.ts"]
+    scanner = M3UScanner(backend=backend, deep=True, per_host_limit=0)
+    results = {channel.url: (is_active, error) for channel, is_active, error in scanner.scan(Channel(url) for url in urls)}
+    is_active, error = results[f"{base}/badhls/index.m3u8"]
+    assert not is_active and error.startswith("Diepe controle: ")
+    assert results[f"{base}/ts/1.ts"] == (True, "")
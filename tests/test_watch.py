@@ -0,0 +1,35 @@
+import os
+
+from m3u_scanner import M3UScanner
+from m3u_scanner.watch import PlaylistWatcher
+
+
+def write_playlist(path, urls):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("#EXTM3U\n")
+        for number, url in enumerate(urls):
+            f.write(f"#EXTINF:-1,Zender {number}\n{url}\n")
+    return str(path)
+
+
+def test_cycle_creates_output_dir(http_server, tmp_path):
+    base = http_server.base_url
+    playlist = write_playlist(tmp_path / "lijst.m3u", [f"{base}/ok/1.ts", f"{base}/dead/2.ts"])
+    output_dir = tmp_path / "nieuw" / "uitvoer"
+    watcher = PlaylistWatcher(M3UScanner(timeout=2), [playlist], str(output_dir))
+    paths = watcher.cycle()
+    assert paths == [str(output_dir / "lijst_active.m3u")]
+    with open(paths[0], encoding="utf-8") as f:
+        published = f.read()
+    assert f"{base}/ok/1.ts" in published and "/dead/" not in published
+
+
+def test_unchanged_playlist_is_not_rescanned(http_server, tmp_path):
+    playlist = write_playlist(tmp_path / "lijst.m3u", [f"{http_server.base_url}/ok/{i}.ts" for i in range(4)])
+    watcher = PlaylistWatcher(M3UScanner(timeout=2), [playlist], str(tmp_path / "uitvoer"), recheck=0)
+    watcher.cycle()
+    requests = http_server.requests
+    assert watcher.cycle() == []
+    assert http_server.requests == requests
+    os.remove(tmp_path / "uitvoer" / "lijst_active.m3u")
+    assert watcher.cycle() == [str(tmp_path / "uitvoer" / "lijst_active.m3u")]